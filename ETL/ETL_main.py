@@ -1,32 +1,30 @@
 # Import modules
-import extract_transform_load.extract as extract
-import extract_transform_load.transform as transform
-import extract_transform_load.load as load
-
-### EXTRACT DATA###
-# Extracts past 30 days of raw data on the ERCOT electricity grid
-
-# Extract data from an ERCOT HTML webpage: "https://www.ercot.com/content/cdr/html/{date}_dam_spp.html"
-raw_price_data = extract.get_price_data() # Electrical bus prices across ERCOT regions
-
-# Get Access Token and Subscription Key to ERCOT's API
-access_token, SUBSCRIPTION_KEY = extract.get_api_token() 
-
-# Extract data from across ERCOT regions using ERCOT's API
-raw_load_data = extract.get_load_data(access_token, SUBSCRIPTION_KEY) # mW of electricity demand
-raw_wind_data = extract.get_wind_data(access_token, SUBSCRIPTION_KEY) # mW of wind energy generation
-raw_solar_data = extract.get_solar_data(access_token, SUBSCRIPTION_KEY) # mW of solar energy generation
-
-
-### TRANSFORM DATA ##
-# Normalizes and cleans each dataset into Pandas dataframe
-
-price_df = transform.transform_price_data(raw_price_data)
-load_df = transform.transform_load_data(raw_load_data)
-wind_df = transform.transform_wind_data(raw_wind_data)
-solar_df = transform.transform_solar_data(raw_solar_data)
-
-
-### LOAD DATA ### 
-merged_df = load.merge_df(price_df, load_df, wind_df, solar_df)
-load.save_as_CSV(merged_df)
\ No newline at end of file
+import extract_transform_load.metrics as metrics
+import extract_transform_load.pipeline as pipeline
+
+# Records wall time, requests, cache hits, rows, imputed cells and memory for every stage
+# (set PROFILE_STAGE to a stage name, e.g. 'extract_wind', to also dump a cProfile of that stage)
+PROFILE_STAGE = None
+
+# Set to False to skip the (slower) full CSV export
+EXPORT_CSV = True
+
+# Set to False to skip upserting into the SQLite warehouse (clean_data/ERCOT_Warehouse.sqlite)
+EXPORT_WAREHOUSE = True
+
+# Set to True to transform the whole window again instead of only the days whose raw data changed
+FULL_REFRESH = False
+
+### EXTRACT, TRANSFORM & LOAD DATA ###
+# Extracts past 30 days of raw data on the ERCOT electricity grid, normalizes and cleans each dataset into
+# a Pandas dataframe, then merges and saves them.
+#
+# The four sources run as concurrent branches; each one is transformed (on a process pool) as soon as its
+# own extract finishes, and the merge runs once every branch is done:
+#   price: ERCOT HTML webpage "https://www.ercot.com/content/cdr/html/{date}_dam_spp.html" (electrical bus prices)
+#   load:  ERCOT's API (mW of electricity demand)
+#   wind:  ERCOT's API (mW of wind energy generation)
+#   solar: ERCOT's API (mW of solar energy generation)
+if __name__ == '__main__':
+    run_metrics = metrics.RunMetrics(profile_stage=PROFILE_STAGE)
+    merged_df = pipeline.Pipeline(run_metrics, full_refresh=FULL_REFRESH).run(export_csv=EXPORT_CSV, export_warehouse=EXPORT_WAREHOUSE)
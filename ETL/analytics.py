@@ -0,0 +1,235 @@
+# Import Libraries
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import extract_transform_load.load as load
+import extract_transform_load.array_store as array_store
+
+#######################
+### AGGREGATE CUBES ###
+#######################
+
+# The analysis notebook groups the hourly data the same few ways on every run. These cubes keep those
+# group-bys precomputed as sums, counts (and daily maxima), so a chart reads a table the size of its
+# groups instead of every stored hour. New hours are merged into the cubes as they are loaded.
+#
+# Each cube is saved as clean_data/ERCOT_Aggregates/<cube>.parquet with one row per group and the
+# columns <column>_sum, <column>_count (and <column>_max for the date cube); the mean is sum / count.
+# ingested/<yyyy-mm>.parquet holds the values already added to the cubes for each epoch hour (see
+# array_store.to_epoch_hours), so an hour that is loaded again replaces its old values instead of
+# being counted twice. Only the ledger months touched by an ingest are read and rewritten.
+
+# Measurements aggregated by the cubes (the columns the notebook charts)
+CUBE_COLUMNS = ['Price_Hub_Avg', 'Load_Total', 'Wind_SystemWide', 'Solar_SystemWide']
+
+# Group keys of each cube (Week is the ISO week, Weekday is 0 for Monday to 6 for Sunday)
+CUBES = {
+    'week_hour': ['ISO_Year', 'Week', 'Hour'],
+    'hour': ['Hour'],
+    'date': ['Date'],
+    'hour_weekday': ['Hour', 'Weekday'],
+    }
+
+# Cubes that also keep the maximum of each group (maxima can't be subtracted, so they are recomputed
+# for the groups whose hours are replaced; only the daily maxima are needed)
+MAX_CUBES = ['date']
+
+def get_cube_directory():
+    return load.get_clean_data_directory() / "ERCOT_Aggregates"
+
+# Returns the cube keys and values for each hour of a merged dataframe, one row per epoch hour
+def get_cube_rows(epoch_hours, values):
+    dates, hours = load.local_dates_and_hours(array_store.from_epoch_hours(epoch_hours))
+    iso = dates.isocalendar()
+
+    rows = pd.DataFrame({
+        'Epoch_Hour': np.asarray(epoch_hours, dtype=np.int32),
+        'Date': dates,
+        'Hour': hours,
+        'ISO_Year': iso['year'].to_numpy(dtype=np.int64),
+        'Week': iso['week'].to_numpy(dtype=np.int64),
+        'Weekday': dates.dayofweek.to_numpy(dtype=np.int64),
+        })
+    for column in values:
+        rows[column] = np.asarray(values[column], dtype=np.float64)
+
+    return rows
+
+# Sums and counts of one cube's groups
+def aggregate(rows, keys, columns):
+    grouped = rows.groupby(keys)[columns]
+    return pd.concat([grouped.sum().add_suffix('_sum'), grouped.count().add_suffix('_count')], axis=1)
+
+# Returns the UTC months (as timestamps) of epoch hours
+def get_months(epoch_hours):
+    timestamps = array_store.from_epoch_hours(epoch_hours).tz_convert(None)
+    return set(timestamps.to_period('M').unique().to_timestamp().tz_localize('UTC'))
+
+# Returns the first epoch hour of a UTC month and of the month after it
+def get_month_bounds(month):
+    return array_store.to_epoch_hours(pd.DatetimeIndex([month, month + pd.offsets.MonthBegin()]))
+
+class AggregateCubes:
+
+    def __init__(self, directory=None, columns=CUBE_COLUMNS):
+        self.directory = Path(directory) if directory else get_cube_directory()
+        self.columns = list(columns)
+        self.cubes = {}
+        for name in CUBES:
+            path = self.directory / f'{name}.parquet'
+            if path.exists():
+                self.cubes[name] = pd.read_parquet(path)
+
+        # Months of the ledger of ingested values (one row per epoch hour) read so far. Only the months an
+        # ingest touches (and their neighbors, for the daily maxima) are read and rewritten.
+        self.ledger = {}
+        self.dirty_months = set()
+
+    def get_ledger_path(self, month):
+        return self.directory / 'ingested' / f"{month.strftime('%Y-%m')}.parquet"
+
+    # Reads the ledger months that are not loaded yet
+    def load_months(self, months):
+        for month in months - self.ledger.keys():
+            path = self.get_ledger_path(month)
+            if path.exists():
+                self.ledger[month] = pd.read_parquet(path).set_index('Epoch_Hour')
+            else:
+                self.ledger[month] = pd.DataFrame(columns=self.columns, dtype=np.float64,
+                                                  index=pd.Index([], dtype=np.int32, name='Epoch_Hour'))
+
+    # Returns the ingested values of the loaded ledger months, sorted by epoch hour
+    def get_ingested(self):
+        months = [self.ledger[month] for month in sorted(self.ledger) if len(self.ledger[month])]
+        return pd.concat(months) if months else self.ledger[min(self.ledger)]
+
+    # Adds (sign=1) or removes (sign=-1) hours from every cube's sums and counts. Groups that already exist
+    # are updated in place; new groups are appended.
+    def add_rows(self, rows, sign):
+        for name, keys in CUBES.items():
+            update = aggregate(rows, keys, self.columns) * sign
+            cube = self.cubes.get(name)
+
+            if cube is None:
+                self.cubes[name] = update
+                continue
+
+            existing = update.index.isin(cube.index)
+            groups = update.index[existing]
+            cube.loc[groups, update.columns] = cube.loc[groups, update.columns].to_numpy() + update[existing].to_numpy()
+
+            if not existing.all():
+                new_groups = update[~existing].reindex(columns=cube.columns)
+                self.cubes[name] = pd.concat([cube, new_groups]).sort_index()
+
+    # Recomputes the maxima of the groups that contain the given rows, from the ingested hours
+    def refresh_max(self, rows, ingested):
+        if not len(ingested) or not len(rows):
+            return
+
+        # Only the ingested hours within a day of the rows can share a group with them
+        first, last = np.searchsorted(ingested.index, [rows['Epoch_Hour'].min() - 25, rows['Epoch_Hour'].max() + 25])
+        nearby = ingested.iloc[first:last]
+        nearby_rows = get_cube_rows(nearby.index, nearby)
+
+        for name in MAX_CUBES:
+            keys = CUBES[name]
+            groups = rows.set_index(keys).index.unique()
+            nearby_group_rows = nearby_rows[nearby_rows.set_index(keys).index.isin(groups)]
+            maxima = nearby_group_rows.groupby(keys)[self.columns].max().add_suffix('_max')
+
+            cube = self.cubes[name]
+            for col in maxima.columns:
+                if col not in cube.columns:
+                    cube[col] = np.nan
+            cube.loc[maxima.index, maxima.columns] = maxima
+
+    # Drops the groups of the given rows that have no hours left
+    def drop_empty_groups(self, rows):
+        count_cols = [f'{column}_count' for column in self.columns]
+        for name, keys in CUBES.items():
+            cube = self.cubes[name]
+            counts = cube.loc[rows.set_index(keys).index.unique(), count_cols]
+            empty = counts.index[(counts == 0).all(axis=1)]
+            if len(empty):
+                self.cubes[name] = cube.drop(empty)
+
+    # Merges a merged dataframe (see load.merge_df) into the cubes. Hours that were ingested before have
+    # their old values removed first, so loading the same hours again gives the same cubes.
+    def ingest(self, df):
+        df = load.sort_rows(load.to_storage_types(df))
+        hours = array_store.to_epoch_hours(df['Timestamp'])
+        values = pd.DataFrame({column: df[column].to_numpy(dtype=np.float64) if column in df.columns
+                               else np.full(len(df), np.nan) for column in self.columns})
+        values.index = pd.Index(hours, name='Epoch_Hour')
+        values = values[~values.index.duplicated(keep='last')].sort_index()
+        if values.empty:
+            return
+
+        # Read the ledger months of the new hours, and of the hours within a day of them (daily maxima)
+        months = get_months(values.index)
+        self.load_months(months | get_months([values.index[0] - 25, values.index[-1] + 25]))
+        ingested = self.get_ingested()
+
+        # Remove the old values of hours that are loaded again
+        replaced = values.index.intersection(ingested.index)
+        replaced_rows = get_cube_rows(replaced, ingested.loc[replaced])
+        if len(replaced):
+            self.add_rows(replaced_rows, sign=-1)
+
+        new_rows = get_cube_rows(values.index, values)
+        self.add_rows(new_rows, sign=1)
+
+        # Keep the ingested values, month by month
+        for month in months:
+            first, last = np.searchsorted(values.index, get_month_bounds(month))
+            month_values = values.iloc[first:last]
+            self.ledger[month] = pd.concat([self.ledger[month].drop(month_values.index, errors='ignore'),
+                                            month_values]).sort_index()
+        self.dirty_months.update(months)
+
+        # Daily maxima of the days that were touched
+        self.refresh_max(new_rows, self.get_ingested())
+
+        # Drop groups that have no hours left
+        self.drop_empty_groups(pd.concat([replaced_rows, new_rows]))
+
+    def save(self):
+        if not self.dirty_months:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, cube in self.cubes.items():
+            cube.to_parquet(self.directory / f'{name}.parquet')
+
+        # Rewrite the ledger months that changed
+        (self.directory / 'ingested').mkdir(exist_ok=True)
+        for month in sorted(self.dirty_months):
+            self.ledger[month].reset_index().to_parquet(self.get_ledger_path(month), index=False)
+        self.dirty_months = set()
+
+    # Returns one cube with the mean (and max) of each column, indexed by the cube's keys
+    def get_means(self, name, columns=None):
+        columns = self.columns if columns is None else columns
+        cube = self.cubes[name]
+        means = pd.DataFrame({column: cube[f'{column}_sum'] / cube[f'{column}_count'].replace(0, np.nan)
+                              for column in columns}, index=cube.index)
+        if name in MAX_CUBES:
+            for column in columns:
+                means[f'{column}_max'] = cube[f'{column}_max']
+        return means
+
+# Merges the merged dataframe into the saved cubes (called by the load step)
+def update_cubes(df, directory=None):
+    cubes = AggregateCubes(directory)
+    cubes.ingest(df)
+    cubes.save()
+    print(f"Aggregate cubes saved to: {cubes.directory}\n")
+    return cubes
+
+# Builds the cubes from scratch from the Parquet dataset
+def rebuild_cubes(directory=None, parquet_directory=None):
+    directory = Path(directory) if directory else get_cube_directory()
+    for path in list(directory.glob('*.parquet')) + list(directory.glob('ingested/*.parquet')):
+        path.unlink()
+    return update_cubes(load.read_parquet(directory=parquet_directory).set_index('Timestamp'), directory)
@@ -0,0 +1,284 @@
+# Import Libraries
+import io
+import json
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import extract_transform_load.load as load
+
+###########################
+### MEMORY-MAPPED STORE ###
+###########################
+
+# The array store keeps the merged hourly dataset as one .npy file per column:
+#   clean_data/ERCOT_Electricity_Arrays/epoch_hour.npy   int32 hours since 1970-01-01 UTC (hour ending), sorted
+#   clean_data/ERCOT_Electricity_Arrays/<column>.npy     float32 measurements (float64 if float32 can't hold them)
+#   clean_data/ERCOT_Electricity_Arrays/meta.json        columns, dtypes, decimals, row count and version
+# Files are opened as memory maps, so opening years of data is instant and slicing a date range or a few
+# columns returns views into the files without reading the rest.
+
+# Decimal places kept for each column family (values are rounded before they are stored)
+PRECISION_POLICY = {'Price': 2, 'Load': 1, 'Wind': 1, 'Solar': 1}
+
+# Hour-ending timestamps are stored as whole hours since this instant
+EPOCH = pd.Timestamp('1970-01-01', tz='UTC')
+
+def get_array_directory():
+    return load.get_clean_data_directory() / "ERCOT_Electricity_Arrays"
+
+# Returns the number of decimal places kept for a column (None keeps every digit float32 can hold)
+def get_decimals(column):
+    for prefix, decimals in PRECISION_POLICY.items():
+        if column.startswith(prefix):
+            return decimals
+    return None
+
+# float32 has a 24-bit mantissa, so it only keeps `decimals` places exactly for values below 2**24 / 10**decimals.
+# Columns with larger values are stored as float64.
+def get_storage_dtype(values, decimals):
+    if decimals is None:
+        return np.float32
+    largest = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 0.0
+    return np.float32 if largest < 2 ** 24 / 10 ** decimals else np.float64
+
+### Conversion Helpers ###
+
+# Converts UTC hour-ending timestamps into int32 epoch hours
+def to_epoch_hours(timestamps):
+    hours = (pd.DatetimeIndex(timestamps).tz_convert('UTC') - EPOCH) // pd.Timedelta(hours=1)
+    return np.asarray(hours, dtype=np.int32)
+
+# Converts epoch hours back into UTC hour-ending timestamps
+def from_epoch_hours(hours):
+    return pd.DatetimeIndex(EPOCH + pd.to_timedelta(np.asarray(hours, dtype=np.int64), unit='h'), name='Timestamp')
+
+# Converts a merged dataframe (see load.merge_df) into sorted epoch hours and one array per column,
+# rounded and cast according to PRECISION_POLICY. Returns (hours, {column: array}, {column: decimals}).
+def df_to_arrays(df):
+    df = load.sort_rows(load.to_storage_types(df))
+    hours = to_epoch_hours(df['Timestamp'])
+
+    arrays, decimals = {}, {}
+    for column in df.columns:
+        if column in ('Timestamp', 'Date', 'Hour'):
+            continue
+        values = df[column].to_numpy(dtype=np.float64)
+        decimals[column] = get_decimals(column)
+        if decimals[column] is not None:
+            values = np.round(values, decimals[column])
+        arrays[column] = values.astype(get_storage_dtype(values, decimals[column]))
+
+    return hours, arrays, decimals
+
+# Converts epoch hours and column arrays back into the merged dataframe layout: a UTC 'Timestamp' index,
+# Date & Hour columns (hour ending 24 is hour 0) and float64 measurements
+def arrays_to_df(hours, arrays, decimals=None):
+    timestamps = from_epoch_hours(hours)
+    dates, local_hours = load.local_dates_and_hours(timestamps)
+
+    columns = {'Date': dates, 'Hour': local_hours}
+    for column, values in arrays.items():
+        values = np.asarray(values, dtype=np.float64)
+
+        # Undo the float32 rounding error (12.34 is stored as 12.3400001525...)
+        column_decimals = (decimals or {}).get(column, get_decimals(column))
+        if column_decimals is not None:
+            values = np.round(values, column_decimals)
+        columns[column] = values
+
+    return pd.DataFrame(columns, index=timestamps)
+
+### Writing ###
+
+def save_array(path, values):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, values)
+    tmp_path.replace(path)
+
+# Saves the merged dataframe to the array store. Rows already stored for the same hour are replaced by the
+# new ones; columns missing from df keep their stored values for the other hours (NaN for new hours).
+def save_as_arrays(df, directory=None):
+    directory = Path(directory) if directory else get_array_directory()
+    hours, arrays, decimals = df_to_arrays(df)
+
+    # Combine with the rows already stored (new rows win)
+    if (directory / 'meta.json').exists():
+        store = ArrayStore(directory)
+        all_hours = np.union1d(store.hours, hours).astype(np.int32)
+        stored_positions = np.searchsorted(all_hours, store.hours)
+        new_positions = np.searchsorted(all_hours, hours)
+
+        combined = {}
+        for column in list(store.columns) + [col for col in arrays if col not in store.columns]:
+            dtype = np.result_type(store.meta['columns'].get(column, {}).get('dtype', np.float32),
+                                   arrays[column].dtype if column in arrays else np.float32)
+            values = np.full(len(all_hours), np.nan, dtype=dtype)
+            if column in store.columns:
+                values[stored_positions] = store.column(column)
+            if column in arrays:
+                values[new_positions] = arrays[column]
+            combined[column] = values
+            decimals.setdefault(column, store.meta['columns'].get(column, {}).get('decimals'))
+        hours, arrays = all_hours, combined
+        del store
+
+    directory.mkdir(parents=True, exist_ok=True)
+    save_array(directory / 'epoch_hour.npy', hours)
+    for column, values in arrays.items():
+        save_array(directory / f'{column}.npy', values)
+
+    # Written last, so a store is only readable once every column is in place
+    save_meta(directory, len(hours), {column: {'dtype': np.dtype(values.dtype).name, 'decimals': decimals.get(column)}
+                                      for column, values in arrays.items()})
+
+    print(f"Array store saved to: {directory}\n")
+
+# meta.json gets a new version stamp on every write, so readers (e.g. query.py's cache) can tell the data changed
+def save_meta(directory, rows, columns):
+    tmp_path = directory / 'meta.json.tmp'
+    tmp_path.write_text(json.dumps({'rows': int(rows), 'columns': columns, 'version': time.time_ns()}, indent=1))
+    tmp_path.replace(directory / 'meta.json')
+
+# Returns the header of a 1D .npy file holding `rows` rows, or None if it wouldn't fit in the current header
+# (np.save pads the header so the length can usually grow in place)
+def get_grown_header(path, rows):
+    with open(path, 'rb') as f:
+        if np.lib.format.read_magic(f) != (1, 0):
+            return None
+        _, _, dtype = np.lib.format.read_array_header_1_0(f)
+        header_length = f.tell()
+
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, {'descr': np.lib.format.dtype_to_descr(dtype),
+                                                  'fortran_order': False, 'shape': (rows,)})
+    return (header.getvalue(), dtype) if len(header.getvalue()) == header_length else None
+
+# Writes values after the first `start` rows of a 1D .npy file in place: the values are written first
+# (cutting off any rows left behind by an interrupted append), then the header that makes them visible
+def append_array(path, values, start, header, dtype):
+    with open(path, 'r+b') as f:
+        f.seek(len(header) + start * np.dtype(dtype).itemsize)
+        f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        f.truncate()
+        f.seek(0)
+        f.write(header)
+
+# Upserts a merged dataframe in place: hours already stored are overwritten through writable memory maps
+# and later hours are appended to the end of each file, so the cost depends on the size of df, not on the
+# size of the store. Falls back to save_as_arrays when that isn't possible (new columns, hours inserted
+# before the last stored hour, or values that need a wider dtype).
+def upsert_arrays(df, directory=None):
+    directory = Path(directory) if directory else get_array_directory()
+    if not (directory / 'meta.json').exists():
+        return save_as_arrays(df, directory)
+
+    hours, arrays, _ = df_to_arrays(df)
+    store = ArrayStore(directory)
+    columns_meta = store.meta['columns']
+
+    positions = np.searchsorted(store.hours, hours)
+    stored = positions < len(store)
+    stored[stored] = store.hours[positions[stored]] == hours[stored]
+    appended = ~stored & (hours > (store.hours[-1] if len(store) else np.iinfo(np.int32).min))
+
+    fits = all(column in columns_meta and np.can_cast(values.dtype, columns_meta[column]['dtype'])
+               for column, values in arrays.items())
+    if not fits or not (stored | appended).all():
+        del store
+        return save_as_arrays(df, directory)
+
+    # Overwrite the stored hours
+    if stored.any():
+        for column, values in arrays.items():
+            column_map = np.load(directory / f'{column}.npy', mmap_mode='r+')
+            column_map[positions[stored]] = values[stored]
+            column_map.flush()
+            del column_map
+
+    # Append the new hours (columns missing from df are NaN). The epoch hours are the index of the store and
+    # are written last: an append that is interrupted before them leaves column files longer than the index,
+    # which readers cut off and the next append overwrites.
+    rows = len(store)
+    del store
+    if appended.any():
+        new_rows = rows + int(appended.sum())
+        paths = [directory / f'{column}.npy' for column in columns_meta] + [directory / 'epoch_hour.npy']
+        headers = [get_grown_header(path, new_rows) for path in paths]
+        if any(header is None for header in headers):
+            return save_as_arrays(df, directory)
+
+        for column, path, (header, dtype) in zip(list(columns_meta) + ['epoch_hour'], paths, headers):
+            if column == 'epoch_hour':
+                values = hours[appended]
+            else:
+                values = arrays[column][appended] if column in arrays else np.full(appended.sum(), np.nan)
+            append_array(path, values, rows, header, dtype)
+        rows = new_rows
+
+    save_meta(directory, rows, columns_meta)
+
+# Builds the array store from the Parquet dataset (e.g. after cloning the repo)
+def convert_parquet(directory=None, parquet_directory=None):
+    df = load.read_parquet(directory=parquet_directory).set_index('Timestamp')
+    save_as_arrays(df, directory)
+
+### Reading ###
+
+# Opens the array store read-only. Columns are memory-mapped on first use.
+#   store = ArrayStore()
+#   hours, arrays = store.read(['Price_Hub_Avg', 'Load_Total'], start='2025-02-01', end='2025-02-07')
+#   df = store.to_df(['Price_Hub_Avg'], start='2025-02-01')
+class ArrayStore:
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else get_array_directory()
+        self.meta = json.loads((self.directory / 'meta.json').read_text())
+        self.columns = list(self.meta['columns'])
+        self.hours = np.load(self.directory / 'epoch_hour.npy', mmap_mode='r')
+        self.arrays = {}
+
+    def __len__(self):
+        return len(self.hours)
+
+    # Returns one column as a read-only memory map, cut to the length of the epoch hours (rows of an
+    # interrupted append are left out)
+    def column(self, name):
+        if name not in self.arrays:
+            if name not in self.meta['columns']:
+                raise KeyError(f'{name} is not in the array store (columns: {", ".join(self.columns)})')
+            self.arrays[name] = np.load(self.directory / f'{name}.npy', mmap_mode='r')[:len(self.hours)]
+        return self.arrays[name]
+
+    # Returns the row slice for a range. start/end can be epoch hours (int), UTC timestamps, or local
+    # dates (inclusive, like load.read_parquet: a date covers hours ending 1-24 of that day).
+    def get_slice(self, start=None, end=None):
+        first = 0 if start is None else int(np.searchsorted(self.hours, to_epoch_hour(start, 'start'), side='left'))
+        last = len(self.hours) if end is None else int(np.searchsorted(self.hours, to_epoch_hour(end, 'end'), side='right'))
+        return slice(first, max(first, last))
+
+    # Returns (hours, {column: array}) for a range. The arrays are views into the memory maps (no copy).
+    def read(self, columns=None, start=None, end=None):
+        rows = self.get_slice(start, end)
+        columns = self.columns if columns is None else columns
+        return self.hours[rows], {column: self.column(column)[rows] for column in columns}
+
+    # Reads a range into the merged dataframe layout (see arrays_to_df)
+    def to_df(self, columns=None, start=None, end=None):
+        hours, arrays = self.read(columns, start, end)
+        decimals = {column: self.meta['columns'][column]['decimals'] for column in arrays}
+        return arrays_to_df(hours, arrays, decimals)
+
+# Converts a range bound into an epoch hour. Local dates (no time zone) are whole ERCOT days: a start date
+# begins at hour ending 1 and an end date finishes at hour ending 24.
+def to_epoch_hour(value, bound):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+
+    value = pd.Timestamp(value)
+    if value.tzinfo is None:
+        day = value.normalize() + pd.Timedelta(days=0 if bound == 'start' else 1)
+        value = day.tz_localize(load.ERCOT_TIMEZONE) + pd.Timedelta(hours=1 if bound == 'start' else 0)
+
+    return int(to_epoch_hours([value])[0])
@@ -0,0 +1,198 @@
+# Import Libraries
+import argparse
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+import extract_transform_load.extract as extract
+import extract_transform_load.transform as transform
+import extract_transform_load.load as load
+import extract_transform_load.array_store as array_store
+import extract_transform_load.analytics as analytics
+import extract_transform_load.warehouse as warehouse
+
+###################################
+### HISTORICAL BACKFILL MODE    ###
+###################################
+
+# A backfill splits an arbitrary date range into one work unit per source and day. Units run in parallel
+# (API units still go through extract.API_RATE_LIMITER), and every finished unit is saved to
+# backfill/<source>/<yyyy-mm-dd>.json.gz. Re-running the same backfill skips the saved units, so an
+# interrupted backfill resumes exactly where it stopped.
+
+# Define the default checkpoint folder (next to the clean_data folder)
+BACKFILL_DIRECTORY = Path(__file__).resolve().parent.parent / "backfill"
+
+SOURCES = ['price', 'load', 'wind', 'solar']
+
+# Number of work units in flight at once
+BACKFILL_MAX_WORKERS = 8
+
+# Returns every day from start to end (inclusive) as date objects
+def get_days(start, end):
+    start = datetime.strptime(str(start), '%Y-%m-%d').date()
+    end = datetime.strptime(str(end), '%Y-%m-%d').date()
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+def get_checkpoint_path(directory, source, day):
+    return Path(directory) / source / f"{day.strftime('%Y-%m-%d')}.json.gz"
+
+# Downloads one source for one day, in the same shape the extract functions use for that day.
+# Failed requests (429/5xx) raise once they run out of retries. A day that is not posted yet or has no rows
+# raises too: a checkpointed empty day would never be fetched again.
+def fetch_unit(source, day, api_client):
+    if source == 'price':
+        raw_data = extract.scrape_price_data(day.strftime('%Y%m%d'), extract.PRICE_URL)
+    elif source == 'load':
+        raw_data = extract.get_load_data(api_client, start_date=day, end_date=day, quiet=True)
+    elif source == 'wind':
+        raw_data = extract.query_generation_day(extract.WIND_API_ENDPOINT, day, api_client)
+    elif source == 'solar':
+        raw_data = extract.query_generation_day(extract.SOLAR_API_ENDPOINT, day, api_client)
+    else:
+        raise ValueError(f'Unknown source: {source}')
+
+    rows = raw_data if source == 'price' else transform.flatten_dictionaries(raw_data)
+    if not rows:
+        raise ValueError(f"No {source} rows for {day.strftime('%Y-%m-%d')}")
+    return raw_data
+
+# Saves a finished unit (written to a temporary file first so a crash never leaves a partial checkpoint)
+def save_checkpoint(path, raw_data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with gzip.open(tmp_path, 'wt') as f:
+        json.dump(raw_data, f, default=str)
+    tmp_path.replace(path)
+
+def load_checkpoint(path):
+    with gzip.open(path, 'rt') as f:
+        return json.load(f)
+
+# Prints progress with the throughput so far and the estimated time left
+class Progress:
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def update(self, failed=False):
+        with self.lock:
+            self.done += 1
+            self.failed += failed
+            elapsed = time.monotonic() - self.started
+            rate = self.done / elapsed if elapsed > 0 else 0.0
+            eta = (self.total - self.done) / rate if rate > 0 else float('inf')
+
+            if self.done % 25 == 0 or self.done == self.total:
+                print(f'{self.done}/{self.total} units ({self.failed} failed) | '
+                      f'{rate:.2f} units/sec | ETA {timedelta(seconds=round(eta)) if rate else "unknown"}')
+
+# Runs (or resumes) a backfill. Returns {'done': n, 'skipped': n, 'failed': {(source, day): error}}.
+def run_backfill(start, end, sources=SOURCES, max_workers=BACKFILL_MAX_WORKERS, directory=BACKFILL_DIRECTORY):
+    directory = Path(directory)
+
+    # Split the range into work units and skip the ones already checkpointed
+    units = [(source, day) for day in get_days(start, end) for source in sources]
+    pending = [(source, day) for source, day in units if not get_checkpoint_path(directory, source, day).exists()]
+    print(f'Backfill {start} to {end}: {len(units)} units, {len(units) - len(pending)} already done, '
+          f'{len(pending)} to fetch\n')
+
+    # The API units share one client (its token is refreshed as the backfill runs, and throttled or failed
+    # requests are retried before a unit is marked as failed)
+    api_client = None
+    if any(source != 'price' for source, _ in pending):
+        api_client = extract.get_api_client()
+
+    progress = Progress(len(pending))
+    failed = {}
+
+    def run_unit(source, day):
+        raw_data = fetch_unit(source, day, api_client)
+        save_checkpoint(get_checkpoint_path(directory, source, day), raw_data)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_unit, source, day): (source, day) for source, day in pending}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                failed[futures[future]] = error
+            progress.update(failed=error is not None)
+
+    if api_client is not None:
+        print(f'API requests: {api_client.get_latency_stats()}')
+        api_client.close()
+
+    # Failed units have no checkpoint, so running the backfill again retries only them
+    if failed:
+        print(f'\n{len(failed)} units failed; run the backfill again to retry them:')
+        for (source, day), error in sorted(failed.items()):
+            print(f"  {source} {day.strftime('%Y-%m-%d')}: {error!r}")
+
+    return {'done': len(pending) - len(failed), 'skipped': len(units) - len(pending), 'failed': failed}
+
+# Reads the checkpoints for one source back into the shape its extract function returns
+def load_raw_data(source, start, end, directory=BACKFILL_DIRECTORY):
+    raw_data = []
+    for day in get_days(start, end):
+        path = get_checkpoint_path(directory, source, day)
+
+        # Missing price days are empty lists (transform fills them); missing API days are skipped
+        if not path.exists():
+            if source == 'price':
+                raw_data.append([])
+            continue
+
+        unit = load_checkpoint(path)
+        if source == 'load':
+            raw_data.extend(unit) # a list of pages
+        else:
+            raw_data.append(unit)
+
+    return raw_data
+
+# Transforms, merges and saves the checkpointed data for the range
+def build_dataset(start, end, sources=SOURCES, directory=BACKFILL_DIRECTORY):
+    transforms = {'price': transform.transform_price_data, 'load': transform.transform_load_data,
+                  'wind': transform.transform_wind_data, 'solar': transform.transform_solar_data}
+
+    frames = [transforms[source](load_raw_data(source, start, end, directory)) for source in sources]
+    merged_df = load.merge_df(*frames)
+
+    # When only some sources were backfilled, keep the other sources' stored columns for the same hours
+    if set(sources) != set(SOURCES) and load.get_parquet_directory().exists():
+        stored_df = load.read_parquet(start=start, end=end).set_index('Timestamp')
+        merged_df = merged_df.combine_first(stored_df)
+        merged_df = merged_df[['Date', 'Hour'] + [col for col in merged_df.columns if col not in ('Date', 'Hour')]]
+
+    load.save_as_parquet(merged_df)
+    array_store.save_as_arrays(merged_df)
+    analytics.update_cubes(merged_df)
+    warehouse.save_to_warehouse(merged_df)
+
+    return merged_df
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Backfill ERCOT data for an arbitrary date range')
+    arg_parser.add_argument('--start', required=True, help='first delivery date (yyyy-mm-dd)')
+    arg_parser.add_argument('--end', required=True, help='last delivery date (yyyy-mm-dd)')
+    arg_parser.add_argument('--sources', nargs='+', default=SOURCES, choices=SOURCES)
+    arg_parser.add_argument('--workers', type=int, default=BACKFILL_MAX_WORKERS)
+    arg_parser.add_argument('--directory', default=BACKFILL_DIRECTORY, help='checkpoint folder')
+    arg_parser.add_argument('--no-build', action='store_true', help='only download, do not save the dataset')
+    args = arg_parser.parse_args()
+
+    result = run_backfill(args.start, args.end, args.sources, args.workers, args.directory)
+
+    # Only build the dataset once every unit is downloaded
+    if not args.no_build and not result['failed']:
+        build_dataset(args.start, args.end, args.sources, args.directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# Import Libraries
+import gzip
+import hashlib
+import json
+import threading
+import time
+import atexit
+from pathlib import Path
+from urllib.parse import urlencode
+
+#######################################
+### RAW RESPONSE CACHE (ON DISK)    ###
+#######################################
+
+# Define the default cache folder (next to the clean_data folder)
+CACHE_DIRECTORY = Path(__file__).resolve().parent.parent / "raw_cache"
+
+# Default size cap for the cache (bytes on disk, after compression)
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# How long a response for a non-finalized date can be reused (seconds)
+MUTABLE_TTL = 60 * 60
+
+# Builds a stable key from an endpoint/URL and its query parameters
+def make_key(url, params=None):
+
+    # Normalize the parameters: sorted by name, every value as a string
+    normalized = ''
+    if params:
+        normalized = urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+
+    return hashlib.sha256(f'{url}?{normalized}'.encode('utf-8')).hexdigest()
+
+# Stores gzip-compressed raw responses, keyed by request, with an LRU size cap.
+# Immutable entries (finalized delivery dates) never expire; mutable entries expire after `ttl` seconds.
+class ResponseCache:
+
+    def __init__(self, directory=CACHE_DIRECTORY, max_bytes=MAX_CACHE_BYTES, ttl=MUTABLE_TTL):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.dirty = False
+
+        # The index maps key -> {'size', 'created', 'last_access', 'immutable'}
+        self.index_path = self.directory / "index.json"
+        self.index = self.load_index()
+
+        # Running total of the entry sizes, so a put never has to re-sum the index
+        self.total_bytes = sum(entry['size'] for entry in self.index.values())
+
+        # The index is written once per batch of requests (see save_index) and when the program exits
+        atexit.register(self.save_index)
+
+    def load_index(self):
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                return json.load(f)
+        return {}
+
+    # Writes the index if it changed (called by the extract functions after each batch, not on every put)
+    def save_index(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(self.index, f)
+            tmp_path.replace(self.index_path)
+            self.dirty = False
+
+    def entry_path(self, key):
+        return self.directory / key[:2] / f"{key}.gz"
+
+    # Returns the cached bytes for a key, or None if missing or expired
+    def get(self, key):
+        with self.lock:
+            entry = self.index.get(key)
+            path = self.entry_path(key)
+
+            # Treat expired mutable entries and missing files as misses
+            expired = entry is not None and not entry['immutable'] and time.time() - entry['created'] > self.ttl
+            if entry is None or expired or not path.exists():
+                self.misses += 1
+                return None
+
+            entry['last_access'] = time.time()
+            self.hits += 1
+            self.dirty = True
+
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+
+    # Stores bytes for a key (finalized data should be stored with immutable=True)
+    def put(self, key, content, immutable=False):
+        path = self.entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so a crash never leaves a half-written entry
+        tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        with gzip.open(tmp_path, 'wb') as f:
+            f.write(content)
+        tmp_path.replace(path)
+
+        with self.lock:
+            now = time.time()
+            previous = self.index.get(key)
+            if previous is not None:
+                self.total_bytes -= previous['size']
+
+            self.index[key] = {'size': path.stat().st_size, 'created': now, 'last_access': now,
+                               'immutable': immutable}
+            self.total_bytes += self.index[key]['size']
+            self.dirty = True
+            self.evict()
+
+    # Removes least recently used entries until the cache is under its size cap (caller holds the lock)
+    def evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        for key in sorted(self.index, key=lambda k: self.index[k]['last_access']):
+            self.total_bytes -= self.index[key]['size']
+            self.entry_path(key).unlink(missing_ok=True)
+            del self.index[key]
+            if self.total_bytes <= self.max_bytes:
+                break
@@ -0,0 +1,200 @@
+# Import Libraries
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+########################
+### ERCOT API CLIENT ###
+########################
+
+# Authorization URL for signing into ERCOT Public API account
+AUTH_URL = "https://ercotb2c.b2clogin.com/ercotb2c.onmicrosoft.com/B2C_1_PUBAPI-ROPC-FLOW/oauth2/v2.0/token"
+
+# ERCOT Public API application id (used as the OAuth client id and scope)
+CLIENT_ID = 'fec253ea-0d06-4272-a5e6-b478baeecd70'
+
+# Responses that are worth retrying: throttled, or a temporary server error
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Refresh the access token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 120
+
+# Seconds to wait before retry number `attempt` (Retry-After if the server sent one)
+def get_retry_delay(attempt, response=None, backoff=1.0, max_backoff=60.0):
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+# Owns one keep-alive session to ERCOT's public API. The access token is cached with its expiry and
+# refreshed (with the refresh token when available) before it expires. Throttled (429) and 5xx responses
+# are retried with jittered exponential backoff, honoring Retry-After. Per-request latencies are kept for
+# get_latency_stats().
+class ErcotClient:
+
+    def __init__(self, username, password, subscription_key, auth_url=AUTH_URL, rate_limiter=None,
+                 max_retries=5, backoff=1.0, max_backoff=60.0, timeout=60, pool_size=8, on_response=None):
+        self.username = username
+        self.password = password
+        self.subscription_key = subscription_key
+        self.auth_url = auth_url
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.on_response = on_response # called with every response (e.g. to count requests and bytes)
+
+        # One session for every request, with a connection pool sized for concurrent callers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Cached token state
+        self.access_token = None
+        self.refresh_token = None
+        self.expires_at = 0.0
+        self.token_lock = threading.Lock()
+
+        # Latency stats (seconds per request, most recent 10,000 requests)
+        self.latencies = deque(maxlen=10000)
+        self.request_count = 0
+        self.retry_count = 0
+        self.stats_lock = threading.Lock()
+
+    ## Authentication ##
+
+    def request_token(self, data):
+        auth_response = self.session.post(self.auth_url, data=data, timeout=self.timeout)
+        auth_response.raise_for_status()
+        token = auth_response.json()
+
+        self.access_token = token.get("access_token")
+        self.refresh_token = token.get("refresh_token") or self.refresh_token
+        self.expires_at = time.time() + float(token.get("expires_in", 3600))
+
+    # Sign in with the account's username and password
+    def login(self):
+        self.request_token({
+            'username': self.username,
+            'password': self.password,
+            'grant_type': 'password',
+            'scope': f'openid {CLIENT_ID} offline_access',
+            'client_id': CLIENT_ID,
+            'response_type': 'id_token'
+            })
+
+    # Get a new access token with the refresh token (falls back to signing in again)
+    def refresh(self):
+        if self.refresh_token:
+            try:
+                self.request_token({
+                    'grant_type': 'refresh_token',
+                    'refresh_token': self.refresh_token,
+                    'client_id': CLIENT_ID,
+                    'scope': f'openid {CLIENT_ID} offline_access',
+                    })
+                return
+            except requests.RequestException:
+                self.refresh_token = None
+        self.login()
+
+    # Returns a valid access token, refreshing it first if it is about to expire
+    def get_token(self, force_refresh=False):
+        with self.token_lock:
+            if self.access_token is None:
+                self.login()
+            elif force_refresh or time.time() > self.expires_at - TOKEN_REFRESH_MARGIN:
+                self.refresh()
+            return self.access_token
+
+    ## Requests ##
+
+    def get_retry_delay(self, attempt, response=None):
+        return get_retry_delay(attempt, response, self.backoff, self.max_backoff)
+
+    def record_latency(self, seconds, retried):
+        with self.stats_lock:
+            self.latencies.append(seconds)
+            self.request_count += 1
+            self.retry_count += retried
+
+    # Sends a GET request and returns the successful response. Raises requests.HTTPError for other errors,
+    # or once the retries run out.
+    def get(self, url, params=None):
+        token_refreshed = False
+        attempt = 0
+
+        while True:
+            headers = {
+                "Authorization": "Bearer " + self.get_token(),
+                "Ocp-Apim-Subscription-Key": self.subscription_key
+                }
+
+            # Wait for the shared rate limiter, then send the GET request
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                # Network errors are retried like 5xx responses
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self.get_retry_delay(attempt))
+                attempt += 1
+                continue
+
+            self.record_latency(time.perf_counter() - start, retried=attempt > 0)
+            if self.on_response is not None:
+                self.on_response(response)
+
+            if response.status_code == 200:
+                return response
+
+            # The token was rejected: refresh it once and try again
+            if response.status_code == 401 and not token_refreshed:
+                self.get_token(force_refresh=True)
+                token_refreshed = True
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(self.get_retry_delay(attempt, response))
+                attempt += 1
+                continue
+
+            print(f"Failed to retrieve data. Status code: {response.status_code}")
+            raise requests.HTTPError(f"{response.status_code} error for {url} {params}", response=response)
+
+    # Returns request count, retries and latency percentiles (seconds)
+    def get_latency_stats(self):
+        with self.stats_lock:
+            latencies = sorted(self.latencies)
+            stats = {'requests': self.request_count, 'retried_requests': self.retry_count}
+
+        if latencies:
+            stats.update({
+                'mean_s': round(statistics.fmean(latencies), 4),
+                'p50_s': round(latencies[len(latencies) // 2], 4),
+                'p95_s': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+                'max_s': round(latencies[-1], 4),
+                })
+        return stats
+
+    def close(self):
+        self.session.close()
@@ -1,11 +1,198 @@
 # Import Libraries
 from datetime import datetime, timedelta
 import time
+import threading
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from html.parser import HTMLParser # for streaming HTML parsing
 from bs4 import BeautifulSoup # for HTML scraping
 import requests # for HTML scraping
+from requests.adapters import HTTPAdapter
+import extract_transform_load.cache as cache
+import extract_transform_load.client as client
+
+# lxml is optional: it is only used by the fast HTML table parser
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
  
 ### Define General Functions ###
 
+# Base URLs of ERCOT's public API, its sign-in service and the price pages. Every endpoint below is built
+# from these, so set ERCOT_API_BASE_URL / ERCOT_AUTH_URL / ERCOT_PRICE_BASE_URL (or call set_base_urls) to
+# send every request somewhere else, e.g. to a local replay server (see replay.py).
+DEFAULT_API_BASE_URL = "https://api.ercot.com/api/public-reports"
+DEFAULT_PRICE_BASE_URL = "https://www.ercot.com/content/cdr/html"
+API_BASE_URL = os.environ.get('ERCOT_API_BASE_URL', DEFAULT_API_BASE_URL)
+PRICE_BASE_URL = os.environ.get('ERCOT_PRICE_BASE_URL', DEFAULT_PRICE_BASE_URL)
+AUTH_URL = os.environ.get('ERCOT_AUTH_URL', client.AUTH_URL)
+
+# Number of day pages fetched at the same time when scraping price data
+PRICE_MAX_WORKERS = 8
+
+# Creates one keep-alive session so repeated requests reuse pooled connections
+def get_session(pool_size=PRICE_MAX_WORKERS):
+    session = requests.Session()
+
+    # Size the connection pool to match the number of worker threads
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+### Rate Limiting ###
+
+# Token bucket shared by every API request so concurrent extractions stay under ERCOT's request budget.
+# Tokens refill continuously at `rate` per second up to `burst`; a caller only sleeps when the bucket is empty.
+# clock and sleep can be replaced (e.g. by a fake clock in tests).
+class TokenBucket:
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.wait_time = 0.0 # total seconds callers spent blocked on the limiter
+        self.lock = threading.Lock()
+
+    # Takes a token and returns how long the caller must wait before using it
+    def reserve(self):
+        with self.lock:
+            # Refill the bucket for the time that has passed since the last update
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # Take a token; if none is available, reserve the next one (the balance goes negative)
+            self.tokens -= 1
+            delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            self.wait_time += delay
+
+        count_on_thread('rate_limit_wait_s', delay)
+        return delay
+
+    # Blocks the calling thread until a token is available
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    # Same as acquire() for use inside asyncio code
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def configure(self, rate=None, burst=None):
+        with self.lock:
+            if rate is not None:
+                self.rate = rate
+            if burst is not None:
+                self.burst = burst
+                self.tokens = min(self.tokens, burst)
+
+# ERCOT's public API allows 1 request per 2 seconds
+API_RATE_LIMITER = TokenBucket(rate=0.5, burst=1)
+
+### Request Counters ###
+
+# Counts every HTTP request made by this module (read by metrics.py to attribute slow runs)
+REQUEST_STATS = {'http_requests': 0, 'bytes_downloaded': 0}
+REQUEST_STATS_LOCK = threading.Lock()
+
+# Called with every response when set (replay.Recorder uses it to save responses as fixtures)
+RESPONSE_RECORDER = None
+
+# The counters above are shared by every thread. A thread can also keep counters of its own (see
+# start_thread_counters), so stages that run at the same time (e.g. the four extract branches) each count
+# only their own requests. The worker threads the extract functions start count into the counters of the
+# thread that started them.
+COUNTER_NAMES = ['http_requests', 'bytes_downloaded', 'cache_hits', 'cache_misses', 'rate_limit_wait_s']
+THREAD_COUNTERS = threading.local()
+
+# Returns the counters the current thread counts into
+def get_thread_counters():
+    return getattr(THREAD_COUNTERS, 'stack', [])
+
+def count_on_thread(name, amount=1):
+    stack = get_thread_counters()
+    if stack:
+        with REQUEST_STATS_LOCK:
+            for counters in stack:
+                counters[name] += amount
+
+# Starts counting this thread's requests into new counters (until stop_thread_counters) and returns them
+def start_thread_counters():
+    counters = {name: 0 for name in COUNTER_NAMES}
+    THREAD_COUNTERS.stack = get_thread_counters() + [counters]
+    return counters
+
+def stop_thread_counters(counters):
+    THREAD_COUNTERS.stack = [other for other in get_thread_counters() if other is not counters]
+
+# Runs function(*args) on a worker thread with the counters of the thread that submitted it
+def run_with_counters(stack, function, *args):
+    THREAD_COUNTERS.stack = stack
+    try:
+        return function(*args)
+    finally:
+        THREAD_COUNTERS.stack = []
+
+def record_response(response):
+    with REQUEST_STATS_LOCK:
+        REQUEST_STATS['http_requests'] += 1
+        REQUEST_STATS['bytes_downloaded'] += len(response.content)
+    count_on_thread('http_requests')
+    count_on_thread('bytes_downloaded', len(response.content))
+
+    if RESPONSE_RECORDER is not None:
+        RESPONSE_RECORDER(response)
+
+# Returns a snapshot of the request, cache and rate limiter counters of every thread
+def get_extract_counters():
+    with REQUEST_STATS_LOCK:
+        counters = dict(REQUEST_STATS)
+    counters['cache_hits'] = RESPONSE_CACHE.hits
+    counters['cache_misses'] = RESPONSE_CACHE.misses
+    counters['rate_limit_wait_s'] = API_RATE_LIMITER.wait_time
+    return counters
+
+### Raw Response Cache ###
+
+# Compressed on-disk cache of raw API/HTML responses shared by every extract function
+RESPONSE_CACHE = cache.ResponseCache()
+
+# Set to False to send every request over the network (e.g. when recording or benchmarking)
+RESPONSE_CACHE_ENABLED = True
+
+# Returns the cached response for a key (or None), counting the hit or miss
+def get_cached(key):
+    content = RESPONSE_CACHE.get(key)
+    count_on_thread('cache_hits' if content is not None else 'cache_misses')
+    return content
+
+# Returns True if ERCOT's data for the day is final (it will not change, so its cache entry is immutable)
+def is_finalized(day):
+    if isinstance(day, str):
+        day = datetime.strptime(day.replace('-', '')[:8], '%Y%m%d').date()
+    _, end_date = get_dates()
+    return day <= end_date
+
+# Finds the latest delivery/operating date requested by a set of API parameters
+def get_params_date(params):
+    for name in ('deliveryDateTo', 'operatingDayTo'):
+        if name in params:
+            return str(params[name])
+    return None
+
 def get_dates():
     # Get the current date and time
     today = datetime.today().date()
@@ -24,58 +211,82 @@ def get_dates():
     # returns a timedelta object
     return start_date, end_date
 
-# Get ERCOT API Access Token
-def get_api_token():
+# ERCOT Public API account information
+def get_account_info():
     
     # Account Information 
     USERNAME = REMOVED""
     PASSWORD = REMOVED" "
     SUBSCRIPTION_KEY = REMOVED""
 
-    # Authorization URL for signing into ERCOT Public API account
-    AUTH_URL = "https://ercotb2c.b2clogin.com/ercotb2c.onmicrosoft.com/B2C_1_PUBAPI-ROPC-FLOW/oauth2/v2.0/token"
-
-    # Data payload for POST request
-    data = {
-        'username': USERNAME,
-        'password': PASSWORD,
-        'grant_type': 'password',
-        'scope': 'openid fec253ea-0d06-4272-a5e6-b478baeecd70 offline_access',
-        'client_id': 'fec253ea-0d06-4272-a5e6-b478baeecd70',
-        'response_type': 'id_token'
-        }
-
-    # Sign In/Authenticate
-    auth_response = requests.post(AUTH_URL, data=data)
+    return USERNAME, PASSWORD, SUBSCRIPTION_KEY
 
-    # Retrieve access token
-    access_token = auth_response.json().get("access_token")
-    #print('Access token successfully retrieved!')
+# Get an ERCOT API client (signs in on its first request, then keeps the token refreshed).
+# One client should be shared by every API request in a run so they reuse its connections and token.
+def get_api_client(auth_url=None):
+    USERNAME, PASSWORD, SUBSCRIPTION_KEY = get_account_info()
 
-    return access_token, SUBSCRIPTION_KEY
+    return client.ErcotClient(USERNAME, PASSWORD, SUBSCRIPTION_KEY, auth_url=auth_url or AUTH_URL,
+                              rate_limiter=API_RATE_LIMITER, pool_size=API_MAX_WORKERS,
+                              on_response=record_response)
 
-def query_api(api_endpoint, params, access_token, SUBSCRIPTION_KEY):
+def query_api(api_endpoint, params, api_client, use_cache=True):
+    use_cache = use_cache and RESPONSE_CACHE_ENABLED
 
-    # Define headers
-    headers = {
-        "Authorization": "Bearer " + access_token,
-        "Ocp-Apim-Subscription-Key": SUBSCRIPTION_KEY
-        }
+    # Return the cached response if this exact request was made before
+    key = cache.make_key(api_endpoint, params)
+    if use_cache:
+        content = get_cached(key)
+        if content is not None:
+            return json.loads(content)
 
-    # Send the GET request
-    response = requests.get(api_endpoint, headers=headers, params=params)
+    # Send the GET request (the client waits on the shared rate limiter and retries 429/5xx responses;
+    # it raises requests.HTTPError if the request still fails)
+    response = api_client.get(api_endpoint, params=params)
 
-    # Check if the request was successful
-    
     # Parse the response as JSON
-    if response.status_code == 200:
-        raw_data = response.json()  
-        #print('Data was successfully loaded')
-    else:
-        print(f"Failed to retrieve data. Status code: {response.status_code}")
+    raw_data = response.json()  
+    #print('Data was successfully loaded')
+
+    # Save the raw response (immutable once the requested date is finalized)
+    if use_cache:
+        day = get_params_date(params)
+        RESPONSE_CACHE.put(key, response.content, immutable=day is not None and is_finalized(day))
 
     return raw_data
 
+# Number of rows requested per page from paginated API endpoints
+API_PAGE_SIZE = 10000
+
+# Number of pages that can be in flight at once (the shared rate limiter still applies)
+API_MAX_WORKERS = 4
+
+# Queries every page of a paginated API endpoint and yields each page (a dict with 'data' and '_meta')
+# as it arrives. Page 1 is fetched first to read the total page count; the rest are fetched concurrently,
+# so pages after the first are yielded in completion order, not page order.
+def query_api_pages(api_endpoint, params, api_client, page_size=API_PAGE_SIZE,
+                    max_workers=API_MAX_WORKERS, use_cache=True):
+
+    # Fetch the first page and read the number of pages from its metadata
+    first_page = query_api(api_endpoint, {**params, 'page': 1, 'size': page_size}, api_client, use_cache)
+    yield first_page
+
+    total_pages = first_page.get('_meta', {}).get('totalPages', 1) or 1
+    if total_pages <= 1:
+        RESPONSE_CACHE.save_index()
+        return
+
+    # Fetch the remaining pages concurrently
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_with_counters, get_thread_counters(), query_api, api_endpoint,
+                                   {**params, 'page': page, 'size': page_size}, api_client, use_cache)
+                   for page in range(2, total_pages + 1)]
+        for future in as_completed(futures):
+            yield future.result()
+
+    # Write the cache index once for the whole batch of pages
+    RESPONSE_CACHE.save_index()
+
 #### Queries ERCOT's API for wind and solar power generation data ####
 
 def get_generation_dates():
@@ -115,87 +326,240 @@ def get_generation_dates():
     # returns timedelta dates and string times
     return posted_date, delivery_date, posted_time_from, posted_time_to
 
-def query_generation_data(api_endpoint, access_token, SUBSCRIPTION_KEY):
-    
-    posted_date, delivery_date, posted_time_from, posted_time_to = get_generation_dates()
-    month_of_data = []
+# Queries one delivery day of generation data from the posting made late on the following day
+# (see get_generation_dates). Used for single-day backfill units and days the two-day postings missed.
+def query_generation_day(api_endpoint, delivery_date, api_client):
+    _, _, posted_time_from, posted_time_to = get_generation_dates()
+    posted_date = delivery_date + timedelta(days=1)
 
-    # Get data for the past 30 days
-    for i in range(31):    
+    posted_dt_from = posted_date.strftime('%Y-%m-%d') + posted_time_from
+    #print(f'posted dt from = {posted_dt_from}')
 
-        posted_dt_from = posted_date.strftime('%Y-%m-%d') + posted_time_from
-        #print(f'posted dt from = {posted_dt_from}')
+    posted_dt_to = posted_date.strftime('%Y-%m-%d') + posted_time_to
+    #print(f'posted dt to = {posted_dt_to}')
 
-        posted_dt_to = posted_date.strftime('%Y-%m-%d') + posted_time_to
-        #print(f'posted dt to = {posted_dt_to}')
+    # Define parameters: want to extract just one day
+    params = {
+            "postedDatetimeFrom" : posted_dt_from,
+            "postedDatetimeTo" : posted_dt_to,
+            "deliveryDateFrom": delivery_date,
+            "deliveryDateTo": delivery_date
+            }
+
+    return query_api(api_endpoint, params, api_client)
+
+### Two-Day Postings ###
+
+# Every hourly generation posting holds a rolling 48 hours of actuals, so one posting covers two delivery
+# days. The posting made at 00:55 on day D+2 has the actuals for every hour of days D and D+1: its 48 hours
+# end with the hour ending at 00:00 on D+2 (HE24 of D+1) and start with the hour ending at 01:00 on D
+# (HE1 of D). The hour ending at 01:00 on D+2 is still a forecast and is dropped.
+GENERATION_DAYS_PER_POSTING = 2
+POSTING_TIME_FROM = 'T00:54:00'
+POSTING_TIME_TO = 'T00:56:00'
+
+# Returns the last delivery date of every posting needed for delivery_dates (newest first). Days are paired
+# on a fixed calendar parity (date.toordinal() // 2), not counted back from the newest day, so a day is
+# always read from the same posting and a daily run reuses every cached posting but the newest one.
+def get_posting_dates(delivery_dates, days_per_posting=GENERATION_DAYS_PER_POSTING):
+    last_dates = {day + timedelta(days=days_per_posting - 1 - day.toordinal() % days_per_posting)
+                  for day in delivery_dates}
+    return sorted(last_dates, reverse=True)
+
+# Parameters of the posting that covers `days_per_posting` delivery days ending on last_delivery_date
+def get_posting_params(last_delivery_date, days_per_posting=GENERATION_DAYS_PER_POSTING):
+    first_delivery_date = last_delivery_date - timedelta(days=days_per_posting - 1)
+    posted_date = (last_delivery_date + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    return {
+            "postedDatetimeFrom" : posted_date + POSTING_TIME_FROM,
+            "postedDatetimeTo" : posted_date + POSTING_TIME_TO,
+            "deliveryDateFrom": first_delivery_date,
+            "deliveryDateTo": last_delivery_date
+            }
+
+# Queries the posting that covers `days_per_posting` delivery days ending on last_delivery_date
+def query_generation_posting(api_endpoint, last_delivery_date, api_client, days_per_posting=GENERATION_DAYS_PER_POSTING):
+    return query_api(api_endpoint, get_posting_params(last_delivery_date, days_per_posting), api_client)
+
+# Returns True if the row's hour had not ended when it was posted (it only holds forecasts)
+# Rows are [posted datetime, delivery date, hour ending, ...]
+def is_forecast_row(row):
+    posted = datetime.fromisoformat(str(row[0])[:19])
+    hour_end = datetime.strptime(str(row[1])[:10], '%Y-%m-%d') + timedelta(hours=int(str(row[2]).split(':')[0]))
+    return hour_end > posted
+
+# Splits postings into one response per delivery date (in the order of delivery_dates), the same shape
+# query_generation_day returns. Forecast-only rows are dropped, and hours that appear in more than one
+# posting keep the row from the latest posting.
+def split_generation_postings(postings, delivery_dates):
+    wanted_dates = {day.strftime('%Y-%m-%d') for day in delivery_dates}
+
+    # Keyed by (delivery date, hour ending, DST flag) so the repeated fall-back hour is kept
+    latest_rows = {}
+    for posting in postings:
+        for row in posting.get('data') or []:
+            date = str(row[1])[:10]
+            if date not in wanted_dates or is_forecast_row(row):
+                continue
+            key = (date, row[2], row[-1])
+            if key not in latest_rows or str(row[0]) > str(latest_rows[key][0]):
+                latest_rows[key] = row
+
+    rows_by_date = {}
+    for (date, _, _), row in latest_rows.items():
+        rows_by_date.setdefault(date, []).append(row)
+
+    return [{'data': rows_by_date.get(day.strftime('%Y-%m-%d'), [])} for day in delivery_dates]
+
+def query_generation_data(api_endpoint, api_client, days=31):
+    
+    _, delivery_date, _, _ = get_generation_dates()
 
-        # Define parameters: want to extract just one day
-        params = {
-                "postedDatetimeFrom" : posted_dt_from,
-                "postedDatetimeTo" : posted_dt_to,
-                "deliveryDateFrom": delivery_date,
-                "deliveryDateTo": delivery_date
-                }
+    # Get data for the past 30 days (going backwards in time), one posting for every two delivery days
+    delivery_dates = [delivery_date - timedelta(days=i) for i in range(days)]
+    posting_dates = get_posting_dates(delivery_dates)
+    postings = []
+    for i, posting_date in enumerate(posting_dates):
 
-        day_of_data = query_api(api_endpoint, params, access_token, SUBSCRIPTION_KEY)
-        #print(day_of_data)
+        # (query_api waits on the shared rate limiter, so no sleep is needed here)
+        postings.append(query_generation_posting(api_endpoint, posting_date, api_client))
 
-        month_of_data.append(day_of_data)
+        if i % 2 == 0:
+            print(f'{round(i/len(posting_dates) * 100)}% done extracting data...')
 
-        # update dates: go backwards in time
-        posted_date -= timedelta(days=1)
-        delivery_date -= timedelta(days=1)
+    month_of_data = split_generation_postings(postings, delivery_dates)
 
-        # Sleep to avoid hitting the rate limit (1 request per 2 seconds)
-        time.sleep(2)
-        if i%3==0:
-            print(f'{i/30 * 100}% done extracting data...')
+    # A day can be incomplete if the 48-hour window did not reach back to its first hour (e.g. the extra
+    # hour when clocks fall back), so query those days on their own
+    for i, day_of_data in enumerate(month_of_data):
+        if len(day_of_data['data']) < 24:
+            single_day = query_generation_day(api_endpoint, delivery_dates[i], api_client)
+            if len(single_day.get('data') or []) > len(day_of_data['data']):
+                month_of_data[i] = single_day
+
+    # Write the cache index once for the whole batch of postings
+    RESPONSE_CACHE.save_index()
     
     print('################################\nSuccessfully extracted data from API\n')
     return month_of_data
 
-def get_wind_data(access_token, SUBSCRIPTION_KEY):
-    # Wind Power Production - Hourly Averaged Actual and Forecasted Values by Geographical Region
-    api_endpoint = "https://api.ercot.com/api/public-reports/np4-742-cd/wpp_hrly_actual_fcast_geo"
+# Wind Power Production - Hourly Averaged Actual and Forecasted Values by Geographical Region
+WIND_API_PATH = "/np4-742-cd/wpp_hrly_actual_fcast_geo"
+WIND_API_ENDPOINT = API_BASE_URL + WIND_API_PATH
+
+# Solar Power Production - Hourly Averaged Actual and Forecasted Values by Geographical Region
+SOLAR_API_PATH = "/np4-745-cd/spp_hrly_actual_fcast_geo"
+SOLAR_API_ENDPOINT = API_BASE_URL + SOLAR_API_PATH
+
+def get_wind_data(api_client, api_endpoint=None):
+    api_endpoint = api_endpoint or WIND_API_ENDPOINT
     
-    print('It will take approx. 1 minute to extract wind data\n################################')
-    raw_wind_data = query_generation_data(api_endpoint, access_token, SUBSCRIPTION_KEY)
+    print('It will take approx. 30 seconds to extract wind data\n################################')
+    raw_wind_data = query_generation_data(api_endpoint, api_client)
 
     return raw_wind_data
 
-def get_solar_data(access_token, SUBSCRIPTION_KEY):
-    # Solar Power Production - Hourly Averaged Actual and Forecasted Values by Geographical Region
-    api_endpoint = "https://api.ercot.com/api/public-reports/np4-745-cd/spp_hrly_actual_fcast_geo"
+def get_solar_data(api_client, api_endpoint=None):
+    api_endpoint = api_endpoint or SOLAR_API_ENDPOINT
 
-    print('It will take approx. 1 minute to extract solar data\n################################')
-    raw_solar_data = query_generation_data(api_endpoint, access_token, SUBSCRIPTION_KEY)
+    print('It will take approx. 30 seconds to extract solar data\n################################')
+    raw_solar_data = query_generation_data(api_endpoint, api_client)
 
     return raw_solar_data
 
 ### Get the past 30 days of electricity grid load data from ERCOT's API ### 
 
-def get_load_data(access_token, SUBSCRIPTION_KEY):
-    # Define API Endpoint for Grid Load Data
-    api_endpoint = "https://api.ercot.com/api/public-reports/np6-345-cd/act_sys_load_by_wzn"
+# Define API Endpoint for Grid Load Data
+LOAD_API_PATH = "/np6-345-cd/act_sys_load_by_wzn"
+LOAD_API_ENDPOINT = API_BASE_URL + LOAD_API_PATH
+
+# Returns a list of response pages. With stream=True it returns a generator instead, so each page can be
+# passed to transform.flatten_dictionaries as soon as it arrives.
+# start_date and end_date default to the past 30 days (see get_dates).
+def get_load_data(api_client, page_size=API_PAGE_SIZE, stream=False, start_date=None,
+                  end_date=None, quiet=False, api_endpoint=None):
+    api_endpoint = api_endpoint or LOAD_API_ENDPOINT
 
     # Define parameters
-    start_date, end_date = get_dates()
+    if start_date is None or end_date is None:
+        start_date, end_date = get_dates()
     params = {
         "operatingDayFrom": start_date.strftime('%Y-%m-%d'),
         "operatingDayTo": end_date.strftime('%Y-%m-%d'),
         }
 
-    raw_load_data = query_api(api_endpoint, params, access_token, SUBSCRIPTION_KEY)
-    print('Successfully extracted load data from API\n')
+    # Only single-day requests (e.g. backfill units) are cached. The key of a range request changes every
+    # day as the trailing window moves, so its cached response would never be read again.
+    use_cache = start_date == end_date
+
+    # Fetch every page of the response
+    raw_load_data = query_api_pages(api_endpoint, params, api_client, page_size, use_cache=use_cache)
+    if stream:
+        return raw_load_data
+
+    raw_load_data = list(raw_load_data)
+    if not quiet:
+        print('Successfully extracted load data from API\n')
 
     return raw_load_data
 
+### Get real-time settlement point prices (every resource node, hub and load zone) from ERCOT's API ###
+
+# Settlement Point Prices at Resource Nodes, Hubs and Load Zones (15-minute real-time prices)
+NODE_PRICE_API_PATH = "/np6-905-cd/spp_node_zone_hub"
+NODE_PRICE_API_ENDPOINT = API_BASE_URL + NODE_PRICE_API_PATH
+
+# Returns a generator of response pages with the real-time prices of every settlement point (or only the
+# settlement_points given) from start_date to end_date, so each page can be converted as soon as it
+# arrives (see prices.node_pages_to_long). start_date and end_date default to the past 30 days.
+def get_node_price_data(api_client, start_date=None, end_date=None, settlement_points=None,
+                        page_size=API_PAGE_SIZE, api_endpoint=None):
+    api_endpoint = api_endpoint or NODE_PRICE_API_ENDPOINT
+
+    if start_date is None or end_date is None:
+        start_date, end_date = get_dates()
+    params = {
+        "deliveryDateFrom": start_date.strftime('%Y-%m-%d'),
+        "deliveryDateTo": end_date.strftime('%Y-%m-%d'),
+        }
+
+    # The API filters on one settlement point at a time
+    if not settlement_points:
+        yield from query_api_pages(api_endpoint, params, api_client, page_size)
+    for settlement_point in settlement_points or []:
+        yield from query_api_pages(api_endpoint, {**params, "settlementPoint": settlement_point}, api_client, page_size)
+
 ###############################################
 ### Extract HTML Data on Electricity Prices ###
 ###############################################
 
 ## Define HTML Extraction Methods ##
 
+# DAM settlement point prices page, with a placeholder for the date (yyyymmdd)
+PRICE_PAGE = "/{}_dam_spp.html"
+PRICE_URL = PRICE_BASE_URL + PRICE_PAGE
+
+# Real-time settlement point prices page (15-minute intervals), with a placeholder for the date (yyyymmdd)
+RT_PRICE_PAGE = "/{}_real_time_spp.html"
+RT_PRICE_URL = PRICE_BASE_URL + RT_PRICE_PAGE
+
+# Points every endpoint at new base URLs (arguments left as None keep their current base URL)
+def set_base_urls(api_base_url=None, price_base_url=None, auth_url=None):
+    global API_BASE_URL, PRICE_BASE_URL, AUTH_URL
+    global LOAD_API_ENDPOINT, WIND_API_ENDPOINT, SOLAR_API_ENDPOINT, NODE_PRICE_API_ENDPOINT, PRICE_URL, RT_PRICE_URL
+
+    API_BASE_URL = (api_base_url or API_BASE_URL).rstrip('/')
+    PRICE_BASE_URL = (price_base_url or PRICE_BASE_URL).rstrip('/')
+    AUTH_URL = auth_url or AUTH_URL
+
+    LOAD_API_ENDPOINT = API_BASE_URL + LOAD_API_PATH
+    WIND_API_ENDPOINT = API_BASE_URL + WIND_API_PATH
+    SOLAR_API_ENDPOINT = API_BASE_URL + SOLAR_API_PATH
+    NODE_PRICE_API_ENDPOINT = API_BASE_URL + NODE_PRICE_API_PATH
+    PRICE_URL = PRICE_BASE_URL + PRICE_PAGE
+    RT_PRICE_URL = PRICE_BASE_URL + RT_PRICE_PAGE
+
 ## ****** add feedback messages to HTML extraction *******
 
 # Generate list of dates to extract data from
@@ -208,17 +572,77 @@ def get_price_data_dates():
         date += timedelta(1)
     return dates_list
 
-def scrape_price_data(date, api_endpoint):
+# Retries for a price page that is throttled (429), hits a temporary server error (5xx) or a network error
+PRICE_MAX_RETRIES = 5
+
+# Price pages are requested with a timeout (seconds) so a stalled connection is retried instead of hanging
+PRICE_TIMEOUT = 60
+
+# Downloads a price page, retrying like client.ErcotClient.get (jittered backoff, honoring Retry-After).
+# Returns the response for 200 and 404 (a page that is not posted). Raises requests.HTTPError for other
+# errors, or once the retries run out.
+def download_price_page(url, session=None, max_retries=None):
+    max_retries = PRICE_MAX_RETRIES if max_retries is None else max_retries
+    attempt = 0
+
+    while True:
+        try:
+            response = (session or requests).get(url, timeout=PRICE_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries:
+                raise
+            time.sleep(client.get_retry_delay(attempt))
+            attempt += 1
+            continue
+
+        record_response(response)
+
+        if response.status_code in (200, 404):
+            return response
+
+        if response.status_code in client.RETRY_STATUS_CODES and attempt < max_retries:
+            time.sleep(client.get_retry_delay(attempt, response))
+            attempt += 1
+            continue
+
+        print(f"Failed to retrieve price page. Status code: {response.status_code}")
+        raise requests.HTTPError(f"{response.status_code} error for {url}", response=response)
+
+# Downloads (or reads from the cache) the raw HTML page for one date. Returns None if the page is not posted.
+def fetch_price_page(date, api_endpoint, session=None, use_cache=True):
     
     # Construct the URL by formatting the base URL with the date
     url = api_endpoint.format(date)
-    
-    # Open the webpage for the current date
-    opened_webpage = requests.get(url)
-    #print(f"Webpage for 2024-09-{date} opened successfully...")
-    
+
+    # Use the cached page if it was downloaded before
+    use_cache = use_cache and RESPONSE_CACHE_ENABLED
+    key = cache.make_key(url)
+    content = get_cached(key) if use_cache else None
+
+    if content is None:
+        # Open the webpage for the current date (reuse the pooled session if one was given)
+        opened_webpage = download_price_page(url, session)
+        #print(f"Webpage for 2024-09-{date} opened successfully...")
+
+        # A missing page is returned as None (transform fills the day), and never cached
+        if opened_webpage.status_code == 404:
+            return None
+
+        content = opened_webpage.content
+        if use_cache:
+            RESPONSE_CACHE.put(key, content, immutable=is_finalized(date))
+
+    return content
+
+## HTML Table Parsers ##
+# Each parser returns the <td> text of every table row as a list of strings, skipping rows without <td>
+# cells (header rows). All parsers produce identical output.
+
+# Parses the page into a full BeautifulSoup tree (slowest, most forgiving)
+def parse_price_page_bs4(content):
+
     # Initialize a BeautifulSoup object to read and parse the webpage
-    bs = BeautifulSoup(opened_webpage.content, "html.parser")
+    bs = BeautifulSoup(content, "html.parser")
     #print(f"Webpage for 2024-09-{date} loaded and parsed successfully...")
 
     # Define an empty list where the data will be kept
@@ -244,26 +668,140 @@ def scrape_price_data(date, api_endpoint):
     
     return day_of_raw_data    
 
+# Parses the page with lxml's C parser and reads the table cells with one XPath query
+def parse_price_page_lxml(content):
+    document = lxml_html.fromstring(content)
+
+    day_of_raw_data = []
+    for row in document.xpath('//table//tr[td]'):
+        day_of_raw_data.append([cell.text_content().strip() for cell in row.iter('td')])
+
+    return day_of_raw_data
+
+# Streams through the page with the standard library tokenizer without building a tree
+class PriceTableParser(HTMLParser):
+
+    def __init__(self):
+        super().__init__()
+        self.table_depth = 0
+        self.row = None
+        self.cell = None
+        self.rows = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self.table_depth += 1
+        elif self.table_depth == 0:
+            return
+        elif tag == 'tr':
+            self.end_row()
+            self.row = []
+        elif tag == 'td' and self.row is not None:
+            self.end_cell()
+            self.cell = []
+
+    def handle_endtag(self, tag):
+        if tag == 'td':
+            self.end_cell()
+        elif tag == 'tr':
+            self.end_row()
+        elif tag == 'table' and self.table_depth > 0:
+            self.end_row()
+            self.table_depth -= 1
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+    def end_cell(self):
+        if self.cell is not None:
+            self.row.append(''.join(self.cell).strip())
+            self.cell = None
+
+    def end_row(self):
+        self.end_cell()
+        if self.row:
+            self.rows.append(self.row)
+        self.row = None
+
+def parse_price_page_stream(content):
+    parser = PriceTableParser()
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    parser.feed(content)
+    parser.close()
+    parser.end_row()
+    return parser.rows
+
+PRICE_PARSERS = {
+    'bs4': parse_price_page_bs4,
+    'lxml': parse_price_page_lxml,
+    'stream': parse_price_page_stream,
+    }
+
+# Use lxml when it is installed, otherwise fall back to BeautifulSoup
+PRICE_PARSER = 'lxml' if lxml_html is not None else 'bs4'
+
+def parse_price_page(content, parser=None):
+    parser = parser or PRICE_PARSER
+
+    # A page that is not posted has no rows
+    if content is None:
+        return []
+
+    # lxml is optional, so fall back to BeautifulSoup if it is missing
+    if parser == 'lxml' and lxml_html is None:
+        parser = 'bs4'
+
+    return PRICE_PARSERS[parser](content)
+
+def scrape_price_data(date, api_endpoint, session=None, use_cache=True, parser=None):
+    content = fetch_price_page(date, api_endpoint, session, use_cache)
+    return parse_price_page(content, parser)
+
 # The raw_price_data is formatted as nested lists. Each day (i.e., 12/18/2024) is a single list inside the main list. Each hour (i.e., 12/18/2024 at hour ending 11:00) is a list inside of the day.
 # [ day1[ [hour1], [hour2], ..., [hour24] ],
 #   day2[ [hour1], [hour2], ..., [hour24] ],
 #   day3[ [hour1], [hour2], ..., [hour24] ],
 #   ... 
 # ]
-def get_price_data():
-    
-    # Define the base URL with a placeholder for the date
-    api_endpoint = "https://www.ercot.com/content/cdr/html/{}_dam_spp.html"
+#
+# Day pages are fetched concurrently by a bounded pool of worker threads that share one keep-alive
+# session. Results are still returned in date order. With parse_workers set, the pages are downloaded
+# first and then parsed in a pool of that many processes.
+def get_price_data(dates=None, max_workers=PRICE_MAX_WORKERS, api_endpoint=None, parser=None, parse_workers=None):
 
-    # Generate list of past 30 days (just dd, not mm or yyyy) (strings)
-    dates = get_price_data_dates()
-
-    # Loop over each date, construct the URL, and extract data
-    raw_price_data = []
-    for date in dates:
-        day = scrape_price_data(date, api_endpoint)
-        raw_price_data.append(day)
+    # Define the base URL with a placeholder for the date
+    api_endpoint = api_endpoint or PRICE_URL
+
+    # Generate list of past 30 days (yyyymmdd strings)
+    if dates is None:
+        dates = get_price_data_dates()
+
+    # Fetch one page per date; executor.map keeps the results in the same order as the dates
+    counters = get_thread_counters()
+    with get_session(max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if parse_workers:
+                pages = list(executor.map(
+                    lambda date: run_with_counters(counters, fetch_price_page, date, api_endpoint, session), dates))
+            else:
+                raw_price_data = list(executor.map(
+                    lambda date: run_with_counters(counters, scrape_price_data, date, api_endpoint, session, True, parser),
+                    dates))
+
+    # Write the cache index once for the whole batch of pages
+    RESPONSE_CACHE.save_index()
+
+    # Parse the downloaded pages on multiple CPU cores
+    if parse_workers:
+        with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+            raw_price_data = list(executor.map(parse_price_page, pages, [parser] * len(pages)))
     
     print('Successfully extracted price data\n')
     
-    return raw_price_data
\ No newline at end of file
+    return raw_price_data
+
+# Scrapes the real-time price pages: same shape as get_price_data, with 96 rows (15-minute intervals) per day
+def get_rt_price_data(dates=None, max_workers=PRICE_MAX_WORKERS, parser=None):
+    return get_price_data(dates, max_workers, RT_PRICE_URL, parser)
\ No newline at end of file
@@ -0,0 +1,196 @@
+# Import Libraries
+import numpy as np
+import pandas as pd
+import extract_transform_load.array_store as array_store
+
+###########################
+### FEATURE ENGINEERING ###
+###########################
+
+# Builds lag, rolling-window and ratio features for the price model over the continuous hourly index
+# (hours missing from the data are NaN, and windows run across day boundaries instead of restarting each
+# day). Every kernel works on a 2D array of all the columns at once:
+#   lags:    values shifted down by k hours
+#   rolling: mean/std from cumulative sums, max from a strided sliding-window view
+#   ratios:  a / (b + RATIO_EPSILON)
+# Windows use min_periods=1 like pandas' rolling(window, min_periods=1) (std needs 2 values, ddof=1).
+
+# Features built by default (the ones the notebook's model uses)
+FEATURE_SPEC = {
+    'lags': {'Price_Hub_Avg': [1]},
+    'rolling': {
+        'Price_Hub_Avg': {'mean': [3]},
+        'Load_Total': {'mean': [3]},
+        },
+    'ratios': [('Wind_SystemWide', 'Solar_SystemWide')],
+    }
+
+# Added to the denominator of ratios so hours with zero generation (e.g. solar at night) don't divide by zero
+RATIO_EPSILON = 1e-6
+
+### Window Kernels ###
+
+# Shifts every column down by k rows (the first k rows are NaN)
+def lag(values, k):
+    lagged = np.full(values.shape, np.nan)
+    if k < len(values):
+        lagged[k:] = values[:len(values) - k]
+    return lagged
+
+# Sums and counts of the non-NaN values in each trailing window, from cumulative sums
+def rolling_sum_count(values, window, power=1):
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0) ** power
+
+    # Prefix sums with a leading row of zeros: window sum at row i = cumsum[i + 1] - cumsum[i + 1 - window]
+    zeros = np.zeros((1, values.shape[1]))
+    sums = np.concatenate([zeros, np.cumsum(filled, axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(present, axis=0)])
+
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    return sums[end] - sums[start], counts[end] - counts[start]
+
+def rolling_mean(values, window):
+    sums, counts = rolling_sum_count(values, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+def rolling_std(values, window):
+    # Center each column first so the sums of squares don't lose precision
+    centered = values - np.nanmean(values, axis=0) if np.isfinite(values).any() else values
+    sums, counts = rolling_sum_count(centered, window)
+    squares, _ = rolling_sum_count(centered, window, power=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (squares - sums ** 2 / counts) / (counts - 1)
+    return np.where(counts > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+def rolling_max(values, window):
+    # Pad the start with NaNs so every row has a full window, then reduce a strided view (no copy)
+    padded = np.concatenate([np.full((window - 1, values.shape[1]), np.nan), values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+    return np.fmax.reduce(windows, axis=-1)
+
+ROLLING_KERNELS = {'mean': rolling_mean, 'std': rolling_std, 'max': rolling_max}
+
+### Building Features ###
+
+# Returns every column the spec reads
+def get_input_columns(spec):
+    columns = list(spec.get('lags', {})) + list(spec.get('rolling', {}))
+    for numerator, denominator in spec.get('ratios', []):
+        columns += [numerator, denominator]
+    return list(dict.fromkeys(columns))
+
+# Returns how many earlier hours a feature row depends on
+def get_lookback(spec):
+    lags = [k for ks in spec.get('lags', {}).values() for k in ks]
+    windows = [w - 1 for stats in spec.get('rolling', {}).values() for ws in stats.values() for w in ws]
+    return max(lags + windows + [0])
+
+# Puts a merged dataframe (see load.merge_df, indexed by Timestamp) on a continuous range of epoch hours.
+# Returns (epoch hours, 2D float64 array with one column per input column); missing hours are NaN.
+def to_hourly_matrix(df, columns):
+    hours = array_store.to_epoch_hours(df.index)
+    keep = ~pd.Index(hours).duplicated(keep='last')
+    hours = hours[keep]
+
+    all_hours = np.arange(hours.min(), hours.max() + 1, dtype=np.int32) if len(hours) else hours
+    values = np.full((len(all_hours), len(columns)), np.nan)
+    positions = hours - (all_hours[0] if len(all_hours) else 0)
+    for i, column in enumerate(columns):
+        if column in df.columns:
+            values[positions, i] = df[column].to_numpy(dtype=np.float64)[keep]
+
+    return all_hours, values
+
+# Computes the features of a continuous hourly matrix. Returns {feature name: array}.
+def compute_features(values, columns, spec):
+    position = {column: i for i, column in enumerate(columns)}
+    features = {}
+
+    # Lags (every column with the same lag is shifted in one call)
+    lag_columns = {}
+    for column, ks in spec.get('lags', {}).items():
+        for k in ks:
+            lag_columns.setdefault(k, []).append(column)
+    for k, lag_cols in lag_columns.items():
+        lagged = lag(values[:, [position[col] for col in lag_cols]], k)
+        for i, column in enumerate(lag_cols):
+            features[f'{column}_lag{k}'] = lagged[:, i]
+
+    # Rolling statistics (grouped by statistic and window)
+    rolling_columns = {}
+    for column, stats in spec.get('rolling', {}).items():
+        for stat, windows in stats.items():
+            for window in windows:
+                rolling_columns.setdefault((stat, window), []).append(column)
+    for (stat, window), rolling_cols in rolling_columns.items():
+        rolled = ROLLING_KERNELS[stat](values[:, [position[col] for col in rolling_cols]], window)
+        for i, column in enumerate(rolling_cols):
+            features[f'{column}_roll{window}_{stat}'] = rolled[:, i]
+
+    # Ratios
+    for numerator, denominator in spec.get('ratios', []):
+        features[f'{numerator}_{denominator}_ratio'] = \
+            values[:, position[numerator]] / (values[:, position[denominator]] + RATIO_EPSILON)
+
+    return features
+
+# Builds the feature matrix of a merged dataframe, indexed by every hour from its first to its last
+def build_features(df, spec=FEATURE_SPEC):
+    columns = get_input_columns(spec)
+    hours, values = to_hourly_matrix(df, columns)
+    return pd.DataFrame(compute_features(values, columns, spec), index=array_store.from_epoch_hours(hours))
+
+# Keeps a feature matrix up to date as new hours arrive. Only the last get_lookback(spec) hours of inputs
+# are kept, so extending the matrix never recomputes the history.
+#   builder = FeatureBuilder()
+#   features = builder.build(history_df)
+#   features = builder.extend(new_hours_df)
+class FeatureBuilder:
+
+    def __init__(self, spec=FEATURE_SPEC):
+        self.spec = spec
+        self.columns = get_input_columns(spec)
+        self.lookback = get_lookback(spec)
+        self.tail_hours = np.empty(0, dtype=np.int32)
+        self.tail_values = np.empty((0, len(self.columns)))
+        self.features = None
+
+    def keep_tail(self, hours, values):
+        start = max(0, len(hours) - self.lookback)
+        self.tail_hours = hours[start:]
+        self.tail_values = values[start:]
+
+    def build(self, df):
+        hours, values = to_hourly_matrix(df, self.columns)
+        self.features = pd.DataFrame(compute_features(values, self.columns, self.spec),
+                                     index=array_store.from_epoch_hours(hours))
+        self.keep_tail(hours, values)
+        return self.features
+
+    # Adds the features of hours after the last built hour. Hours at or before it are ignored.
+    def extend(self, new_df):
+        if self.features is None:
+            return self.build(new_df)
+
+        last_hour = int(array_store.to_epoch_hours(self.features.index[-1:])[0])
+        new_df = new_df[array_store.to_epoch_hours(new_df.index) > last_hour]
+        if new_df.empty:
+            return self.features
+
+        # Inputs for the kept tail, any gap after it, and the new hours
+        new_hours, new_values = to_hourly_matrix(new_df, self.columns)
+        gap_hours = np.arange(last_hour + 1, new_hours[0], dtype=np.int32)
+        hours = np.concatenate([self.tail_hours, gap_hours, new_hours])
+        values = np.concatenate([self.tail_values, np.full((len(gap_hours), len(self.columns)), np.nan), new_values])
+
+        # Only the rows after the tail are new features
+        new_features = compute_features(values, self.columns, self.spec)
+        new_rows = pd.DataFrame({name: feature[len(self.tail_hours):] for name, feature in new_features.items()},
+                                index=array_store.from_epoch_hours(hours[len(self.tail_hours):]))
+
+        self.features = pd.concat([self.features, new_rows])
+        self.keep_tail(hours, values)
+        return self.features
@@ -0,0 +1,225 @@
+# Import Libraries
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import extract_transform_load.array_store as array_store
+import extract_transform_load.features as features
+import extract_transform_load.load as load
+import extract_transform_load.query as query
+
+# xgboost is only needed to train the price model
+try:
+    import xgboost as xgb
+except ImportError:
+    xgb = None
+
+################################
+### WALK-FORWARD BACKTESTING ###
+################################
+
+# Evaluates the price model on many train/test windows instead of the notebook's single split. The
+# stored data is put on the continuous hourly index and split into folds that walk forward in time:
+#   expanding: every fold trains on all hours before its test window
+#   sliding:   every fold trains on the `train_days` before its test window
+# The feature matrix is built once and saved as a .npy file that every worker process opens as a
+# read-only memory map, so the workers share one copy instead of receiving a pickled matrix each.
+# Each fold's MAE, timings and model are cached in backtest_cache/, keyed by the fold's data and the
+# model parameters, so a re-run (e.g. after new hours are loaded) only trains the folds that changed.
+
+# Define the default cache folder (next to the clean_data folder)
+BACKTEST_CACHE_DIRECTORY = Path(__file__).resolve().parent.parent / "backtest_cache"
+
+TARGET = 'Price_Hub_Avg'
+
+# Model inputs: the notebook's columns and features. The notebook's 3-hour price mean includes the hour
+# being predicted, so the backtest only uses lagged prices.
+EXOGENOUS_COLUMNS = ['Load_Total', 'Wind_SystemWide', 'Solar_SystemWide']
+MODEL_SPEC = {
+    'lags': {TARGET: [1, 2, 24, 168]},
+    'rolling': {'Load_Total': {'mean': [3]}},
+    'ratios': [('Wind_SystemWide', 'Solar_SystemWide')],
+    }
+
+# The notebook's model
+MODEL_PARAMS = {'n_estimators': 200, 'max_depth': 5, 'learning_rate': 0.1, 'random_state': 42}
+
+# Default fold sizes
+TRAIN_DAYS = 14
+TEST_DAYS = 1
+STEP_DAYS = 1
+
+BACKTEST_MAX_WORKERS = 4
+
+def require_xgboost():
+    if xgb is None:
+        raise ImportError('Backtesting the price model requires xgboost (pip install xgboost)')
+
+### Feature Matrix ###
+
+# Builds the model matrix of a merged dataframe on the continuous hourly index.
+# Returns (epoch hours, float32 matrix with the target in column 0, feature names of columns 1+).
+def build_model_matrix(df, spec=MODEL_SPEC):
+    columns = list(dict.fromkeys([TARGET] + EXOGENOUS_COLUMNS + features.get_input_columns(spec)))
+    hours, values = features.to_hourly_matrix(df, columns)
+    computed = features.compute_features(values, columns, spec)
+
+    # Calendar features (ERCOT hour ending and weekday)
+    dates, local_hours = load.local_dates_and_hours(array_store.from_epoch_hours(hours))
+    calendar = {'Hour': local_hours, 'Weekday': dates.dayofweek.to_numpy()}
+
+    names = EXOGENOUS_COLUMNS + list(calendar) + list(computed)
+    matrix = np.column_stack([values[:, columns.index(TARGET)]]
+                             + [values[:, columns.index(col)] for col in EXOGENOUS_COLUMNS]
+                             + list(calendar.values()) + list(computed.values()))
+
+    # xgboost trains on float32, so storing float32 saves each worker a converted copy
+    return hours, matrix.astype(np.float32), names
+
+### Folds ###
+
+# Returns (train_start, test_start, test_end) row positions of every fold
+def get_folds(n_hours, mode='expanding', train_days=TRAIN_DAYS, test_days=TEST_DAYS, step_days=STEP_DAYS):
+    if mode not in ('expanding', 'sliding'):
+        raise ValueError(f'mode must be expanding or sliding (got {mode})')
+
+    train_hours, test_hours, step_hours = train_days * 24, test_days * 24, step_days * 24
+    folds = []
+    test_start = train_hours
+    while test_start + test_hours <= n_hours:
+        folds.append((0 if mode == 'expanding' else test_start - train_hours, test_start, test_start + test_hours))
+        test_start += step_hours
+    return folds
+
+# Builds the cache key of a fold from its rows, its split point and the model parameters
+def get_fold_key(matrix, fold, names, params):
+    train_start, test_start, test_end = fold
+    key = hashlib.sha256(json.dumps([names, params, test_start - train_start], sort_keys=True).encode('utf-8'))
+    key.update(np.ascontiguousarray(matrix[train_start:test_end]).tobytes())
+    return key.hexdigest()
+
+### Workers ###
+
+# The shared feature matrix, opened once per worker process
+worker_matrix = None
+
+def init_worker(matrix_path):
+    global worker_matrix
+    worker_matrix = np.load(matrix_path, mmap_mode='r')
+
+# Trains and evaluates one fold, saves its model and result to the cache, and returns the result
+def run_fold(fold, params, n_jobs, cache_path):
+    train_start, test_start, test_end = fold
+    train = worker_matrix[train_start:test_start]
+    test = worker_matrix[test_start:test_end]
+
+    # Hours without a price can't be used for training or scoring
+    train = train[~np.isnan(train[:, 0])]
+    test = test[~np.isnan(test[:, 0])]
+    result = {'train_rows': len(train), 'test_rows': len(test), 'mae': None, 'train_s': 0.0, 'predict_s': 0.0}
+    if not len(train) or not len(test):
+        return result
+
+    start = time.perf_counter()
+    model = xgb.XGBRegressor(**params, n_jobs=n_jobs)
+    model.fit(train[:, 1:], train[:, 0])
+    result['train_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = model.predict(test[:, 1:])
+    result['predict_s'] = time.perf_counter() - start
+    result['mae'] = float(np.mean(np.abs(predictions - test[:, 0])))
+
+    model.save_model(Path(cache_path).with_suffix('.ubj'))
+    tmp_path = Path(cache_path).with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(result))
+    tmp_path.replace(cache_path)
+    return result
+
+### Backtest ###
+
+# Runs a walk-forward backtest. Returns one row per fold: its train/test windows, MAE, timings and whether
+# the result came from the cache.
+def backtest(df, mode='expanding', train_days=TRAIN_DAYS, test_days=TEST_DAYS, step_days=STEP_DAYS,
+             params=MODEL_PARAMS, max_workers=BACKTEST_MAX_WORKERS, cache_directory=BACKTEST_CACHE_DIRECTORY):
+    require_xgboost()
+    cache_directory = Path(cache_directory)
+    cache_directory.mkdir(parents=True, exist_ok=True)
+
+    hours, matrix, names = build_model_matrix(df)
+    folds = get_folds(len(hours), mode, train_days, test_days, step_days)
+    keys = [get_fold_key(matrix, fold, names, params) for fold in folds]
+
+    # Reuse the cached folds
+    results = {}
+    for i, key in enumerate(keys):
+        cache_path = cache_directory / f'{key}.json'
+        if cache_path.exists():
+            results[i] = {**json.loads(cache_path.read_text()), 'cached': True}
+
+    # Train the others in a process pool that shares the matrix through a memory map
+    todo = [i for i in range(len(folds)) if i not in results]
+    if todo:
+        workers = min(max_workers, len(todo))
+        n_jobs = max(1, (os.cpu_count() or 1) // workers)
+        with tempfile.TemporaryDirectory() as directory:
+            matrix_path = Path(directory) / 'matrix.npy'
+            np.save(matrix_path, matrix)
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(matrix_path,)) as executor:
+                futures = {executor.submit(run_fold, folds[i], params, n_jobs, cache_directory / f'{keys[i]}.json'): i
+                           for i in todo}
+                for future in as_completed(futures):
+                    results[futures[future]] = {**future.result(), 'cached': False}
+
+    timestamps = array_store.from_epoch_hours(hours)
+    table = pd.DataFrame([{
+        'Fold': i + 1,
+        'Train_Start': timestamps[train_start],
+        'Test_Start': timestamps[test_start],
+        'Test_End': timestamps[test_end - 1],
+        'Train_Rows': results[i]['train_rows'],
+        'Test_Rows': results[i]['test_rows'],
+        'MAE': results[i]['mae'],
+        'Train_s': results[i]['train_s'],
+        'Predict_s': results[i]['predict_s'],
+        'Cached': results[i]['cached'],
+        } for i, (train_start, test_start, test_end) in enumerate(folds)])
+    return table.set_index('Fold').astype({'MAE': np.float64})
+
+def print_summary(table):
+    with pd.option_context('display.max_rows', 200, 'display.width', 200, 'display.float_format', '{:.3f}'.format):
+        print(table)
+    trained = table[~table['Cached']]
+    print(f"\n{len(table)} folds ({len(trained)} trained, {int(table['Cached'].sum())} cached): "
+          f"MAE mean {table['MAE'].mean():.2f}, std {table['MAE'].std():.2f}, "
+          f"training time {trained['Train_s'].sum():.1f} s\n")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Walk-forward backtest of the price model')
+    arg_parser.add_argument('--mode', default='expanding', choices=['expanding', 'sliding'])
+    arg_parser.add_argument('--train-days', type=int, default=TRAIN_DAYS, help='first (expanding) or every (sliding) training window')
+    arg_parser.add_argument('--test-days', type=int, default=TEST_DAYS)
+    arg_parser.add_argument('--step-days', type=int, default=STEP_DAYS)
+    arg_parser.add_argument('--start', default=None, help='first ERCOT date (yyyy-mm-dd)')
+    arg_parser.add_argument('--end', default=None, help='last ERCOT date (yyyy-mm-dd)')
+    arg_parser.add_argument('--workers', type=int, default=BACKTEST_MAX_WORKERS)
+    arg_parser.add_argument('--output', default=None, help='also save the fold table as CSV')
+    args = arg_parser.parse_args()
+
+    columns = list(dict.fromkeys([TARGET] + EXOGENOUS_COLUMNS + features.get_input_columns(MODEL_SPEC)))
+    df = query.QueryService().query(columns, args.start, args.end)
+
+    table = backtest(df, args.mode, args.train_days, args.test_days, args.step_days, max_workers=args.workers)
+    print_summary(table)
+    if args.output:
+        table.to_csv(args.output)
+        print(f"Fold table saved to: {args.output}\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+### IMPORT LIBRARIES ###
+import pandas as pd
+
+##########################
+### IMPUTATION ENGINE ###
+##########################
+
+# Every strategy takes the dataframe and its measurement columns and returns a dataframe of fill values
+# aligned with df (same index and columns). Statistics are computed for all columns in one grouped pass.
+
+# Returns the measurement columns (everything except the date/time key columns)
+def get_value_cols(df):
+    return [col for col in df.columns if 'Date' not in col and 'Hour' not in col and 'Unnamed' not in col
+            and 'DST' not in col]
+
+# Historical average for each hour of the day
+def hourly_mean(df, value_cols):
+    return df.groupby('Hour')[value_cols].transform('mean').round(2)
+
+# Historical average for each hour of the day on the same day of the week
+def hour_dow_mean(df, value_cols):
+    day_of_week = df['Date'].dt.dayofweek
+    fills = df.groupby([df['Hour'], day_of_week])[value_cols].transform('mean').round(2)
+
+    # Fall back to the hourly average if a weekday/hour combination has no data at all
+    return fills.fillna(hourly_mean(df, value_cols))
+
+# Interpolates between the nearest known values in time
+def time_interpolation(df, value_cols):
+    timestamps = df['Date'] + pd.to_timedelta(df['Hour'], unit='h')
+    order = timestamps.argsort(kind='stable')
+
+    # Interpolate on a time-sorted copy, then put the rows back in their original order
+    values = df[value_cols].iloc[order].set_axis(pd.DatetimeIndex(timestamps.iloc[order]))
+    values = values.interpolate(method='time', limit_direction='both').round(2)
+
+    return values.set_axis(df.index[order]).reindex(df.index)
+
+# Average of the same hour over the surrounding `window` days (a seasonal profile that follows trends)
+def seasonal_profile(df, value_cols, window=7):
+    order = df.sort_values(['Hour', 'Date']).index
+    by_hour = df.loc[order].groupby('Hour')[value_cols]
+    fills = by_hour.rolling(window, min_periods=1, center=True).mean().round(2)
+
+    # Rolling results are indexed by (Hour, original row); drop the hour level to align with df
+    fills = fills.droplevel(0).reindex(df.index)
+
+    # Fall back to the hourly average where the whole window is empty
+    return fills.fillna(hourly_mean(df, value_cols))
+
+STRATEGIES = {
+    'hourly_mean': hourly_mean,
+    'hour_dow_mean': hour_dow_mean,
+    'interpolate': time_interpolation,
+    'seasonal_profile': seasonal_profile,
+    }
+
+# Fills the missing measurements in df using the chosen strategy.
+# Returns the filled dataframe and a boolean mask of the imputed cells (only rows with at least one imputed
+# cell are kept, indexed like df).
+def impute(df, strategy='hourly_mean', **options):
+    value_cols = get_value_cols(df)
+
+    # Record which cells are missing before filling them
+    mask = df[value_cols].isna()
+    mask = mask[mask.any(axis=1)]
+    if mask.empty:
+        return df, mask
+
+    # Compute fill values for every column at once, then fill with one aligned operation
+    fills = STRATEGIES[strategy](df, value_cols, **options)
+    df = df.copy()
+    df[value_cols] = df[value_cols].fillna(fills)
+
+    # Only report cells that were actually filled
+    mask = mask & df.loc[mask.index, value_cols].notna()
+
+    return df, mask
@@ -0,0 +1,186 @@
+# Import Libraries
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import extract_transform_load.transform as transform
+import extract_transform_load.impute as impute
+import extract_transform_load.load as load
+
+#############################
+### INCREMENTAL TRANSFORM ###
+#############################
+
+# Each run extracts a whole window of days, but usually only the newest day (and any day ERCOT revised)
+# has new raw data. The raw rows of every source are fingerprinted per delivery day and compared with the
+# fingerprints of the last saved run, and only these days are transformed again:
+#   - days whose raw rows changed (or are new to the window)
+#   - days with imputed cells, because their fill values are computed from the rest of the window (when
+#     any day changed, or a day left the window)
+# Missing values are imputed with the stored rows of the other days in the window as context, so the
+# result is the same as transforming the whole window. The transformed rows are then upserted by
+# timestamp (see Pipeline.run).
+
+# Fingerprints of the last saved run: {source: {'yyyy-mm-dd': {'fingerprint': sha256 or None, 'imputed': bool}}}
+# (days in the window without any raw rows have no fingerprint)
+FINGERPRINT_PATH = Path(__file__).resolve().parent.parent / "clean_data" / "transform_fingerprints.json"
+
+SOURCE_COLUMNS = {
+    'price': transform.get_price_cols,
+    'load': transform.get_load_cols,
+    'wind': transform.get_wind_cols,
+    'solar': transform.get_solar_cols,
+    }
+
+def load_fingerprints(path=FINGERPRINT_PATH):
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+def save_fingerprints(fingerprints, path=FINGERPRINT_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(fingerprints, indent=1, sort_keys=True))
+    tmp_path.replace(path)
+
+### Fingerprints ###
+
+# Groups the raw rows of a source by delivery day. Returns {'yyyy-mm-dd': [rows]} with every day from the
+# first to the last day that has rows (days without rows get an empty list).
+# Raises ValueError like transform.create_df if a row has the wrong width (the source changed its layout).
+def group_rows_by_day(name, raw_data):
+    rows = transform.flatten_lists(raw_data) if name == 'price' else transform.flatten_dictionaries(raw_data)
+
+    # Rows of missing days are empty lists (see transform.create_df)
+    all_cols, _ = SOURCE_COLUMNS[name]()
+    transform.check_row_widths(rows, all_cols, name)
+    date_position = all_cols.index('Date')
+    rows = [row for row in rows if row and row[date_position]]
+
+    # Parse each distinct raw date once
+    raw_dates = list(dict.fromkeys(row[date_position] for row in rows))
+    parsed = pd.to_datetime(pd.Series(raw_dates, dtype=object), errors='coerce')
+    day_names = {raw: day.strftime('%Y-%m-%d') for raw, day in zip(raw_dates, parsed) if pd.notna(day)}
+
+    days = {}
+    for row in rows:
+        day = day_names.get(row[date_position])
+        if day is not None:
+            days.setdefault(day, []).append(row)
+    if not days:
+        return {}
+
+    all_days = pd.date_range(min(days), max(days), freq='D').strftime('%Y-%m-%d')
+    return {day: days.get(day, []) for day in all_days}
+
+# Fingerprints the raw rows of each day (None for days without rows). Only the values the transform reads
+# (the desired columns and the DST flag) are hashed, so a day whose values didn't change keeps its
+# fingerprint when it comes from a different posting (the generation rows carry their posting time), and
+# rows are sorted so the order pages arrive in doesn't matter.
+def fingerprint_days(name, day_rows):
+    all_cols, desired_cols = SOURCE_COLUMNS[name]()
+    positions = [all_cols.index(col) for col in desired_cols + transform.DST_COLS if col in all_cols]
+
+    fingerprints = {}
+    for day, rows in day_rows.items():
+        values = sorted(json.dumps([row[i] for i in positions], default=str) for row in rows)
+        fingerprints[day] = hashlib.sha256('\n'.join(values).encode('utf-8')).hexdigest() if rows else None
+    return fingerprints
+
+# Returns the days to transform again: the changed days, plus the days with imputed cells if anything
+# changed (their fill values depend on the whole window). A day that left the window counts as a change:
+# it is no longer imputation context, so the imputed days have to be transformed again.
+def get_changed_days(fingerprints, previous):
+    changed = {day for day, fingerprint in fingerprints.items()
+               if day not in previous or previous[day]['fingerprint'] != fingerprint}
+    removed = set(previous) - set(fingerprints)
+    if not changed and not removed:
+        return []
+
+    dependent = {day for day in fingerprints if fingerprints[day] is None or previous.get(day, {}).get('imputed')}
+    return sorted(changed | dependent)
+
+# Returns the days that left a source's raw data but are still in the window (a day of another source's
+# raw data). A full transform has no rows of the source for them, so its columns are missing on those days.
+def get_cleared_days(fingerprints, previous, window_days):
+    return sorted((set(previous) - set(fingerprints)) & set(window_days))
+
+# Returns the fingerprints to save for a source once its changed days are transformed
+def update_fingerprints(fingerprints, changed_days, imputed_days, previous):
+    changed_days, imputed_days = set(changed_days), set(imputed_days)
+    return {day: {'fingerprint': fingerprint,
+                  'imputed': day in imputed_days if day in changed_days else previous[day]['imputed']}
+            for day, fingerprint in fingerprints.items()}
+
+### Transform ###
+
+# Returns the stored rows of a source for the window days that aren't transformed again, in the layout
+# create_df returns (hours ending 1-24), to use as imputation context
+def get_context(name, window_days, changed_days, parquet_directory=None):
+    _, desired_cols = SOURCE_COLUMNS[name]()
+    directory = Path(parquet_directory) if parquet_directory else load.get_parquet_directory()
+    if not any(directory.glob('year=*')):
+        return None
+
+    stored_df = load.read_parquet(desired_cols, start=window_days[0], end=window_days[-1], directory=directory)
+    stored_df = stored_df[~stored_df['Date'].dt.strftime('%Y-%m-%d').isin(changed_days)]
+    stored_df = stored_df[[col for col in desired_cols if col in stored_df.columns]]
+    if len(stored_df.columns) < len(desired_cols):
+        return None
+
+    stored_df['Hour'] = stored_df['Hour'].replace(0, 24)
+    all_cols, _ = SOURCE_COLUMNS[name]()
+    if any(col in all_cols for col in transform.DST_COLS):
+        stored_df['DST'] = False
+    return stored_df.reset_index(drop=True)
+
+# Runs in a worker process: transforms the rows of the changed days like transform_<source>_data, with the
+# stored rows of the rest of the window as imputation context.
+# Returns (dataframe of the changed days, imputed-cell count, days with imputed cells).
+def transform_days(name, day_rows, changed_days, window_days, strategy=transform.IMPUTE_STRATEGY,
+                   parquet_directory=None):
+    all_cols, desired_cols = SOURCE_COLUMNS[name]()
+    rows = [row for day in changed_days for row in day_rows[day]]
+    df = transform.create_df(rows, all_cols, desired_cols, name)
+
+    # Like handle_missing_data, missing hours are only added and filled when some value is missing (a missing
+    # price page counts as a row of missing values, see transform.flatten_lists). The rest of the window is
+    # used as context so the fill values are the same as in a full transform.
+    imputed_cells, imputed_days = 0, []
+    missing_pages = name == 'price' and any(not day_rows[day] for day in changed_days)
+    if missing_pages or df.isnull().values.any():
+        context_df = None
+        if len(changed_days) < len(window_days):
+            context_df = get_context(name, window_days, changed_days, parquet_directory)
+
+        combined_df = df if context_df is None else pd.concat([df, context_df], ignore_index=True)
+        combined_df = transform.fill_missing_dates(combined_df.dropna(subset=['Date']))
+        combined_df, imputed_mask = impute.impute(combined_df, strategy)
+
+        df = combined_df[combined_df['Date'].dt.strftime('%Y-%m-%d').isin(changed_days)]
+        imputed_mask = imputed_mask[imputed_mask.index.isin(df.index)]
+        imputed_cells = int(imputed_mask.values.sum())
+        imputed_days = sorted(set(df.loc[imputed_mask.index, 'Date'].dt.strftime('%Y-%m-%d')))
+
+    return df.sort_values(['Date', 'Hour']).reset_index(drop=True), imputed_cells, imputed_days
+
+# Sets each source's columns to missing on its cleared days ({source: [days]}, see get_cleared_days), like
+# a full transform does. Stored rows of those days are added if merged_df (None if no day was
+# transformed) doesn't have them.
+def clear_days(merged_df, cleared_days, parquet_directory=None):
+    days = sorted(set().union(*cleared_days.values()))
+    stored_df = load.read_parquet(start=days[0], end=days[-1], directory=parquet_directory).set_index('Timestamp')
+    stored_df = stored_df[stored_df['Date'].dt.strftime('%Y-%m-%d').isin(days)]
+
+    if merged_df is None:
+        merged_df = stored_df
+    else:
+        merged_df = pd.concat([merged_df, stored_df[~stored_df.index.isin(merged_df.index)]]).sort_index()
+
+    for name, source_days in cleared_days.items():
+        _, desired_cols = SOURCE_COLUMNS[name]()
+        columns = [col for col in desired_cols if col not in ('Date', 'Hour') and col in merged_df.columns]
+        merged_df.loc[merged_df['Date'].dt.strftime('%Y-%m-%d').isin(source_days), columns] = np.nan
+
+    return merged_df
@@ -0,0 +1,229 @@
+# Import Libraries
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+import extract_transform_load.extract as extract
+import extract_transform_load.transform as transform
+import extract_transform_load.impute as impute
+import extract_transform_load.load as load
+import extract_transform_load.array_store as array_store
+import extract_transform_load.analytics as analytics
+import extract_transform_load.warehouse as warehouse
+
+###########################
+### LIVE HOURLY UPDATES ###
+###########################
+
+# ERCOT updates the wind and solar generation reports every hour at :55. Live mode wakes up just after
+# each posting, asks only for postings newer than the last one it saw (the high-water mark), transforms
+# the new rows and upserts them into the stored dataset (Parquet partition, array store and aggregate
+# cubes). Every posting carries the last 48 hours of actuals, so hours that were imputed in an earlier
+# cycle are replaced as soon as their actuals arrive. A cycle only touches the new rows and a fixed
+# window of context, so its cost doesn't grow with the stored history.
+
+# Sources posted every hour (name of the extract module's API endpoint and transform columns). The endpoint
+# is looked up on every cycle, so extract.set_base_urls() also applies to live mode.
+LIVE_SOURCES = {
+    'wind': ('WIND_API_ENDPOINT', transform.get_wind_cols),
+    'solar': ('SOLAR_API_ENDPOINT', transform.get_solar_cols),
+    }
+
+# Minute of the hour ERCOT posts at, and how long to keep polling for a posting that is late
+POSTING_MINUTE = 55
+POLL_INTERVAL = 10
+POLL_TIMEOUT = 300
+
+# Days of stored data used as context when imputing missing values in new rows
+IMPUTE_CONTEXT_DAYS = 7
+
+# Where the high-water marks are kept between runs
+LIVE_STATE_PATH = Path(__file__).resolve().parent.parent / "clean_data" / "live_state.json"
+
+# Current time in ERCOT's time zone (posting times are Central Prevailing Time, without an offset)
+def ercot_now():
+    return datetime.now(ZoneInfo(load.ERCOT_TIMEZONE)).replace(tzinfo=None)
+
+# Returns the next :55 posting time after now
+def get_next_posting_time(now):
+    posting_time = now.replace(minute=POSTING_MINUTE, second=0, microsecond=0)
+    return posting_time if posting_time > now else posting_time + timedelta(hours=1)
+
+def parse_posted(value):
+    return datetime.fromisoformat(str(value)[:19])
+
+# Queries every posting made after high_water_mark (up to now). Returns (actual rows with the latest
+# posting of each hour, newest posting time seen).
+def fetch_new_rows(api_endpoint, high_water_mark, now, api_client):
+
+    # A posting only holds actuals for the 48 hours before it
+    delivery_dates = [(high_water_mark - timedelta(days=2)).date() + timedelta(days=i)
+                      for i in range((now.date() - high_water_mark.date()).days + 3)]
+    params = {
+        "postedDatetimeFrom": (high_water_mark + timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%S'),
+        "postedDatetimeTo": now.strftime('%Y-%m-%dT%H:%M:%S'),
+        "deliveryDateFrom": delivery_dates[0].strftime('%Y-%m-%d'),
+        "deliveryDateTo": delivery_dates[-1].strftime('%Y-%m-%d'),
+        }
+
+    # New postings change every hour, so they are never cached
+    pages = list(extract.query_api_pages(api_endpoint, params, api_client, use_cache=False))
+
+    posted_times = [parse_posted(row[0]) for page in pages for row in page.get('data') or []]
+    newest_posting = max(posted_times, default=high_water_mark)
+
+    # Drop forecast-only rows and keep the latest posting of each hour
+    days = extract.split_generation_postings(pages, delivery_dates)
+    return [row for day in days for row in day['data']], newest_posting
+
+class LiveUpdater:
+
+    def __init__(self, api_client=None, endpoints=None, clock=ercot_now, sleep=time.sleep,
+                 state_path=LIVE_STATE_PATH, parquet_directory=None, array_directory=None, cube_directory=None,
+                 warehouse_path=None, strategy=transform.IMPUTE_STRATEGY):
+        self.api_client = api_client
+        self.endpoints = endpoints or {} # overrides of the extract module's endpoints
+        self.clock = clock
+        self.sleep = sleep
+        self.state_path = Path(state_path)
+        self.parquet_directory = Path(parquet_directory) if parquet_directory else load.get_parquet_directory()
+        self.array_directory = Path(array_directory) if array_directory else array_store.get_array_directory()
+        self.cubes = analytics.AggregateCubes(cube_directory)
+        self.warehouse_path = Path(warehouse_path) if warehouse_path else warehouse.get_warehouse_path()
+        self.strategy = strategy
+        self.high_water_marks = self.load_state()
+
+    ## High-Water Marks ##
+
+    def load_state(self):
+        if not self.state_path.exists():
+            return {}
+        state = json.loads(self.state_path.read_text())
+        return {name: parse_posted(value) for name, value in state.items()}
+
+    def save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({name: value.strftime('%Y-%m-%dT%H:%M:%S')
+                                        for name, value in self.high_water_marks.items()}, indent=1))
+        tmp_path.replace(self.state_path)
+
+    # The first run starts from the posting before the current one
+    def get_high_water_mark(self, name, now):
+        return self.high_water_marks.get(name, get_next_posting_time(now) - timedelta(hours=2, minutes=1))
+
+    ## Transform & Upsert ##
+
+    # Fills missing values in the new rows using the last IMPUTE_CONTEXT_DAYS of stored data as context
+    def impute_new_rows(self, new_df):
+        if not new_df.drop(columns=['Date', 'Hour']).isnull().values.any():
+            return new_df
+
+        context_df = None
+        if (self.array_directory / 'meta.json').exists():
+            store = array_store.ArrayStore(self.array_directory)
+            columns = [col for col in new_df.columns if col in store.columns]
+            first_hour = int(array_store.to_epoch_hours(new_df.index[:1])[0]) - IMPUTE_CONTEXT_DAYS * 24
+            context_df = store.to_df(columns, start=first_hour, end=int(array_store.to_epoch_hours(new_df.index[-1:])[0]))
+
+        # Missing values that are already stored for the same hour are kept
+        combined = new_df if context_df is None else new_df.combine_first(context_df)[new_df.columns]
+
+        # The strategies expect hours ending 1-24 (the merged layout stores hour ending 24 as hour 0)
+        filled, _ = impute.impute(combined.assign(Hour=combined['Hour'].replace(0, 24)), self.strategy)
+        filled['Hour'] = combined['Hour']
+        return filled.loc[new_df.index]
+
+    # Upserts rows into the Parquet dataset, the array store, the cubes and the warehouse. Columns the rows
+    # don't have (e.g. prices and load for the newest hours) keep their stored values.
+    def upsert(self, new_df):
+        new_df = load.fill_from_stored(new_df, self.parquet_directory)
+        load.save_as_parquet(new_df, self.parquet_directory)
+        array_store.upsert_arrays(new_df, self.array_directory)
+        self.cubes.ingest(new_df)
+        self.cubes.save()
+
+        # Keep the warehouse current if there is one
+        if self.warehouse_path.exists():
+            warehouse.save_to_warehouse(new_df, self.warehouse_path)
+        return new_df
+
+    # Runs one update: fetches the new postings of every source, transforms and upserts them.
+    # Returns the number of new rows per source and the latency from the newest posting to saved data.
+    def run_cycle(self):
+        if self.api_client is None:
+            self.api_client = extract.get_api_client()
+
+        now = self.clock()
+        frames, rows, newest_postings = [], {}, {}
+        for name, (endpoint_name, get_cols) in LIVE_SOURCES.items():
+            high_water_mark = self.get_high_water_mark(name, now)
+            api_endpoint = self.endpoints.get(name) or getattr(extract, endpoint_name)
+            new_rows, newest_posting = fetch_new_rows(api_endpoint, high_water_mark, now, self.api_client)
+            rows[name] = len(new_rows)
+            if new_rows:
+                all_cols, desired_cols = get_cols()
+                frames.append(transform.create_df(new_rows, all_cols, desired_cols, name))
+                newest_postings[name] = newest_posting
+
+        result = {'time': now.strftime('%Y-%m-%dT%H:%M:%S'), 'rows': rows}
+        if not frames:
+            return result
+
+        new_df = load.merge_df(*frames)
+        new_df = self.impute_new_rows(new_df)
+        self.upsert(new_df)
+
+        # Only move the high-water marks once the rows are saved
+        self.high_water_marks.update(newest_postings)
+        self.save_state()
+
+        result['hours'] = len(new_df)
+        result['latency_s'] = round((self.clock() - max(newest_postings.values())).total_seconds(), 1)
+        print(f"Live update {result['time']}: {rows} rows, {result['hours']} hours upserted, "
+              f"{result['latency_s']} s after posting\n")
+        return result
+
+    ## Scheduling ##
+
+    def sleep_until(self, moment):
+        seconds = (moment - self.clock()).total_seconds()
+        if seconds > 0:
+            self.sleep(seconds)
+
+    # True once every source has a posting from around posting_time (a posting can be a few seconds early)
+    def has_posting(self, posting_time):
+        return all(self.get_high_water_mark(name, posting_time) > posting_time - timedelta(minutes=30)
+                   for name in LIVE_SOURCES)
+
+    # Waits for each :55 posting, then polls until it shows up (or POLL_TIMEOUT passes) and upserts it.
+    # Runs forever unless max_cycles is set. Returns the result of the last cycle of every posting.
+    def run(self, max_cycles=None):
+        results = []
+        while max_cycles is None or len(results) < max_cycles:
+            posting_time = get_next_posting_time(self.clock())
+            self.sleep_until(posting_time)
+            deadline = self.clock() + timedelta(seconds=POLL_TIMEOUT)
+
+            # Older postings that were late for the previous cycle can show up first, so keep polling
+            # until the awaited posting is upserted
+            while True:
+                result = self.run_cycle()
+                if self.has_posting(posting_time) or self.clock() >= deadline:
+                    break
+                self.sleep(POLL_INTERVAL)
+
+            results.append(result)
+        return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Keep the stored ERCOT data up to date every hour')
+    arg_parser.add_argument('--cycles', type=int, default=None, help='stop after this many postings')
+    args = arg_parser.parse_args()
+
+    LiveUpdater().run(max_cycles=args.cycles)
+
+if __name__ == '__main__':
+    main()
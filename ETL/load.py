@@ -2,22 +2,84 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
-# Merges all dataframes into a single dataframe
-def merge_df(price_df, load_df, wind_df, solar_df):
+# pyarrow is only needed for the Parquet storage backend
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# ERCOT reports in Central Prevailing Time
+ERCOT_TIMEZONE = 'America/Chicago'
+
+# Converts dates and hours ending (1-24) into hour-ending timestamps in UTC.
+# dst marks the repeated hour when clocks fall back; hours that don't exist when clocks spring forward
+# become NaT.
+def hour_ending_timestamps(dates, hours, dst=None):
+    hours = np.asarray(hours, dtype=np.float64)
+    return interval_ending_timestamps(dates, hours * 60, 60, dst)
+
+# Same as hour_ending_timestamps for intervals of any length: minutes are the interval endings in minutes
+# after local midnight (e.g. 15 for the 00:00-00:15 interval, 1440 for the last one of the day)
+def interval_ending_timestamps(dates, minutes, interval_minutes, dst=None):
+
+    # Build the local start of each interval (the first interval starts at midnight)
+    minutes = np.asarray(minutes, dtype=np.float64)
+    interval_start = pd.DatetimeIndex(pd.to_datetime(dates)) + pd.to_timedelta(minutes - interval_minutes, unit='m')
+
+    # The first 1:00-2:00 hour on the fall-back day is daylight time; the repeated one (DST flag) is not
+    if dst is None:
+        dst = np.zeros(len(interval_start), dtype=bool)
+    is_daylight_time = ~np.asarray(dst, dtype=bool)
+
+    interval_start = interval_start.tz_localize(ERCOT_TIMEZONE, ambiguous=is_daylight_time, nonexistent='NaT')
+
+    return (interval_start + pd.Timedelta(minutes=interval_minutes)).tz_convert('UTC').rename('Timestamp')
+
+# Builds the hour-ending timestamps of a merged dataframe (where hour ending 24 is stored as hour 0)
+def merged_timestamps(df):
+    return hour_ending_timestamps(df['Date'], df['Hour'].replace(0, 24), df.get('DST'))
+
+# Returns the Date & Hour columns (hour ending 24 is stored as hour 0) for hour-ending timestamps
+def local_dates_and_hours(timestamps):
+    hour_start = (timestamps - pd.Timedelta(hours=1)).tz_convert(ERCOT_TIMEZONE).tz_localize(None)
+    hours = np.asarray(hour_start.hour + 1, dtype=np.int64)
+    hours[hours == 24] = 0
+    return hour_start.normalize(), hours
+
+# Merges all dataframes into a single dataframe.
+# Every source is put on one sorted UTC hour-ending timestamp index (using its DST flag for the repeated
+# fall-back hour) and all of them are joined in one aligned concat. The result is indexed by 'Timestamp'.
+def merge_df(*dfs):
+
+    frames = []
+    for df in dfs:
+        if df is None:
+            continue
+
+        # Index the source by its hour-ending timestamps
+        frame = df.set_index(hour_ending_timestamps(df['Date'], df['Hour'], df.get('DST')))
+        frame = frame.drop(columns=['Date', 'Hour', 'DST'], errors='ignore')
+
+        # Drop hours that don't exist (spring forward) and duplicated hours
+        frame = frame[frame.index.notna()]
+        frame = frame[~frame.index.duplicated(keep='last')]
+        frames.append(frame)
 
     # Merge data into a single df
-    merged_df = pd.merge(price_df, load_df, on=['Date', 'Hour'], how='outer') # merge first two df
-    merged_df = pd.merge(merged_df, wind_df, on=['Date', 'Hour'], how='outer') # merge third df
-    merged_df = pd.merge(merged_df, solar_df, on=['Date', 'Hour'], how='outer') # merge fourth df
+    merged_df = pd.concat(frames, axis=1, join='outer', sort=True)
+    merged_df.index.name = 'Timestamp'
 
-    # Convert 24th hour to 0th hour and then convert into an int
-    merged_df['Hour'] = merged_df['Hour'].replace(24.0, 0.0)
-    merged_df['Hour'] = merged_df['Hour'].apply(np.int64)
+    # Rebuild the Date & Hour columns (24th hour is stored as the 0th hour)
+    dates, hours = local_dates_and_hours(merged_df.index)
+    merged_df.insert(0, 'Date', dates)
+    merged_df.insert(1, 'Hour', hours)
 
     return merged_df
 
-# Saves CSV to clean_data folder
-def save_as_CSV(df):
+# Returns the clean_data folder, creating it if it doesn't exist
+def get_clean_data_directory():
     
     # Define the directories
     curr_directory = Path(__file__).resolve().parent
@@ -26,9 +88,130 @@ def save_as_CSV(df):
     # Create the folder if it doesn't exist
     clean_data_directory.mkdir(parents=True, exist_ok=True)
 
+    return clean_data_directory
+
+# Saves CSV to clean_data folder (kept as an export option; the Parquet dataset is the main store)
+def save_as_CSV(df, path=None):
+
     # Define relative path to clean_data folder
-    path = clean_data_directory / "ERCOT_Electricity_Data.csv"
+    if path is None:
+        path = get_clean_data_directory() / "ERCOT_Electricity_Data.csv"
 
     # Save the CSV
     df.to_csv(path, index=False)
-    print(f"CSV saved to: {path}\n")
\ No newline at end of file
+    print(f"CSV saved to: {path}\n")
+
+###############################
+### PARQUET STORAGE BACKEND ###
+###############################
+
+# The Parquet dataset is a folder of files partitioned by year and month:
+# clean_data/ERCOT_Electricity_Data/year=2025/month=02/data.parquet
+
+def get_parquet_directory():
+    return get_clean_data_directory() / "ERCOT_Electricity_Data"
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError('The Parquet storage backend requires pyarrow (pip install pyarrow)')
+
+# Converts the merged dataframe to the stored types: UTC Timestamp, timestamp Date, int Hour, float measurements
+def to_storage_types(df):
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['Hour'] = df['Hour'].astype(np.int64)
+
+    # Use the merged Timestamp index, or rebuild it (e.g. for data read back from the CSV)
+    if df.index.name == 'Timestamp':
+        df = df.reset_index()
+    elif 'Timestamp' not in df.columns:
+        df.insert(0, 'Timestamp', merged_timestamps(df).to_numpy())
+    df = df[df['Timestamp'].notna()]
+
+    value_cols = [col for col in df.columns if col not in ('Timestamp', 'Date', 'Hour')]
+    df[value_cols] = df[value_cols].astype(np.float64)
+
+    return df
+
+# Sorts rows by their hour-ending timestamp
+def sort_rows(df):
+    return df.sort_values('Timestamp').reset_index(drop=True)
+
+# Saves the merged dataframe as Parquet. Only the year/month partitions that contain rows from df are
+# rewritten; rows already stored for the same Timestamp are replaced by the new ones.
+def save_as_parquet(df, directory=None):
+    require_pyarrow()
+    directory = Path(directory) if directory else get_parquet_directory()
+
+    df = to_storage_types(df)
+
+    # Write each year/month partition separately
+    for (year, month), partition_df in df.groupby([df['Date'].dt.year, df['Date'].dt.month]):
+        partition_directory = directory / f"year={year}" / f"month={month:02d}"
+        partition_directory.mkdir(parents=True, exist_ok=True)
+        path = partition_directory / "data.parquet"
+
+        # Combine with the rows already stored in the partition (new rows win)
+        if path.exists():
+            stored_df = pq.read_table(path).to_pandas()
+            partition_df = pd.concat([stored_df, partition_df], ignore_index=True)
+            partition_df = partition_df.drop_duplicates('Timestamp', keep='last')
+
+        partition_df = sort_rows(partition_df)
+
+        # Write to a temporary file first so readers never see a half-written partition
+        tmp_path = partition_directory / "data.parquet.tmp"
+        pq.write_table(pa.Table.from_pandas(partition_df, preserve_index=False), tmp_path)
+        tmp_path.replace(path)
+
+    print(f"Parquet dataset saved to: {directory}\n")
+
+# Fills the cells df doesn't have (missing columns or NaN) with the values already stored for the same
+# hours, so upserting the rows of some sources doesn't blank out the other sources
+def fill_from_stored(df, directory=None):
+    directory = Path(directory) if directory else get_parquet_directory()
+    if df.empty or not any(directory.glob('year=*')):
+        return df
+
+    dates = pd.to_datetime(df['Date'])
+    stored_df = read_parquet(start=dates.min(), end=dates.max(), directory=directory)
+    if stored_df.empty:
+        return df
+
+    stored_df = stored_df.set_index('Timestamp')
+    filled_df = df.combine_first(stored_df).loc[df.index]
+
+    # Keep the stored column order, with new columns at the end
+    value_cols = [col for col in stored_df.columns if col not in ('Date', 'Hour')] + \
+                 [col for col in df.columns if col not in stored_df.columns]
+    return filled_df[['Date', 'Hour'] + value_cols]
+
+# Reads the Parquet dataset. Only the requested columns are read, and only the partitions and row groups
+# that overlap the start/end dates (inclusive) are scanned.
+def read_parquet(columns=None, start=None, end=None, directory=None):
+    require_pyarrow()
+    directory = Path(directory) if directory else get_parquet_directory()
+
+    dataset = ds.dataset(directory, format='parquet', partitioning='hive')
+
+    # Build the date-range filter; the year/month terms let pyarrow skip whole partitions
+    date_filter = None
+    if start is not None:
+        start = pd.Timestamp(start)
+        date_filter = (ds.field('year') > start.year) | ((ds.field('year') == start.year) & (ds.field('month') >= start.month))
+        date_filter &= ds.field('Date') >= start
+    if end is not None:
+        end = pd.Timestamp(end)
+        end_filter = (ds.field('year') < end.year) | ((ds.field('year') == end.year) & (ds.field('month') <= end.month))
+        end_filter &= ds.field('Date') <= end
+        date_filter = end_filter if date_filter is None else date_filter & end_filter
+
+    # Always read Timestamp, Date & Hour so the rows can be identified and ordered
+    if columns is not None:
+        columns = ['Timestamp', 'Date', 'Hour'] + [col for col in columns if col not in ('Timestamp', 'Date', 'Hour')]
+    else:
+        columns = [name for name in dataset.schema.names if name not in ('year', 'month')]
+
+    df = dataset.to_table(columns=columns, filter=date_filter).to_pandas()
+
+    return sort_rows(df)
@@ -0,0 +1,121 @@
+# Import Libraries
+import cProfile
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+import extract_transform_load.extract as extract
+
+# resource is only available on Unix; peak RSS is reported as None elsewhere
+try:
+    import resource
+except ImportError:
+    resource = None
+
+###########################
+### RUN INSTRUMENTATION ###
+###########################
+
+# Define the default metrics folder (next to the clean_data folder)
+METRICS_DIRECTORY = Path(__file__).resolve().parent.parent / "run_metrics"
+
+# Returns the peak resident memory of this process so far (MB)
+def get_peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+# Counts the rows in a dataframe or in raw extracted data
+def count_rows(data):
+    if data is None:
+        return None
+    if isinstance(data, pd.DataFrame):
+        return len(data)
+    if isinstance(data, dict):
+        return len(data.get('data') or [])
+
+    # A list of API responses or a list of days of price rows
+    return sum(count_rows(elem) if isinstance(elem, dict) else len(elem) for elem in data)
+
+# Records wall time, extract counters, rows and memory for each stage of a run, and writes one JSON line
+# per stage to run_metrics/run_<timestamp>.jsonl. If profile_stage is set, that stage also runs under
+# cProfile and its stats are dumped next to the metrics file.
+#
+# A stage counts the requests made by its own thread (and the workers it starts), so stages that run at the
+# same time don't count each other's requests; the run totals come from the counters of the whole process.
+# Peak RSS and the cProfile stats only cover this process: work done in the transform worker processes is
+# left out.
+class RunMetrics:
+
+    def __init__(self, directory=METRICS_DIRECTORY, profile_stage=None, run_id=None):
+        self.directory = Path(directory)
+        self.profile_stage = profile_stage
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.path = self.directory / f"run_{self.run_id}.jsonl"
+        self.records = []
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.counters_started = extract.get_extract_counters()
+
+    # Measures one stage. The yielded dict can be filled in by the caller with extra fields such as
+    # rows_in, rows_out and imputed_cells.
+    @contextmanager
+    def stage(self, name, **fields):
+        record = {'run_id': self.run_id, 'stage': name, **fields}
+        counters = extract.start_thread_counters()
+
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        if profiler:
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            yield record
+            record['status'] = 'ok'
+        except Exception as error:
+            record['status'] = f'failed: {error!r}'
+            raise
+        finally:
+            record['wall_s'] = round(time.perf_counter() - start, 4)
+
+            if profiler:
+                profiler.disable()
+                self.directory.mkdir(parents=True, exist_ok=True)
+                profile_path = self.directory / f"run_{self.run_id}_{name}.prof"
+                profiler.dump_stats(profile_path)
+                record['profile'] = str(profile_path)
+
+            # Requests, bytes, cache hits and rate limiter waits of the stage's own thread
+            extract.stop_thread_counters(counters)
+            for counter, value in counters.items():
+                record[counter] = round(value, 4) if isinstance(value, float) else value
+
+            record['peak_rss_mb'] = get_peak_rss_mb()
+            self.write(record)
+
+    def write(self, record):
+        with self.lock:
+            self.records.append(record)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+
+    # Writes a final line with the totals for the run (peak_rss_mb is this process only)
+    def finish(self):
+        totals = {'run_id': self.run_id, 'stage': 'total',
+                  'wall_s': round(time.perf_counter() - self.started, 4),
+                  'peak_rss_mb': get_peak_rss_mb()}
+        for counter, value in extract.get_extract_counters().items():
+            delta = value - self.counters_started[counter]
+            totals[counter] = round(delta, 4) if isinstance(delta, float) else delta
+        totals['imputed_cells'] = sum(record.get('imputed_cells') or 0 for record in self.records)
+        totals['process_scope'] = 'peak_rss_mb and profiles leave out the transform worker processes'
+        self.write(totals)
+
+        print(f"Run metrics saved to: {self.path}\n"
+              f"(peak RSS and profiles leave out the transform worker processes)\n")
+        return totals
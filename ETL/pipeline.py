@@ -0,0 +1,236 @@
+# Import Libraries
+import pickle
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from pathlib import Path
+import extract_transform_load.extract as extract
+import extract_transform_load.transform as transform
+import extract_transform_load.load as load
+import extract_transform_load.metrics as metrics
+import extract_transform_load.array_store as array_store
+import extract_transform_load.analytics as analytics
+import extract_transform_load.incremental as incremental
+import extract_transform_load.warehouse as warehouse
+import extract_transform_load.prices as prices
+
+##########################
+### PIPELINED EXECUTOR ###
+##########################
+
+# The pipeline has four independent branches (price, load, wind, solar). Each branch's extract runs on a
+# thread; as soon as it finishes, its transform is sent to a process pool, so transforms overlap with the
+# extracts that are still waiting on the network. merge_df runs once every branch is done.
+#
+# Only the days whose raw data changed since the last saved run are transformed, and their rows are
+# upserted into the stored dataset (see incremental.py). full_refresh transforms the whole window again.
+# The price branch also keeps every settlement point on the changed days' pages (the transform drops the
+# load zones) and upserts them into the long price store (see prices.py).
+
+# Folder where each finished branch's dataframe is saved, so a failure elsewhere doesn't lose it
+STAGING_DIRECTORY = Path(__file__).resolve().parent.parent / "clean_data" / "staging"
+
+# Extract and transform functions for each branch (API branches also need the API client)
+BRANCHES = {
+    'price': (extract.get_price_data, transform.transform_price_data, False),
+    'load': (extract.get_load_data, transform.transform_load_data, True),
+    'wind': (extract.get_wind_data, transform.transform_wind_data, True),
+    'solar': (extract.get_solar_data, transform.transform_solar_data, True),
+    }
+
+# Runs in a worker process: transforms one branch and returns the dataframe, its imputed-cell count and
+# the days with imputed cells
+def run_transform(name, raw_data):
+    _, transform_function, _ = BRANCHES[name]
+    df, imputed_mask = transform_function(raw_data, return_mask=True)
+    imputed_days = sorted(set(df.loc[imputed_mask.index, 'Date'].dt.strftime('%Y-%m-%d')))
+    return df, int(imputed_mask.values.sum()), imputed_days
+
+def save_staged(name, df, directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / f"{name}.pkl", 'wb') as f:
+        pickle.dump(df, f)
+
+# Loads a branch's dataframe saved by an earlier (partly failed) run
+def load_staged(name, directory=STAGING_DIRECTORY):
+    path = Path(directory) / f"{name}.pkl"
+    if not path.exists():
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+class Pipeline:
+
+    def __init__(self, run_metrics=None, transform_workers=4, staging_directory=STAGING_DIRECTORY,
+                 full_refresh=False, fingerprint_path=incremental.FINGERPRINT_PATH):
+        self.run_metrics = run_metrics or metrics.RunMetrics()
+        self.transform_workers = transform_workers
+        self.staging_directory = Path(staging_directory)
+        self.full_refresh = full_refresh
+        self.fingerprint_path = Path(fingerprint_path)
+        self.fingerprints = {} if full_refresh else incremental.load_fingerprints(fingerprint_path)
+        self.new_fingerprints = {} # fingerprints of this run's raw data, saved once the rows are saved
+        self.frames = {}
+        self.errors = {}
+        self.long_prices = prices.empty_long_df() # DAM prices of the changed days, in long format
+        self.api_latency = None # request count, retries and latency percentiles of the API client
+
+    # Extract one branch on the current thread, then submit the transform of its changed days to the
+    # process pool. Returns None if no day changed.
+    def run_branch(self, name, api_client, process_pool):
+        extract_function, _, needs_token = BRANCHES[name]
+
+        with self.run_metrics.stage(f'extract_{name}') as record:
+            raw_data = extract_function(api_client) if needs_token else extract_function()
+            record['rows_out'] = metrics.count_rows(raw_data)
+
+        with self.run_metrics.stage(f'transform_{name}', rows_in=metrics.count_rows(raw_data)) as record:
+
+            # Compare each day's raw rows with the last saved run
+            day_rows = incremental.group_rows_by_day(name, raw_data)
+            fingerprints = incremental.fingerprint_days(name, day_rows)
+            previous = self.fingerprints.get(name, {})
+            changed_days = incremental.get_changed_days(fingerprints, previous)
+
+            if self.full_refresh:
+                task = (run_transform, name, raw_data)
+            else:
+                task = (incremental.transform_days, name, {day: day_rows[day] for day in changed_days},
+                        changed_days, list(day_rows))
+
+            df, imputed_cells, imputed_days = None, 0, []
+            if changed_days and process_pool is None:
+                df, imputed_cells, imputed_days = task[0](*task[1:])
+            elif changed_days:
+                df, imputed_cells, imputed_days = process_pool.submit(*task).result()
+            record['rows_out'] = 0 if df is None else len(df)
+            record['imputed_cells'] = imputed_cells
+            record['days'] = len(day_rows)
+            record['days_transformed'] = len(changed_days)
+
+        self.new_fingerprints[name] = incremental.update_fingerprints(fingerprints, changed_days, imputed_days, previous)
+
+        # Every settlement point on the changed days' pages, for the long price store
+        if name == 'price':
+            pages = raw_data if self.full_refresh else [day_rows[day] for day in changed_days]
+            self.long_prices = prices.pages_to_long(pages, prices.PRICE_MARKETS['DAM'])
+
+        # Keep the finished branch even if another branch fails later
+        if df is not None:
+            save_staged(name, df, self.staging_directory)
+        return df
+
+    # Runs every branch concurrently and returns {branch: dataframe} for the branches that finished.
+    # Failed branches are recorded in self.errors instead of stopping the others.
+    # With transform_workers=0 the transforms run on the branch threads instead of a process pool.
+    def run_branches(self, branches=tuple(BRANCHES)):
+
+        # One client (connections and token) is shared by the API branches; signing in up front means bad
+        # credentials fail here instead of in every branch
+        api_client = None
+        if any(BRANCHES[name][2] for name in branches):
+            with self.run_metrics.stage('get_api_token'):
+                api_client = extract.get_api_client()
+                api_client.get_token()
+
+        process_pool = ProcessPoolExecutor(max_workers=self.transform_workers) if self.transform_workers else None
+        try:
+            with ThreadPoolExecutor(max_workers=len(branches)) as thread_pool:
+                futures = {name: thread_pool.submit(self.run_branch, name, api_client, process_pool)
+                           for name in branches}
+                wait(futures.values())
+        finally:
+            if process_pool is not None:
+                process_pool.shutdown()
+            if api_client is not None:
+                self.api_latency = api_client.get_latency_stats()
+                self.run_metrics.write({'run_id': self.run_metrics.run_id, 'stage': 'api_client', **self.api_latency})
+                api_client.close()
+
+        for name, future in futures.items():
+            if future.exception() is None:
+                if future.result() is not None:
+                    self.frames[name] = future.result()
+            else:
+                self.errors[name] = future.exception()
+                print(f'The {name} branch failed: {future.exception()!r}')
+
+        return self.frames
+
+    # Returns {branch: days} of the days that left each branch's raw data but are still in the window
+    # (see incremental.get_cleared_days)
+    def get_cleared_days(self):
+        window_days = set().union(*self.new_fingerprints.values())
+        cleared_days = {name: incremental.get_cleared_days(fingerprints, self.fingerprints.get(name, {}), window_days)
+                        for name, fingerprints in self.new_fingerprints.items()}
+        return {name: days for name, days in cleared_days.items() if days}
+
+    # Runs the branches, then merges the transformed days and upserts them into the stored dataset.
+    # If a branch failed, the finished branches are still merged and returned (and kept in the staging
+    # folder), but nothing is saved: a partial merge would overwrite stored rows with missing columns.
+    def run(self, export_csv=True, export_warehouse=True):
+        frames = self.run_branches()
+        cleared_days = {} if self.errors else self.get_cleared_days()
+
+        if not frames and not cleared_days:
+            print('Every branch failed, nothing to merge\n' if self.errors else
+                  'No raw data changed since the last run, nothing to save\n')
+            self.run_metrics.finish()
+            return None
+
+        merged_df = None
+        if frames:
+            with self.run_metrics.stage('merge_df', rows_in=sum(len(df) for df in frames.values())) as record:
+                merged_df = load.merge_df(*[frames.get(name) for name in BRANCHES])
+                record['rows_out'] = len(merged_df)
+                record['branches'] = sorted(frames)
+
+        if self.errors:
+            print(f'Not saving: the {", ".join(sorted(self.errors))} branch(es) failed. '
+                  f'Finished branches are saved in {self.staging_directory}\n')
+            self.run_metrics.finish()
+            return merged_df
+
+        # Sources without changes on a transformed day keep their stored values, and days that left a
+        # source's raw data get missing values for it (like a full transform)
+        if not self.full_refresh:
+            with self.run_metrics.stage('fill_from_stored', rows_in=0 if merged_df is None else len(merged_df)) as record:
+                if merged_df is not None:
+                    merged_df = load.fill_from_stored(merged_df)
+                if cleared_days:
+                    merged_df = incremental.clear_days(merged_df, cleared_days)
+                record['cleared_days'] = sum(len(days) for days in cleared_days.values())
+
+        with self.run_metrics.stage('save_as_parquet', rows_in=len(merged_df)):
+            load.save_as_parquet(merged_df)
+
+        if len(self.long_prices):
+            with self.run_metrics.stage('save_long_prices', rows_in=len(self.long_prices)):
+                prices.save_long_prices(self.long_prices, 'DAM')
+
+        with self.run_metrics.stage('save_as_arrays', rows_in=len(merged_df)):
+            if self.full_refresh:
+                array_store.save_as_arrays(merged_df)
+            else:
+                array_store.upsert_arrays(merged_df)
+
+        with self.run_metrics.stage('update_cubes', rows_in=len(merged_df)):
+            analytics.update_cubes(merged_df)
+
+        if export_warehouse:
+            with self.run_metrics.stage('save_to_warehouse', rows_in=len(merged_df)):
+                warehouse.save_to_warehouse(merged_df, cleared_days=cleared_days)
+
+        # The CSV export holds the whole extracted window, like a full run
+        if export_csv:
+            with self.run_metrics.stage('save_as_CSV', rows_in=len(merged_df)):
+                if self.full_refresh:
+                    load.save_as_CSV(merged_df)
+                else:
+                    window_days = sorted(day for days in self.new_fingerprints.values() for day in days)
+                    window_df = load.read_parquet(start=window_days[0], end=window_days[-1])
+                    load.save_as_CSV(window_df.drop(columns='Timestamp'))
+
+        # The fingerprints are only saved with the rows they describe
+        incremental.save_fingerprints({**self.fingerprints, **self.new_fingerprints}, self.fingerprint_path)
+
+        self.run_metrics.finish()
+        return merged_df
@@ -0,0 +1,331 @@
+# Import Libraries
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from pandas.api.types import union_categoricals
+import extract_transform_load.extract as extract
+import extract_transform_load.transform as transform
+import extract_transform_load.load as load
+
+# pyarrow is only needed to store the long prices
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+###############################
+### SETTLEMENT POINT PRICES ###
+###############################
+
+# Keeps settlement point prices in long format, one row per interval and settlement point:
+#   Timestamp        UTC interval ending
+#   SettlementPoint  categorical (each name is stored once, every row holds a small integer code)
+#   Price            float32 ($/MWh)
+# so any number of settlement points and 15-minute intervals fit without a column per point. Rows are
+# sorted by Timestamp, then settlement point. Prices come from:
+#   DAM:  the day-ahead page (hourly, every hub and load zone), the page transform.transform_price_data reads
+#   RT:   the real-time page (15-minute, every hub and load zone), or ERCOT's API for every resource node
+# Hourly rollups and the pivot back to the wide layout (one column per settlement point, hubs named like
+# transform.get_price_cols) work on the integer codes and epoch minutes, never on Python objects.
+
+# Interval length of each market (minutes)
+PRICE_MARKETS = {'DAM': 60, 'RT': 15}
+
+# Settlement points on the DAM and real-time price pages (the columns after Oper Day & Hour/Interval Ending)
+PAGE_SETTLEMENT_POINTS = ['HB_BUSAVG', 'HB_HOUSTON', 'HB_HUBAVG', 'HB_NORTH', 'HB_PAN', 'HB_SOUTH', 'HB_WEST',
+                          'LZ_AEN', 'LZ_CPS', 'LZ_HOUSTON', 'LZ_LCRA', 'LZ_NORTH', 'LZ_RAYBN', 'LZ_SOUTH', 'LZ_WEST']
+
+# Wide-layout names of the hubs (see transform.get_price_cols); other settlement points keep their name
+WIDE_PRICE_NAMES = dict(zip(PAGE_SETTLEMENT_POINTS, transform.get_price_cols()[1][2:]))
+
+# Columns of each row of the node price API (see extract.get_node_price_data). Hour is the hour ending
+# (1-24) and Interval the 15-minute interval within it (1-4).
+NODE_PRICE_COLS = ['Date', 'Hour', 'Interval', 'SettlementPoint', 'SettlementPointType', 'Price', 'DSTFlag']
+
+def get_price_directory():
+    return load.get_clean_data_directory() / "ERCOT_Settlement_Prices"
+
+### Long Format ###
+
+def empty_long_df():
+    return pd.DataFrame({'Timestamp': pd.DatetimeIndex([], tz='UTC'),
+                         'SettlementPoint': pd.Categorical([]),
+                         'Price': np.array([], dtype=np.float32)})
+
+# Returns the interval endings as a numpy datetime64 array (UTC, without the time zone)
+def get_utc_values(df):
+    return df['Timestamp'].dt.tz_localize(None).to_numpy()
+
+# Minutes since the epoch of each interval ending (UTC)
+def get_epoch_minutes(df):
+    return get_utc_values(df).astype('datetime64[m]').astype(np.int64)
+
+# Sorts long prices by Timestamp and settlement point, drops intervals that don't exist (spring forward)
+# and keeps the last row of every duplicated interval and settlement point. One stable argsort of an
+# integer key does all of it.
+def clean_long_df(df):
+    df = df[df['Timestamp'].notna()]
+    if df.empty:
+        return df.reset_index(drop=True)
+
+    points = df['SettlementPoint'].cat
+    key = get_epoch_minutes(df) * (len(points.categories) + 1) + points.codes.to_numpy(np.int64)
+
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    is_last = np.append(key[1:] != key[:-1], True)
+    return df.iloc[order[is_last]].reset_index(drop=True)
+
+# Concatenates long dataframes (their settlement point categories are merged) and cleans the result
+def concat_long(frames):
+    frames = [df for df in frames if len(df)]
+    if not frames:
+        return empty_long_df()
+
+    points = union_categoricals([df['SettlementPoint'] for df in frames], sort_categories=True)
+    df = pd.DataFrame({'Timestamp': pd.concat([df['Timestamp'] for df in frames], ignore_index=True),
+                       'SettlementPoint': points,
+                       'Price': np.concatenate([df['Price'].to_numpy(np.float32) for df in frames])})
+    return clean_long_df(df)
+
+# Parses interval endings ('01', '24:00', '0015', '00:15' or 1) into minutes after local midnight.
+# Values with one or two digits are hours ending.
+def to_minutes_ending(values):
+    text = pd.Series(values, dtype=object).astype(str).str.replace(':', '', regex=False).str.strip()
+    number = pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64)
+    is_hour = (text.str.len() <= 2).to_numpy()
+    return np.where(is_hour, number * 60, np.floor(number / 100) * 60 + number % 100)
+
+# Converts scraped price pages (one list of rows per day, see extract.get_price_data and
+# get_rt_price_data) into long format, keeping every settlement point on the page
+def pages_to_long(raw_price_data, interval_minutes, points=PAGE_SETTLEMENT_POINTS):
+    pages, rows = [], []
+    for page, day in enumerate(raw_price_data):
+        for row in day:
+            if len(row) == 2 + len(points):
+                pages.append(page)
+                rows.append(row)
+    if not rows:
+        return empty_long_df()
+
+    columns = list(zip(*rows))
+    dates = pd.to_datetime(pd.Series(columns[0], dtype=object), errors='coerce')
+    minutes = to_minutes_ending(columns[1])
+
+    # The pages have no DST flag: when clocks fall back, the intervals of the repeated hour are listed
+    # twice, and the second listing is the repeated (standard time) one
+    dst = pd.DataFrame({'Page': pages, 'Date': dates, 'Minutes': minutes}).groupby(
+        ['Page', 'Date', 'Minutes'], dropna=False).cumcount().to_numpy() > 0
+    timestamps = load.interval_ending_timestamps(dates, minutes, interval_minutes, dst)
+
+    # One row of prices per interval --> one long row per interval and settlement point
+    # (the codes follow the sorted names, so rows sort by settlement point name)
+    prices = np.column_stack([transform.to_float_array(column) for column in columns[2:]]).astype(np.float32)
+    codes = np.tile(np.argsort(np.argsort(points)), len(rows))
+    df = pd.DataFrame({'Timestamp': timestamps.repeat(len(points)),
+                       'SettlementPoint': pd.Categorical.from_codes(codes, categories=sorted(points)),
+                       'Price': prices.ravel()})
+    return clean_long_df(df)
+
+# Converts the rows of one node price API page into long format. Each page repeats a few intervals for
+# many settlement points, so every distinct interval is converted to a timestamp once.
+def node_rows_to_long(rows):
+    rows = [row for row in rows if len(row) == len(NODE_PRICE_COLS)]
+    if not rows:
+        return empty_long_df()
+
+    columns = dict(zip(NODE_PRICE_COLS, zip(*rows)))
+    intervals = pd.DataFrame({
+        'Date': pd.Series(columns['Date'], dtype=object),
+        'Minutes': transform.to_hour_array(columns['Hour']) * 60 - 60 + transform.to_float_array(columns['Interval']) * 15,
+        'DST': transform.to_dst_array(columns['DSTFlag']),
+        })
+    interval_codes = intervals.groupby(list(intervals), sort=False, dropna=False).ngroup().to_numpy()
+    distinct = intervals.drop_duplicates()
+    timestamps = load.interval_ending_timestamps(pd.to_datetime(distinct['Date'], errors='coerce'), distinct['Minutes'],
+                                                 PRICE_MARKETS['RT'], distinct['DST'])
+
+    df = pd.DataFrame({'Timestamp': timestamps[interval_codes],
+                       'SettlementPoint': pd.Categorical(columns['SettlementPoint']),
+                       'Price': transform.to_float_array(columns['Price']).astype(np.float32)})
+    return clean_long_df(df)
+
+# Converts node price API pages (see extract.get_node_price_data) into long format one page at a time,
+# so only the compact long rows are kept, never every raw row
+def node_pages_to_long(pages):
+    return concat_long([node_rows_to_long(page.get('data') or []) for page in pages])
+
+### Rollups & Pivots ###
+
+# Rolls prices up to hourly prices (intervals ending in the same hour, e.g. 00:15-01:00 --> hour ending
+# 01:00) with one aggregation. The grouping key is an integer (hour * points + settlement point code).
+def hourly_rollup(df, agg='mean'):
+    if df.empty:
+        return empty_long_df()
+
+    categories = df['SettlementPoint'].cat.categories
+    hours = -(-get_epoch_minutes(df) // 60)
+    key = hours * len(categories) + df['SettlementPoint'].cat.codes.to_numpy(np.int64)
+
+    result = pd.Series(df['Price'].to_numpy()).groupby(key).agg(agg)
+    keys = result.index.to_numpy()
+    return pd.DataFrame({'Timestamp': pd.to_datetime(keys // len(categories) * 3600, unit='s', utc=True),
+                         'SettlementPoint': pd.Categorical.from_codes(keys % len(categories), categories=categories),
+                         'Price': result.to_numpy(np.float32)})
+
+# Pivots long prices to one float32 column per settlement point, indexed by Timestamp. Hubs are named like
+# the wide price columns (see WIDE_PRICE_NAMES). With merged_layout (hourly prices), Date & Hour columns
+# are added like in the merged dataset, so the result lines up with load.merge_df.
+def to_wide(df, points=None, merged_layout=False):
+    if points is not None:
+        df = df[df['SettlementPoint'].isin(points)]
+
+    categories = df['SettlementPoint'].cat.categories
+    codes = df['SettlementPoint'].cat.codes.to_numpy()
+    timestamps, rows = np.unique(get_utc_values(df), return_inverse=True)
+
+    # Scatter every price into its (interval, settlement point) cell
+    values = np.full((len(timestamps), len(categories)), np.nan, dtype=np.float32)
+    values[rows, codes] = df['Price'].to_numpy()
+
+    used = np.bincount(codes, minlength=len(categories)) > 0
+    wide = pd.DataFrame(values[:, used], columns=[WIDE_PRICE_NAMES.get(point, point) for point in categories[used]],
+                        index=pd.DatetimeIndex(timestamps, name='Timestamp').tz_localize('UTC'))
+
+    if merged_layout:
+        dates, hours = load.local_dates_and_hours(wide.index)
+        wide.insert(0, 'Date', dates.to_numpy())
+        wide.insert(1, 'Hour', hours)
+    return wide
+
+### Storage ###
+
+# The long prices are a Parquet dataset partitioned by market and UTC year/month:
+# clean_data/ERCOT_Settlement_Prices/market=RT/year=2025/month=02/data.parquet
+# SettlementPoint is stored dictionary-encoded and Price as float32.
+
+def check_market(market):
+    if market not in PRICE_MARKETS:
+        raise ValueError(f'market must be one of {", ".join(PRICE_MARKETS)} (got {market})')
+
+# Saves long prices. Only the partitions that contain rows from df are rewritten; rows already stored for
+# the same interval and settlement point are replaced by the new ones.
+def save_long_prices(df, market, directory=None):
+    load.require_pyarrow()
+    check_market(market)
+    directory = (Path(directory) if directory else get_price_directory()) / f"market={market}"
+
+    months = df['Timestamp'].dt.year.to_numpy() * 100 + df['Timestamp'].dt.month.to_numpy()
+    for year_month in np.unique(months):
+        partition_directory = directory / f"year={year_month // 100}" / f"month={year_month % 100:02d}"
+        partition_directory.mkdir(parents=True, exist_ok=True)
+        path = partition_directory / "data.parquet"
+
+        # Combine with the rows already stored in the partition (new rows win)
+        partition_df = df[months == year_month]
+        if path.exists():
+            partition_df = concat_long([read_partition(path), partition_df])
+
+        # Write to a temporary file first so readers never see a half-written partition
+        tmp_path = partition_directory / "data.parquet.tmp"
+        pq.write_table(pa.Table.from_pandas(partition_df, preserve_index=False), tmp_path)
+        tmp_path.replace(path)
+
+    print(f"Settlement point prices saved to: {directory}\n")
+
+def read_partition(path):
+    return pq.read_table(path).to_pandas()
+
+# Returns the UTC bounds of the intervals of ERCOT dates start to end (inclusive)
+def get_date_bounds(start=None, end=None):
+    start_bound = end_bound = None
+    if start is not None:
+        start_bound = pd.Timestamp(start).normalize().tz_localize(load.ERCOT_TIMEZONE).tz_convert('UTC')
+    if end is not None:
+        end_bound = (pd.Timestamp(end).normalize() + pd.Timedelta(days=1)).tz_localize(load.ERCOT_TIMEZONE).tz_convert('UTC')
+    return start_bound, end_bound
+
+# Reads long prices of a market. Only the partitions that overlap the start/end ERCOT dates (inclusive)
+# are scanned, and only the rows of the given settlement points are read.
+def read_long_prices(market, start=None, end=None, points=None, directory=None):
+    load.require_pyarrow()
+    check_market(market)
+    directory = (Path(directory) if directory else get_price_directory()) / f"market={market}"
+    if not any(directory.glob('year=*')):
+        return empty_long_df()
+
+    dataset = ds.dataset(directory, format='parquet', partitioning='hive')
+
+    # The year/month terms let pyarrow skip whole partitions
+    start_bound, end_bound = get_date_bounds(start, end)
+    row_filter = None
+    if start_bound is not None:
+        row_filter = (ds.field('year') > start_bound.year) | \
+                     ((ds.field('year') == start_bound.year) & (ds.field('month') >= start_bound.month))
+        row_filter &= ds.field('Timestamp') > start_bound
+    if end_bound is not None:
+        end_filter = (ds.field('year') < end_bound.year) | \
+                     ((ds.field('year') == end_bound.year) & (ds.field('month') <= end_bound.month))
+        end_filter &= ds.field('Timestamp') <= end_bound
+        row_filter = end_filter if row_filter is None else row_filter & end_filter
+    if points is not None:
+        point_filter = ds.field('SettlementPoint').cast('string').isin(list(points))
+        row_filter = point_filter if row_filter is None else row_filter & point_filter
+
+    table = dataset.to_table(columns=['Timestamp', 'SettlementPoint', 'Price'], filter=row_filter)
+    df = table.to_pandas()
+
+    # Partitions can have different dictionaries, so give every read the same sorted categories
+    df['SettlementPoint'] = df['SettlementPoint'].astype('category')
+    df['SettlementPoint'] = df['SettlementPoint'].cat.set_categories(sorted(df['SettlementPoint'].cat.categories))
+    return clean_long_df(df)
+
+### Extract & Save ###
+
+def get_page_dates(start=None, end=None):
+    if start is None or end is None:
+        return extract.get_price_data_dates()
+    days = (end - start).days + 1
+    return [(start + timedelta(days=i)).strftime('%Y%m%d') for i in range(days)]
+
+# Extracts one source of prices and saves it. Sources:
+#   dam:    day-ahead page (hubs & load zones, hourly)
+#   rt:     real-time page (hubs & load zones, 15-minute)
+#   nodes:  ERCOT's API (every resource node, hub and load zone, 15-minute; needs an API client)
+def update_prices(source, start=None, end=None, points=None, api_client=None, directory=None):
+    if source == 'dam':
+        market, df = 'DAM', pages_to_long(extract.get_price_data(get_page_dates(start, end)), PRICE_MARKETS['DAM'])
+    elif source == 'rt':
+        market, df = 'RT', pages_to_long(extract.get_rt_price_data(get_page_dates(start, end)), PRICE_MARKETS['RT'])
+    elif source == 'nodes':
+        market = 'RT'
+        df = node_pages_to_long(extract.get_node_price_data(api_client or extract.get_api_client(), start, end, points))
+    else:
+        raise ValueError(f'source must be dam, rt or nodes (got {source})')
+
+    if points is not None:
+        df = clean_long_df(df[df['SettlementPoint'].isin(points)])
+
+    print(f"{len(df)} prices for {df['SettlementPoint'].nunique()} settlement points "
+          f"({df.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory)")
+    save_long_prices(df, market, directory)
+    return df
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Extract and store ERCOT settlement point prices in long format')
+    arg_parser.add_argument('source', choices=['dam', 'rt', 'nodes'])
+    arg_parser.add_argument('--start', default=None, help='first ERCOT date (yyyy-mm-dd)')
+    arg_parser.add_argument('--end', default=None, help='last ERCOT date (yyyy-mm-dd)')
+    arg_parser.add_argument('--points', nargs='+', default=None, help='settlement points to keep (default: all)')
+    args = arg_parser.parse_args()
+
+    start = datetime.strptime(args.start, '%Y-%m-%d').date() if args.start else None
+    end = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else None
+    update_prices(args.source, start, end, args.points)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# Import Libraries
+import argparse
+import json
+import threading
+from collections import OrderedDict
+import pandas as pd
+from pathlib import Path
+import extract_transform_load.array_store as array_store
+
+#########################
+### LOCAL QUERY LAYER ###
+#########################
+
+# Answers range queries over the stored dataset without parsing the CSV. Queries read the array store
+# (see array_store.py): its sorted epoch-hour index finds the rows of a time range by binary search, and
+# only the requested columns of those rows are read from the memory maps. Results are resampled by
+# hour, day (ERCOT date) or week (Monday to Sunday) with one aggregation.
+#
+# Results are kept in an LRU cache. Every write to the array store stamps a new version in meta.json, so
+# the cache is cleared (and the memory maps reopened) as soon as the load step writes new data.
+#   service = QueryService()
+#   df = service.query(['Price_Hub_Avg', 'Load_Total'], start='2025-02-01', end='2025-02-28', freq='day', agg='max')
+
+FREQUENCIES = ['hour', 'day', 'week']
+AGGREGATIONS = ['mean', 'sum', 'min', 'max', 'count', 'std', 'median']
+
+# Number of query results kept in memory
+QUERY_CACHE_SIZE = 128
+
+# Groups the rows of a merged dataframe by day or week and aggregates each column
+def resample(df, columns, freq, agg):
+    if freq == 'hour':
+        return df[['Date', 'Hour'] + columns]
+
+    if freq == 'day':
+        keys = pd.Index(df['Date'], name='Date')
+    else:
+        keys = pd.Index(df['Date'] - pd.to_timedelta(df['Date'].dt.dayofweek, unit='D'), name='Week')
+
+    return df[columns].groupby(keys).agg(agg)
+
+class QueryService:
+
+    def __init__(self, directory=None, cache_size=QUERY_CACHE_SIZE):
+        self.directory = Path(directory) if directory else array_store.get_array_directory()
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.store = None
+
+    # Returns the version stamp of the stored data (builds the array store from Parquet if it's missing)
+    def get_version(self):
+        meta_path = self.directory / 'meta.json'
+        if not meta_path.exists():
+            print(f"No array store in {self.directory}, building it from the Parquet dataset\n")
+            array_store.convert_parquet(self.directory)
+        return json.loads(meta_path.read_text()).get('version')
+
+    # Reopens the store and clears the cache when the data changed since the last query
+    def refresh(self):
+        version = self.get_version()
+        if self.store is None or self.store.meta.get('version') != version:
+            self.store = array_store.ArrayStore(self.directory)
+            self.cache.clear()
+
+    # Returns the columns for a time range, resampled by freq ('hour', 'day' or 'week') with agg.
+    # start/end are epoch hours, UTC timestamps or ERCOT dates (inclusive, see ArrayStore.get_slice).
+    def query(self, columns=None, start=None, end=None, freq='hour', agg='mean'):
+        if freq not in FREQUENCIES:
+            raise ValueError(f'freq must be one of {", ".join(FREQUENCIES)} (got {freq})')
+        if agg not in AGGREGATIONS:
+            raise ValueError(f'agg must be one of {", ".join(AGGREGATIONS)} (got {agg})')
+
+        with self.lock:
+            self.refresh()
+            columns = list(self.store.columns if columns is None else columns)
+
+            # Bounds are keyed as epoch hours, so '2025-02-01' and the same hour as a timestamp share an entry
+            key = (tuple(columns),
+                   None if start is None else array_store.to_epoch_hour(start, 'start'),
+                   None if end is None else array_store.to_epoch_hour(end, 'end'),
+                   freq, agg)
+
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key].copy()
+            self.misses += 1
+
+            result = resample(self.store.to_df(columns, key[1], key[2]), columns, freq, agg)
+
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+            return result.copy()
+
+    def get_stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.cache)}
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Query the stored ERCOT data')
+    arg_parser.add_argument('--columns', nargs='+', default=None, help='columns to return (default: all)')
+    arg_parser.add_argument('--start', default=None, help='first ERCOT date (yyyy-mm-dd) or UTC timestamp')
+    arg_parser.add_argument('--end', default=None, help='last ERCOT date (yyyy-mm-dd) or UTC timestamp')
+    arg_parser.add_argument('--freq', default='hour', choices=FREQUENCIES)
+    arg_parser.add_argument('--agg', default='mean', choices=AGGREGATIONS)
+    arg_parser.add_argument('--directory', default=None, help='array store folder')
+    arg_parser.add_argument('--output', default=None, help='save the result as CSV instead of printing it')
+    args = arg_parser.parse_args()
+
+    result = QueryService(args.directory).query(args.columns, args.start, args.end, args.freq, args.agg)
+
+    if args.output:
+        result.to_csv(args.output)
+        print(f"{len(result)} rows saved to: {args.output}\n")
+    else:
+        with pd.option_context('display.max_rows', 100, 'display.width', 200):
+            print(result)
+
+if __name__ == '__main__':
+    main()
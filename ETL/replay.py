@@ -0,0 +1,354 @@
+# Import Libraries
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+import extract_transform_load.cache as cache
+import extract_transform_load.client as client
+import extract_transform_load.extract as extract
+
+##########################
+### RECORD/REPLAY HTTP ###
+##########################
+
+# Lets the extract step run without ERCOT, so its I/O path can be measured and regression-tested offline:
+#   record:  runs the extract functions against ERCOT and saves every response as a fixture file
+#   replay:  a local HTTP server that serves the fixtures under a simulated network profile (latency,
+#            jitter, 429 throttling, 5xx errors and page size)
+# The extract functions are pointed at the server with extract.set_base_urls (or the ERCOT_*_URL
+# environment variables). The server mirrors the paths of ERCOT's URLs, so a fixture is found by its path
+# and query parameters whatever host it was recorded from. API responses are stored without their
+# page/size parameters (the pages of a request are merged), so the server can split them into pages of
+# any size.
+#   with replay.ReplayServer(replay.FixtureStore(), 'throttled') as server:
+#       extract.set_base_urls(server.api_base_url, server.price_base_url, server.auth_url)
+
+# Define the default fixture folder (next to the clean_data folder)
+FIXTURE_DIRECTORY = Path(__file__).resolve().parent.parent / "fixtures"
+
+# Responses saved as fixtures (404s are kept so missing price pages are replayed as missing)
+RECORDED_STATUS_CODES = {200, 404}
+
+# Query parameters that only select a page of an API response
+PAGE_PARAMS = ('page', 'size')
+
+# Simulated network conditions
+#   latency_s, jitter_s:         delay before every response (latency +/- jitter seconds)
+#   throttle_rate, retry_after_s: share of requests answered 429 with a Retry-After header
+#   error_rate:                  share of requests answered 503
+#   page_size:                   largest API page served (requests for bigger pages get more pages)
+DEFAULT_PROFILE = {'latency_s': 0.0, 'jitter_s': 0.0, 'throttle_rate': 0.0, 'retry_after_s': 1.0,
+                   'error_rate': 0.0, 'page_size': None}
+
+REPLAY_PROFILES = {
+    'ideal': {},
+    'typical': {'latency_s': 0.08, 'jitter_s': 0.04},
+    'slow': {'latency_s': 0.4, 'jitter_s': 0.2},
+    'throttled': {'latency_s': 0.08, 'jitter_s': 0.04, 'throttle_rate': 0.2, 'retry_after_s': 0.25},
+    'flaky': {'latency_s': 0.08, 'jitter_s': 0.04, 'error_rate': 0.1},
+    'paginated': {'latency_s': 0.08, 'jitter_s': 0.04, 'page_size': 100},
+    }
+
+def get_profile(profile):
+    if isinstance(profile, str):
+        if profile not in REPLAY_PROFILES:
+            raise ValueError(f'profile must be one of {", ".join(REPLAY_PROFILES)} (got {profile})')
+        profile = REPLAY_PROFILES[profile]
+    return {**DEFAULT_PROFILE, **profile}
+
+# Splits a URL into its path and query parameters, without the page/size parameters.
+# Returns (path, params, page).
+def split_url(url):
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    page = int(params.get('page', 1))
+    for name in PAGE_PARAMS:
+        params.pop(name, None)
+    return parts.path, params, page
+
+### Fixtures ###
+
+# Reads fixtures saved by Recorder. get(path, params) returns (status, content type, body) or None.
+class FixtureStore:
+
+    def __init__(self, directory=FIXTURE_DIRECTORY):
+        self.directory = Path(directory)
+        index_path = self.directory / "index.json"
+        self.index = json.loads(index_path.read_text()) if index_path.exists() else {}
+        self.bodies = {}
+        self.lock = threading.Lock()
+
+    def read_body(self, file_name):
+        with gzip.open(self.directory / file_name, 'rb') as f:
+            return f.read()
+
+    def get(self, path, params):
+        key = cache.make_key(path, params)
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+
+        with self.lock:
+            if key not in self.bodies:
+                pages = [self.read_body(entry['pages'][page]) for page in sorted(entry['pages'], key=int)]
+                self.bodies[key] = pages[0] if len(pages) == 1 else merge_pages(pages)
+            return entry['status'], entry['content_type'], self.bodies[key]
+
+    def __len__(self):
+        return len(self.index)
+
+# Merges the pages of an API response into one response with every row
+def merge_pages(pages):
+    payloads = [json.loads(page) for page in pages]
+    rows = [row for payload in payloads for row in payload.get('data') or []]
+    merged = {**payloads[0], 'data': rows}
+    merged['_meta'] = {**payloads[0].get('_meta', {}), 'totalRecords': len(rows), 'totalPages': 1, 'currentPage': 1}
+    return json.dumps(merged).encode('utf-8')
+
+# Saves every GET response the extract functions receive (see extract.record_response) as a fixture.
+# Sign-in requests are never saved. While recording, the response cache is turned off so every request
+# goes over the network.
+class Recorder:
+
+    def __init__(self, directory=FIXTURE_DIRECTORY):
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.json"
+        self.index = json.loads(self.index_path.read_text()) if self.index_path.exists() else {}
+        self.recorded = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, response):
+        request = response.request
+        if request is None or request.method != 'GET' or response.status_code not in RECORDED_STATUS_CODES:
+            return
+
+        path, params, page = split_url(request.url)
+        key = cache.make_key(path, params)
+        file_name = f"{key}-{page}.gz"
+        with gzip.open(self.directory / file_name, 'wb') as f:
+            f.write(response.content)
+
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None or entry['status'] != response.status_code:
+                entry = {'path': path, 'params': params, 'status': response.status_code, 'pages': {}}
+                self.index[key] = entry
+            entry['content_type'] = response.headers.get('Content-Type', 'application/octet-stream')
+            entry['pages'][str(page)] = file_name
+            self.recorded += 1
+
+    def save(self):
+        with self.lock:
+            tmp_path = self.index_path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(self.index, indent=1, sort_keys=True))
+            tmp_path.replace(self.index_path)
+
+    def __enter__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.previous = extract.RESPONSE_RECORDER, extract.RESPONSE_CACHE_ENABLED
+        extract.RESPONSE_RECORDER = self
+        extract.RESPONSE_CACHE_ENABLED = False
+        return self
+
+    def __exit__(self, *exc_info):
+        extract.RESPONSE_RECORDER, extract.RESPONSE_CACHE_ENABLED = self.previous
+        self.save()
+        print(f"{self.recorded} responses recorded to: {self.directory}\n")
+
+### Replay Server ###
+
+# Returns one page of an API response, with its metadata set for that page
+def paginate(payload, page, size):
+    rows = payload.get('data') or []
+    total_pages = max(1, math.ceil(len(rows) / size))
+    meta = {**payload.get('_meta', {}), 'totalRecords': len(rows), 'pageSize': size, 'totalPages': total_pages,
+            'currentPage': page}
+    return {**payload, '_meta': meta, 'data': rows[(page - 1) * size:page * size]}
+
+class ReplayHandler(BaseHTTPRequestHandler):
+
+    # Keep connections open so pooled sessions reuse them, like they do with ERCOT
+    protocol_version = 'HTTP/1.1'
+
+    # Send the headers and body right away (Nagle's algorithm would hold the body back ~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.handle_get(self)
+
+    def do_POST(self):
+        self.server.handle_post(self)
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status, body=b'', content_type='application/json', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+# Serves fixtures (anything with get(path, params), e.g. a FixtureStore) on a local port under a network
+# profile (a name from REPLAY_PROFILES or a dict of DEFAULT_PROFILE settings). Every request is handled
+# on its own thread. port=0 picks a free port.
+class ReplayServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, fixtures, profile='ideal', host='127.0.0.1', port=0, seed=0):
+        super().__init__((host, port), ReplayHandler)
+        self.fixtures = fixtures
+        self.profile = get_profile(profile)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.reset_stats()
+
+        # Base URLs with the same paths as ERCOT's
+        origin = f"http://{host}:{self.server_address[1]}"
+        self.api_base_url = origin + urlsplit(extract.DEFAULT_API_BASE_URL).path
+        self.price_base_url = origin + urlsplit(extract.DEFAULT_PRICE_BASE_URL).path
+        self.auth_url = origin + urlsplit(client.AUTH_URL).path
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'not_found': 0, 'bytes_sent': 0}
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    # Draws the simulated delay and failure of one request. Returns (seconds, status or None).
+    def draw_conditions(self):
+        profile = self.profile
+        with self.lock:
+            delay = max(0.0, profile['latency_s'] + self.random.uniform(-profile['jitter_s'], profile['jitter_s']))
+            draw = self.random.random()
+
+        if draw < profile['throttle_rate']:
+            return delay, 429
+        if draw < profile['throttle_rate'] + profile['error_rate']:
+            return delay, 503
+        return delay, None
+
+    def handle_get(self, handler):
+        self.count('requests')
+        delay, failure = self.draw_conditions()
+        if delay:
+            time.sleep(delay)
+
+        if failure == 429:
+            self.count('throttled')
+            return handler.send(429, b'{"statusCode": 429, "message": "Rate limit is exceeded."}',
+                                headers={'Retry-After': str(self.profile['retry_after_s'])})
+        if failure is not None:
+            self.count('errors')
+            return handler.send(failure, b'{"statusCode": 503, "message": "Service Unavailable"}')
+
+        path, params, page = split_url(handler.path)
+        fixture = self.fixtures.get(path, params)
+        if fixture is None:
+            self.count('not_found')
+            return handler.send(404, b'Not Found', 'text/plain')
+
+        status, content_type, body = fixture
+
+        # Split API responses into pages of the requested (or the profile's largest) size
+        requested = dict(parse_qsl(urlsplit(handler.path).query))
+        if status == 200 and 'page' in requested:
+            payload = json.loads(body)
+            size = int(requested.get('size') or len(payload.get('data') or []) or 1)
+            if self.profile['page_size']:
+                size = min(size, self.profile['page_size'])
+            body = json.dumps(paginate(payload, page, size)).encode('utf-8')
+
+        self.count('bytes_sent', len(body))
+        handler.send(status, body, content_type)
+
+    # Every POST is a sign-in request: answer with a token that never expires during a run
+    def handle_post(self, handler):
+        handler.rfile.read(int(handler.headers.get('Content-Length') or 0))
+        token = {'access_token': 'replay', 'refresh_token': 'replay', 'expires_in': 3600}
+        handler.send(200, json.dumps(token).encode('utf-8'))
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+### Recording ###
+
+# Runs the extract functions of the given sources against ERCOT and records their responses
+def record(directory=FIXTURE_DIRECTORY, sources=('price', 'load', 'wind', 'solar')):
+    import extract_transform_load.pipeline as pipeline
+
+    with Recorder(directory):
+        api_client = None
+        for name in sources:
+            extract_function, _, needs_api_client = pipeline.BRANCHES[name]
+            if needs_api_client:
+                api_client = api_client or extract.get_api_client()
+                extract_function(api_client)
+            else:
+                extract_function()
+
+        if api_client is not None:
+            api_client.close()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Record ERCOT responses or replay them from a local server')
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='record the responses of a full extract')
+    record_parser.add_argument('--fixtures', default=FIXTURE_DIRECTORY, help='fixture folder')
+    record_parser.add_argument('--sources', nargs='+', default=['price', 'load', 'wind', 'solar'],
+                               choices=['price', 'load', 'wind', 'solar'])
+
+    serve_parser = subparsers.add_parser('serve', help='serve the fixtures until interrupted')
+    serve_parser.add_argument('--fixtures', default=FIXTURE_DIRECTORY, help='fixture folder')
+    serve_parser.add_argument('--profile', default='typical', choices=list(REPLAY_PROFILES))
+    serve_parser.add_argument('--port', type=int, default=8055)
+    args = arg_parser.parse_args()
+
+    if args.command == 'record':
+        record(args.fixtures, args.sources)
+        return
+
+    server = ReplayServer(FixtureStore(args.fixtures), args.profile, port=args.port)
+    print(f"Serving {len(server.fixtures)} fixtures with the '{args.profile}' profile. Point the ETL at it with:\n"
+          f"  export ERCOT_API_BASE_URL={server.api_base_url}\n"
+          f"  export ERCOT_PRICE_BASE_URL={server.price_base_url}\n"
+          f"  export ERCOT_AUTH_URL={server.auth_url}\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.get_stats())
+
+if __name__ == '__main__':
+    main()
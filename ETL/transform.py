@@ -1,6 +1,9 @@
 ### IMPORT LIBRARIES ###
 import pandas as pd
+import numpy as np
+import extract_transform_load.impute as impute
 from itertools import product
+from operator import itemgetter
 
 #######################
 ### GENERAL METHODS ###
@@ -16,7 +19,7 @@ def flatten_lists(raw_data):
     for elem in raw_data:
 
         # Flattens one day (1 row, 2D list) into 24 hours (24 rows, 1D lists)
-        if len(elem) > 1:
+        if elem:
             hourly_data_list.extend(elem)
         
         # If the date is missing data, add one empty list to represent 24 hours (will fix later)
@@ -26,38 +29,97 @@ def flatten_lists(raw_data):
     return hourly_data_list
 
 # Flattens nested dictionaries
+# (raw_data can be a single response, a list of responses/pages, or a generator that yields pages as they arrive)
 def flatten_dictionaries(raw_data):
-    
-    # Flatten the nested dictionaries
-    flattened_data = pd.json_normalize(raw_data)
 
-    # Flatten 2D lists into 1D lists
+    # A single response is treated as one page
+    if isinstance(raw_data, dict):
+        raw_data = [raw_data]
+
+    # Flatten each page's 2D list of rows into one list of rows
     hourly_data_list = []
-    for elem in flattened_data['data']:
-        hourly_data_list.extend(elem)
+    for page in raw_data:
+        hourly_data_list.extend(page.get('data') or [])
 
     return hourly_data_list
 
-# Creates a pandas DataFrame with the desired columns and corrects the datatypes for some columns
-def create_df(hourly_data_list, all_cols, desired_cols):
-
-    # Create dataframe
-    df = pd.DataFrame(hourly_data_list, columns=all_cols)
-
-    # Slice a copy of the dataframe and keep only desired columns
-    df = df[desired_cols].copy()
+# Builds one float column from a sequence of raw values (numbers, numeric strings or None)
+def to_float_array(values):
+    try:
+        return np.array(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        # Some values are not numbers (e.g. empty strings), so convert them to NaN
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+# Parses hour-ending values (1, '01' or '01:00') into floats with NaNs for empty rows
+def to_hour_array(values):
+    try:
+        return np.array(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        # Remove the :00 from the hour strings
+        hours = pd.Series(values, dtype=object).astype(str).str.split(':', n=1).str[0]
+        return pd.to_numeric(hours, errors='coerce').to_numpy(dtype=np.float64)
+
+# Names of the daylight saving time flag in the raw data. The flag marks the repeated hour when clocks
+# fall back in November; it is kept as a boolean 'DST' column so load.merge_df can tell the two hours apart.
+DST_COLS = ['DST Flag', 'DSTFlag']
+
+def to_dst_array(values):
+    return np.array([value is True or value in ('Y', 'y', 'true', 'True') for value in values], dtype=bool)
+
+# Raises ValueError (naming the source and date) if a row does not have one value per column in all_cols.
+# Any row of the wrong width means the source changed its layout, so fail instead of dropping its values.
+# Empty rows (missing days) are allowed.
+def check_row_widths(hourly_data_list, all_cols, source='raw'):
+    width = len(all_cols)
+    bad_row = next((row for row in hourly_data_list if row and len(row) != width), None)
+    if bad_row is not None:
+        date = bad_row[all_cols.index('Date')] if len(bad_row) > all_cols.index('Date') else 'unknown date'
+        raise ValueError(f'{source} row for {date} has {len(bad_row)} values, expected {width}: {bad_row}')
+
+# Creates a pandas DataFrame with the desired columns and corrects the datatypes for some columns.
+# Only the desired column positions are read from each row: the measurements go straight into one
+# float array, and Date & Hour are parsed in one vectorized pass (no DataFrame with every column).
+# If the raw data has a DST flag, it is added as a boolean 'DST' column.
+# Raises ValueError (see check_row_widths) if a row does not have one value per column in all_cols.
+def create_df(hourly_data_list, all_cols, desired_cols, source='raw'):
+    check_row_widths(hourly_data_list, all_cols, source)
+
+    # Rows for missing days are empty lists, so replace them with rows of None
+    empty_row = [None] * len(all_cols)
+    rows = [row if row else empty_row for row in hourly_data_list]
+
+    # Positions of the desired measurement columns in each row
+    value_cols = [col for col in desired_cols if col not in ('Date', 'Hour')]
+    value_positions = [all_cols.index(col) for col in value_cols]
+
+    # Build a 2D float array of the measurements (NaNs for empty rows)
+    try:
+        get_values = itemgetter(*value_positions)
+        values = np.array([get_values(row) for row in rows], dtype=np.float64).reshape(len(rows), len(value_cols))
+    except (ValueError, TypeError):
+        # Some values are not numbers (e.g. empty strings), so convert column by column
+        values = np.column_stack([to_float_array([row[i] for row in rows]) for i in value_positions]) \
+            if rows else np.empty((0, len(value_cols)))
+
+    df = pd.DataFrame(values, columns=value_cols)
 
     # Convert 'Date' column to datetime objects with NaTs for empty rows
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce') 
+    date_position = all_cols.index('Date')
+    df.insert(0, 'Date', pd.to_datetime(pd.Series([row[date_position] for row in rows], dtype=object), errors='coerce'))
 
-    # Extract values in 'Hour' column as an integer if needed (removes the :00)
-    if df['Hour'].dtype == 'O' and df['Hour'].str.contains(':', na=False).any():
-        df['Hour'] = df['Hour'].str.split(':').str[0]
+    # Convert 'Hour' column to floats with NaNs for empty rows (removes the :00 if needed)
+    hour_position = all_cols.index('Hour')
+    df.insert(1, 'Hour', to_hour_array([row[hour_position] for row in rows]))
 
-    # Convert 'Hour' column to floats with NaNs for empty rows
-    df['Hour'] = pd.to_numeric(df['Hour'], errors='coerce')
+    # Keep the DST flag
+    for dst_col in DST_COLS:
+        if dst_col in all_cols:
+            dst_position = all_cols.index(dst_col)
+            df['DST'] = to_dst_array([row[dst_position] for row in rows])
+            return df[desired_cols + ['DST']]
 
-    return df
+    return df[desired_cols]
 
 # Drop missing rows of data if they are in the first or last positions in the dataframe
 def drop_missing_first_last_dates(df):
@@ -101,34 +163,29 @@ def fill_missing_dates(df):
     # Merge new dates & times with original index
     df = full_index.merge(df, on=['Date', 'Hour'], how='left')
 
+    # New rows are never the repeated DST hour
+    if 'DST' in df.columns:
+        df['DST'] = df['DST'].astype('boolean').fillna(False).astype(bool)
+
     return df
 
-# Fill empty rows of data with the historical average
-def replace_with_historical_avg(df):
+# Default strategy used to fill missing data points (see impute.STRATEGIES)
+IMPUTE_STRATEGY = 'hourly_mean'
 
-    # For feedback statement to user only
-    missing_data = df[df.isna().any(axis=1)] # select rows with missing data
-    missing_dates_list = missing_data['Date'].unique() # select dates with missing data
-    missing_dates_list = [date.strftime('%Y-%m-%d') for date in missing_dates_list] # turn dates into list of strings
-    
-    # Iterate through columns and replace missing data w/ historical avg
-    for column in list(df.columns):
-        
-        # Skip over Date and Hour columns
-        if 'Date' not in column and 'Hour' not in column and 'Unnamed' not in column:
-            
-            # Calculate hourly avgs for the column
-            hourly_avgs = df.groupby('Hour')[column].mean().round(2)
+# Handles missing dates and missing data points.
+# Returns the cleaned dataframe and a boolean mask of the cells that were imputed.
+def handle_missing_data(df, strategy=IMPUTE_STRATEGY):
 
-            # Fill missing values in the column
-            df[column] = df[column].fillna(df['Hour'].map(hourly_avgs))
+    if df.isnull().values.any():
 
-    # Inform user of changes
-    print(f'Used historical averages to replace missing data on these dates:')
-    for date in missing_dates_list:
-        print(date[:10])
+        # If first/last rows are missing data, drop rows
+        df = drop_missing_first_last_dates(df)
 
-    return df
+        # Fill in any empty rows with the correct dates & hours
+        df = fill_missing_dates(df)
+
+    # Once empty rows have correct dates, fill missing data points
+    return impute.impute(df, strategy)
 
 ##############################
 ### ELECTRICITY PRICE DATA ###
@@ -147,7 +204,7 @@ def get_price_cols():
     
     return all_cols, desired_cols
 
-def transform_price_data(raw_price_data):
+def transform_price_data(raw_price_data, strategy=IMPUTE_STRATEGY, return_mask=False):
 
     # Flatten the data (3D list --> 2D list) so that each row represents one hour of data
     hourly_price_list = flatten_lists(raw_price_data)
@@ -156,23 +213,17 @@ def transform_price_data(raw_price_data):
     all_cols, desired_cols = get_price_cols()
 
     # Create pandas DataFrame with desired columns and datatypes
-    price_df = create_df(hourly_price_list, all_cols, desired_cols)
+    price_df = create_df(hourly_price_list, all_cols, desired_cols, 'price')
     
     # Handle missing dates and missing data points
-    if price_df.isnull().values.any():
-
-        # If first/last rows are missing data, drop rows
-        price_df = drop_missing_first_last_dates(price_df)
-
-        # Fill in any empty rows with the correct dates & hours
-        price_df = fill_missing_dates(price_df)
-    
-        # Once empty rows have correct dates, fill missing data points via interpolation
-        price_df = replace_with_historical_avg(price_df)
+    price_df, imputed_mask = handle_missing_data(price_df, strategy)
 
     # Sort rows by oldest date and hour to newest (ascending)
     price_df.sort_values(['Date', 'Hour'], inplace=True)
 
+    if return_mask:
+        return price_df, imputed_mask
+
     return price_df
 
 ######################
@@ -191,7 +242,7 @@ def get_load_cols():
    
     return all_cols, desired_cols
 
-def transform_load_data(raw_load_data):
+def transform_load_data(raw_load_data, strategy=IMPUTE_STRATEGY, return_mask=False):
 
     # Flatten the data (nested dictionaries --> 2D list) so that each row represents one hour of data
     hourly_load_list = flatten_dictionaries(raw_load_data)
@@ -200,23 +251,17 @@ def transform_load_data(raw_load_data):
     all_cols, desired_cols = get_load_cols()
 
     # Create pandas DataFrame with desired columns and datatypes
-    load_df = create_df(hourly_load_list, all_cols, desired_cols)
+    load_df = create_df(hourly_load_list, all_cols, desired_cols, 'load')
 
     # Handle missing dates and missing data points
-    if load_df.isnull().values.any():
-
-        # If first/last rows are missing data, drop rows
-        load_df = drop_missing_first_last_dates(load_df)
-
-        # Fill in any empty rows with the correct dates & hours
-        load_df = fill_missing_dates(load_df)
-    
-        # Once empty rows have correct dates, fill missing data points via interpolation
-        load_df = replace_with_historical_avg(load_df)
+    load_df, imputed_mask = handle_missing_data(load_df, strategy)
 
     # Sort rows by oldest date and hour to newest (ascending)
     load_df.sort_values(['Date', 'Hour'], inplace=True)
     
+    if return_mask:
+        return load_df, imputed_mask
+
     return load_df
 
 #############################
@@ -239,7 +284,7 @@ def get_solar_cols():
 
     return all_cols, desired_cols
 
-def transform_solar_data(raw_solar_data):
+def transform_solar_data(raw_solar_data, strategy=IMPUTE_STRATEGY, return_mask=False):
     
     # Flatten the data (nested dictionaries --> 2D list) so that each row represents one hour of data
     hourly_solar_list = flatten_dictionaries(raw_solar_data)
@@ -248,23 +293,17 @@ def transform_solar_data(raw_solar_data):
     all_cols, desired_cols = get_solar_cols()
 
     # Create pandas DataFrame with desired columns and datatypes
-    solar_df = create_df(hourly_solar_list, all_cols, desired_cols)
+    solar_df = create_df(hourly_solar_list, all_cols, desired_cols, 'solar')
 
     # Handle missing dates and missing data points
-    if solar_df.isnull().values.any():
-
-        # If first/last rows are missing data, drop rows
-        solar_df = drop_missing_first_last_dates(solar_df)
-
-        # Fill in any empty rows with the correct dates & hours
-        solar_df = fill_missing_dates(solar_df)
-    
-        # Once empty rows have correct dates, fill missing data points via interpolation
-        solar_df = replace_with_historical_avg(solar_df)
+    solar_df, imputed_mask = handle_missing_data(solar_df, strategy)
 
     # Sort rows by oldest date and hour to newest (ascending)
     solar_df.sort_values(['Date', 'Hour'], inplace=True)
 
+    if return_mask:
+        return solar_df, imputed_mask
+
     return solar_df
 
 ############################
@@ -286,7 +325,7 @@ def get_wind_cols():
 
     return all_cols, desired_cols
 
-def transform_wind_data(raw_wind_data):
+def transform_wind_data(raw_wind_data, strategy=IMPUTE_STRATEGY, return_mask=False):
     
     # Flatten the data (nested dictionaries --> 2D list) so that each row represents one hour of data
     hourly_wind_list = flatten_dictionaries(raw_wind_data)
@@ -295,23 +334,15 @@ def transform_wind_data(raw_wind_data):
     all_cols, desired_cols = get_wind_cols()
 
     # Create pandas DataFrame with desired columns and datatypes
-    wind_df = create_df(hourly_wind_list, all_cols, desired_cols)
+    wind_df = create_df(hourly_wind_list, all_cols, desired_cols, 'wind')
 
     # Handle missing dates and missing data points
-    if wind_df.isnull().values.any():
-
-        # If first/last rows are missing data, drop rows
-        wind_df = drop_missing_first_last_dates(wind_df)
-
-        # Fill in any empty rows with the correct dates & hours
-        wind_df = fill_missing_dates(wind_df)
-
-        wind_df = replace_with_historical_avg(wind_df)
-    
-        # Once empty rows have correct dates, fill missing data points via interpolation
-        wind_df = replace_with_historical_avg(wind_df)
+    wind_df, imputed_mask = handle_missing_data(wind_df, strategy)
 
     # Sort rows by oldest date and hour to newest (ascending)
     wind_df.sort_values(['Date', 'Hour'], inplace=True)
 
+    if return_mask:
+        return wind_df, imputed_mask
+
     return wind_df
\ No newline at end of file
@@ -0,0 +1,166 @@
+# Import Libraries
+import argparse
+import sqlite3
+import pandas as pd
+from pathlib import Path
+import extract_transform_load.transform as transform
+import extract_transform_load.load as load
+
+########################
+### SQLITE WAREHOUSE ###
+########################
+
+# Keeps the stored data in one SQLite file (clean_data/ERCOT_Warehouse.sqlite) so it can be queried with
+# SQL over long histories without loading everything into pandas:
+#   hours                       every stored hour: Timestamp, Date, Hour
+#   price, load, wind, solar    one table per source: Timestamp + the source's columns
+#   merged                      view joining every source on Timestamp (the layout of the CSV export)
+# Timestamp is the UTC hour ending as 'yyyy-mm-ddThh:00:00Z' and the primary key of every table (tables are
+# stored WITHOUT ROWID, i.e. clustered by Timestamp, so time ranges are contiguous reads). Date & Hour use
+# the merged layout (hour ending 24 is hour 0) and are indexed for date-range queries.
+#
+# Each save is one transaction: rows are inserted in batches with executemany and hours that are already
+# stored are updated in place (INSERT ... ON CONFLICT DO UPDATE).
+#   warehouse.query("SELECT Date, AVG(Price_Hub_Avg) FROM merged WHERE Date >= '2025-03-01' GROUP BY Date")
+
+# Columns of each source table (the columns each transform keeps)
+WAREHOUSE_TABLES = {
+    'price': transform.get_price_cols,
+    'load': transform.get_load_cols,
+    'wind': transform.get_wind_cols,
+    'solar': transform.get_solar_cols,
+    }
+
+# Rows per executemany batch
+WAREHOUSE_BATCH_SIZE = 5000
+
+def get_warehouse_path():
+    return load.get_clean_data_directory() / "ERCOT_Warehouse.sqlite"
+
+def connect(path=None):
+    connection = sqlite3.connect(Path(path) if path else get_warehouse_path())
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+# Returns the columns of each source table that are in df
+def get_table_columns(columns):
+    tables = {}
+    for table, get_cols in WAREHOUSE_TABLES.items():
+        _, desired_cols = get_cols()
+        tables[table] = [col for col in desired_cols if col in columns and col not in ('Date', 'Hour')]
+    return tables
+
+### Schema ###
+
+def get_existing_columns(connection, table):
+    return [row[1] for row in connection.execute(f'PRAGMA table_info("{table}")')]
+
+# Creates the tables and the merged view, and adds columns that aren't in a table yet
+def create_tables(connection, table_columns):
+    connection.execute('CREATE TABLE IF NOT EXISTS hours '
+                       '(Timestamp TEXT PRIMARY KEY, Date TEXT NOT NULL, Hour INTEGER NOT NULL) WITHOUT ROWID')
+    connection.execute('CREATE INDEX IF NOT EXISTS hours_date ON hours (Date, Hour)')
+
+    changed = False
+    for table, columns in table_columns.items():
+        existing = get_existing_columns(connection, table)
+        if not existing:
+            value_cols = ''.join(f', "{col}" REAL' for col in columns)
+            connection.execute(f'CREATE TABLE "{table}" (Timestamp TEXT PRIMARY KEY{value_cols}) WITHOUT ROWID')
+            changed = True
+        for col in columns:
+            if existing and col not in existing:
+                connection.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}" REAL')
+                changed = True
+
+    # The view lists every column, so it is rebuilt whenever a table changes
+    if changed or not connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'merged'").fetchone():
+        joins, value_cols = '', ''
+        for table in WAREHOUSE_TABLES:
+            columns = [col for col in get_existing_columns(connection, table) if col != 'Timestamp']
+            if columns:
+                joins += f' LEFT JOIN "{table}" USING (Timestamp)'
+                value_cols += ''.join(f', "{table}"."{col}"' for col in columns)
+        connection.execute('DROP VIEW IF EXISTS merged')
+        connection.execute(f'CREATE VIEW merged AS SELECT hours.Timestamp, hours.Date, hours.Hour{value_cols} '
+                           f'FROM hours{joins}')
+
+### Saving ###
+
+# Converts NaN to None (NULL) and numpy scalars to Python types for sqlite3
+def to_rows(df):
+    values = df.astype(object).where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+def upsert_rows(connection, table, columns, rows):
+    col_list = ', '.join(f'"{col}"' for col in columns)
+    placeholders = ', '.join('?' * len(columns))
+    updates = ', '.join(f'"{col}" = excluded."{col}"' for col in columns if col != 'Timestamp')
+    sql = f'INSERT INTO "{table}" ({col_list}) VALUES ({placeholders}) ON CONFLICT (Timestamp) DO UPDATE SET {updates}'
+
+    for start in range(0, len(rows), WAREHOUSE_BATCH_SIZE):
+        connection.executemany(sql, rows[start:start + WAREHOUSE_BATCH_SIZE])
+
+# Upserts the merged dataframe (see load.merge_df) into the warehouse in one transaction. A source's row
+# is only written for hours where it has at least one value, so hours that only some sources cover (e.g.
+# the newest hours in live mode) don't overwrite the others with NULLs. The days in cleared_days
+# ({source: ['yyyy-mm-dd']}, see incremental.clear_days) are the exception: their missing values are
+# written as NULLs, like in the Parquet dataset.
+def save_to_warehouse(df, path=None, cleared_days=None):
+    path = Path(path) if path else get_warehouse_path()
+    df = load.sort_rows(load.to_storage_types(df))
+    timestamps = df['Timestamp'].dt.strftime('%Y-%m-%dT%H:00:00Z')
+    dates = df['Date'].dt.strftime('%Y-%m-%d')
+    table_columns = get_table_columns(df.columns)
+    cleared_days = cleared_days or {}
+
+    connection = connect(path)
+    try:
+        with connection:
+            create_tables(connection, table_columns)
+
+            hours = pd.DataFrame({'Timestamp': timestamps, 'Date': dates, 'Hour': df['Hour']})
+            upsert_rows(connection, 'hours', ['Timestamp', 'Date', 'Hour'], to_rows(hours))
+
+            for table, columns in table_columns.items():
+                if not columns:
+                    continue
+                present = (df[columns].notna().any(axis=1) | dates.isin(cleared_days.get(table, []))).to_numpy()
+                source_df = pd.concat([timestamps[present], df.loc[present, columns]], axis=1)
+                upsert_rows(connection, table, ['Timestamp'] + columns, to_rows(source_df))
+    finally:
+        connection.close()
+
+    print(f"Warehouse saved to: {path}\n")
+
+# Builds the warehouse from the Parquet dataset (e.g. after cloning the repo)
+def convert_parquet(path=None, parquet_directory=None):
+    df = load.read_parquet(directory=parquet_directory).set_index('Timestamp')
+    save_to_warehouse(df, path)
+
+### Reading ###
+
+# Runs a SQL query against the warehouse and returns the result as a dataframe
+def query(sql, params=(), path=None):
+    connection = sqlite3.connect(f"file:{Path(path) if path else get_warehouse_path()}?mode=ro", uri=True)
+    try:
+        return pd.read_sql_query(sql, connection, params=params)
+    finally:
+        connection.close()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Query the ERCOT SQLite warehouse')
+    arg_parser.add_argument('sql', nargs='?', default=None, help='SQL query to run')
+    arg_parser.add_argument('--path', default=None, help='warehouse file')
+    arg_parser.add_argument('--build', action='store_true', help='build the warehouse from the Parquet dataset first')
+    args = arg_parser.parse_args()
+
+    if args.build:
+        convert_parquet(args.path)
+    if args.sql:
+        with pd.option_context('display.max_rows', 100, 'display.width', 200):
+            print(query(args.sql, path=args.path))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Benchmarks the extract step against a local replay server (see replay.py) under simulated ERCOT conditions.
+#
+# Usage: python benchmarks/bench_extract.py [--fixtures DIR] [--profiles ideal typical ...] [--rate N]
+#
+# Without --fixtures, a full extract is first recorded from a synthetic ERCOT (synthetic.SyntheticERCOT)
+# into a temporary fixture folder, which also runs the record mode end to end. Each source is then
+# extracted from the replay server under every profile, and the requests/sec, end-to-end extract time and
+# extracted rows are reported (rows below the recorded count mean responses were lost to the simulated
+# failures). ERCOT's limit of 0.5 requests/sec would hide every other cost, so the shared rate limiter is
+# raised to --rate requests/sec.
+
+# Import Libraries
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+import extract_transform_load.client as client
+import extract_transform_load.extract as extract
+import extract_transform_load.replay as replay
+from synthetic import SyntheticERCOT
+
+SOURCES = ['price', 'load', 'wind', 'solar']
+
+def run_extract(name, api_client):
+    if name == 'price':
+        return extract.get_price_data()
+    return {'load': extract.get_load_data, 'wind': extract.get_wind_data, 'solar': extract.get_solar_data}[name](api_client)
+
+# Counts the rows of a raw payload (price days are lists of rows, API responses hold them in 'data')
+def count_rows(raw_data):
+    return sum(len(item) if isinstance(item, list) else len(item.get('data') or []) for item in raw_data)
+
+# Extracts one source from the server. Returns (rows, seconds, server stats).
+def measure(server, name):
+    extract.set_base_urls(server.api_base_url, server.price_base_url, server.auth_url)
+
+    # The replay server accepts any credentials
+    api_client = client.ErcotClient('replay', 'replay', 'replay', auth_url=server.auth_url,
+                                    rate_limiter=extract.API_RATE_LIMITER, pool_size=extract.API_MAX_WORKERS,
+                                    on_response=extract.record_response)
+    api_client.get_token()
+    server.reset_stats()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        raw_data = run_extract(name, api_client)
+    seconds = time.perf_counter() - start
+
+    api_client.close()
+    return count_rows(raw_data), seconds, server.get_stats()
+
+def record_synthetic(directory):
+    with replay.ReplayServer(SyntheticERCOT()) as server:
+        with replay.Recorder(directory):
+            return {name: measure(server, name)[0] for name in SOURCES}
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the extract step against a local replay server')
+    arg_parser.add_argument('--fixtures', default=None, help='recorded fixture folder (default: record a synthetic extract)')
+    arg_parser.add_argument('--profiles', nargs='+', default=list(replay.REPLAY_PROFILES), choices=list(replay.REPLAY_PROFILES))
+    arg_parser.add_argument('--sources', nargs='+', default=SOURCES, choices=SOURCES)
+    arg_parser.add_argument('--rate', type=float, default=1000.0, help='shared API rate limit (requests/sec)')
+    args = arg_parser.parse_args()
+
+    extract.API_RATE_LIMITER.configure(rate=args.rate, burst=max(1, int(args.rate)))
+    extract.RESPONSE_CACHE_ENABLED = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        expected = None
+        if args.fixtures is None:
+            expected = record_synthetic(directory)
+        fixtures = replay.FixtureStore(args.fixtures or directory)
+        print(f'{len(fixtures)} fixtures, rate limit {args.rate:g} requests/sec\n')
+
+        print(f"{'profile':<12}{'source':<8}{'requests':>10}{'429s':>6}{'5xxs':>6}{'req/s':>9}{'seconds':>10}{'rows':>8}")
+        for profile in args.profiles:
+            with replay.ReplayServer(fixtures, profile) as server:
+                for name in args.sources:
+                    rows, seconds, stats = measure(server, name)
+                    line = (f"{profile:<12}{name:<8}{stats['requests']:>10}{stats['throttled']:>6}{stats['errors']:>6}"
+                            f"{stats['requests'] / seconds:>9.1f}{seconds:>10.3f}{rows:>8}")
+                    if expected is not None and rows != expected[name]:
+                        line += f"  (expected {expected[name]})"
+                    print(line)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Benchmarks features.build_features against the notebook's per-day groupby features.
+#
+# Usage: python benchmarks/bench_features.py [--years N]
+#
+# The notebook builds a 1-hour price lag with groupby('Date').shift(1) and 3-hour rolling means with
+# groupby('Date').transform(lambda x: x.rolling(3, min_periods=1).mean()), restarting at every day.
+# features.py computes them over the continuous hourly index, so the values are checked against pandas
+# rolling over the same continuous index instead. A larger spec (more lags, windows and statistics) is
+# timed as well, along with extending the matrix by one day in incremental mode.
+
+# Import Libraries
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import extract_transform_load.features as features
+import extract_transform_load.load as load
+
+# Features similar to a fuller price model (several lags, daily/weekly windows)
+LARGE_SPEC = {
+    'lags': {col: [1, 2, 3, 24, 168] for col in ['Price_Hub_Avg', 'Load_Total', 'Wind_SystemWide', 'Solar_SystemWide']},
+    'rolling': {col: {'mean': [3, 24, 168], 'std': [24, 168], 'max': [24]}
+                for col in ['Price_Hub_Avg', 'Load_Total', 'Wind_SystemWide', 'Solar_SystemWide']},
+    'ratios': [('Wind_SystemWide', 'Solar_SystemWide'), ('Load_Total', 'Wind_SystemWide')],
+    }
+
+# Returns a merged-layout dataframe (Timestamp index, Date, Hour) with `years` of random hourly values
+def make_merged_df(years, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2020-01-01 07:00', periods=int(years * 8760), freq='h', tz='UTC', name='Timestamp')
+    dates, hours = load.local_dates_and_hours(timestamps)
+    df = pd.DataFrame({'Date': dates, 'Hour': hours}, index=timestamps)
+    for column, scale in [('Price_Hub_Avg', 40), ('Load_Total', 50000), ('Wind_SystemWide', 15000), ('Solar_SystemWide', 8000)]:
+        df[column] = scale * rng.uniform(0.5, 1.5, len(df))
+    return df
+
+# The notebook's feature code (kept here as the baseline)
+def notebook_features(df):
+    df_rf = df.copy()
+    df_rf['Prev_Hour_Price'] = df_rf.groupby('Date')['Price_Hub_Avg'].shift(1)
+    df_rf['Rolling_Price_3hr'] = df_rf.groupby('Date')['Price_Hub_Avg'].transform(lambda x: x.rolling(3, min_periods=1).mean())
+    df_rf['Rolling_Load_3hr'] = df_rf.groupby('Date')['Load_Total'].transform(lambda x: x.rolling(3, min_periods=1).mean())
+    df_rf['Wind_Solar_Ratio'] = df['Wind_SystemWide'] / (df['Solar_SystemWide'] + 1e-6)
+    return df_rf
+
+def best_time(function, *args, repeat=3):
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = min(seconds, time.perf_counter() - start)
+    return result, seconds
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark features.build_features')
+    arg_parser.add_argument('--years', type=float, default=5, help='years of hourly rows to generate')
+    args = arg_parser.parse_args()
+
+    df = make_merged_df(args.years)
+    print(f'{len(df)} hourly rows')
+
+    print(f"{'implementation':<28}{'seconds':>10}{'features':>10}")
+    _, seconds = best_time(notebook_features, df)
+    print(f"{'notebook groupby':<28}{seconds:>10.3f}{4:>10}")
+
+    default_features, seconds = best_time(features.build_features, df)
+    print(f"{'build_features (default)':<28}{seconds:>10.3f}{default_features.shape[1]:>10}")
+
+    large_features, seconds = best_time(features.build_features, df, LARGE_SPEC)
+    print(f"{'build_features (large)':<28}{seconds:>10.3f}{large_features.shape[1]:>10}")
+
+    # Incremental mode: build all but the last day, then extend by one day
+    builder = features.FeatureBuilder(LARGE_SPEC)
+    builder.build(df.iloc[:-24])
+    start = time.perf_counter()
+    extended = builder.extend(df.iloc[-24:])
+    print(f"{'extend by 24 hours (large)':<28}{time.perf_counter() - start:>10.3f}{extended.shape[1]:>10}")
+
+    # Values must match pandas rolling over the continuous index, and incremental must match a full build
+    price = df['Price_Hub_Avg']
+    np.testing.assert_allclose(default_features['Price_Hub_Avg_lag1'], price.shift(1))
+    np.testing.assert_allclose(default_features['Price_Hub_Avg_roll3_mean'], price.rolling(3, min_periods=1).mean())
+    np.testing.assert_allclose(large_features['Load_Total_roll168_std'], df['Load_Total'].rolling(168, min_periods=1).std(), rtol=1e-6)
+    np.testing.assert_allclose(large_features['Wind_SystemWide_roll24_max'], df['Wind_SystemWide'].rolling(24, min_periods=1).max())
+    np.testing.assert_allclose(extended.to_numpy(), large_features.to_numpy(), rtol=1e-6)
+
+if __name__ == '__main__':
+    main()
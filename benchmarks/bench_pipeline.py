@@ -0,0 +1,121 @@
+# Benchmarks every transform and load stage of the ETL pipeline on synthetic ERCOT payloads.
+#
+# Usage: python benchmarks/bench_pipeline.py [--days 30 365 1825] [--label NAME] [--compare OLD.json]
+#
+# For each window size the raw payloads are generated in the shapes extract.py returns, then each stage
+# (transform_*, merge_df, save_as_parquet, save_as_CSV) is timed and its peak traced memory is recorded.
+# Results are written to benchmarks/results/<label>.json so they can be compared between versions.
+
+# Import Libraries
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import extract_transform_load.transform as transform
+import extract_transform_load.load as load
+from synthetic import make_all_payloads
+
+RESULTS_DIRECTORY = Path(__file__).resolve().parent / "results"
+
+# Runs one stage: best wall time of `repeat` runs, then one traced run for peak memory
+def measure(function, args, repeat):
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {'seconds': round(seconds, 5), 'peak_mb': round(peak / 1e6, 3)}
+
+def run_window(days, missing_day_rate, missing_hour_rate, repeat, directory):
+    payloads = make_all_payloads(days, missing_day_rate=missing_day_rate, missing_hour_rate=missing_hour_rate)
+    stages = {}
+
+    # Transform every source
+    frames = {}
+    for source, function in [('price', transform.transform_price_data), ('load', transform.transform_load_data),
+                             ('wind', transform.transform_wind_data), ('solar', transform.transform_solar_data)]:
+        frames[source], stages[f'transform_{source}'] = measure(function, (payloads[source],), repeat)
+
+    # Merge, then save with each storage backend
+    merged_df, stages['merge_df'] = measure(load.merge_df, tuple(frames.values()), repeat)
+    _, stages['save_as_parquet'] = measure(load.save_as_parquet, (merged_df, directory / f'{days}_parquet'), repeat)
+    _, stages['save_as_CSV'] = measure(load.save_as_CSV, (merged_df, directory / f'{days}.csv'), repeat)
+
+    return {'rows': len(merged_df), 'columns': merged_df.shape[1], 'stages': stages}
+
+def get_git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent).stdout.strip() or None
+    except OSError:
+        return None
+
+def print_results(results, previous=None):
+    for days, window in results['windows'].items():
+        print(f"\n{days} days ({window['rows']} rows)")
+        print(f"{'stage':<20}{'seconds':>10}{'peak MB':>10}" + (f"{'vs old':>10}" if previous else ''))
+        for stage, stats in window['stages'].items():
+            line = f"{stage:<20}{stats['seconds']:>10.4f}{stats['peak_mb']:>10.2f}"
+
+            # Ratio of the new time to the old time (below 1 is faster)
+            old_stats = (previous or {}).get('windows', {}).get(days, {}).get('stages', {}).get(stage)
+            if old_stats:
+                line += f"{stats['seconds'] / old_stats['seconds']:>9.2f}x"
+            print(line)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the ETL transform and load stages')
+    arg_parser.add_argument('--days', type=int, nargs='+', default=[30, 365, 5 * 365], help='window sizes in days')
+    arg_parser.add_argument('--missing-day-rate', type=float, default=0.02)
+    arg_parser.add_argument('--missing-hour-rate', type=float, default=0.01)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage (best is kept)')
+    arg_parser.add_argument('--label', default=None, help='name of the results file (default: git revision)')
+    arg_parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    args = arg_parser.parse_args()
+
+    revision = get_git_revision()
+    results = {
+        'label': args.label or revision or datetime.now().strftime('%Y%m%d_%H%M%S'),
+        'git_revision': revision,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'missing_day_rate': args.missing_day_rate,
+        'missing_hour_rate': args.missing_hour_rate,
+        'windows': {},
+        }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for days in args.days:
+            results['windows'][str(days)] = run_window(days, args.missing_day_rate, args.missing_hour_rate,
+                                                       args.repeat, Path(directory))
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_results(results, previous)
+
+    # Save the results
+    RESULTS_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIRECTORY / f"{results['label']}.json"
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nResults saved to: {path}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Benchmarks the HTML table parsers behind extract.scrape_price_data.
+#
+# Usage: python benchmarks/bench_price_parser.py [--pages-dir DIR] [--pages N] [--workers N]
+#
+# Parses saved "{date}_dam_spp.html" pages from --pages-dir (or synthetic pages if no directory is given)
+# with every parser backend and reports pages per second, plus the process-pool path.
+
+# Import Libraries
+import argparse
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import extract_transform_load.extract as extract
+from synthetic import make_dates, make_price_page
+
+# Reads saved pages, or builds synthetic ones
+def load_pages(pages_dir, n_pages):
+    if pages_dir:
+        paths = sorted(Path(pages_dir).glob('*_dam_spp.html'))[:n_pages]
+        return [path.read_bytes() for path in paths]
+    return [make_price_page(date) for date in make_dates(n_pages)]
+
+def time_serial(pages, parser, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            extract.parse_price_page(page, parser)
+    return len(pages) * repeat / (time.perf_counter() - start)
+
+def time_process_pool(pages, parser, repeat, workers):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Warm up the worker processes so start-up time is not counted
+        list(executor.map(extract.parse_price_page, pages[:workers], [parser] * workers))
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(executor.map(extract.parse_price_page, pages, [parser] * len(pages), chunksize=4))
+        return len(pages) * repeat / (time.perf_counter() - start)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the DAM price page parsers')
+    arg_parser.add_argument('--pages-dir', default=None, help='folder of saved {date}_dam_spp.html pages')
+    arg_parser.add_argument('--pages', type=int, default=31, help='number of pages to parse')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='number of passes over the pages')
+    arg_parser.add_argument('--workers', type=int, default=4, help='processes for the process-pool run')
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args.pages_dir, args.pages)
+    if not pages:
+        raise SystemExit(f'No *_dam_spp.html pages found in {args.pages_dir}')
+
+    # Every backend must produce the same rows as BeautifulSoup
+    expected = [extract.parse_price_page(page, 'bs4') for page in pages]
+
+    print(f'{len(pages)} pages x {args.repeat} passes')
+    print(f"{'parser':<22}{'pages/sec':>12}")
+    for parser in extract.PRICE_PARSERS:
+        if parser == 'lxml' and extract.lxml_html is None:
+            print(f"{parser:<22}{'(not installed)':>12}")
+            continue
+        assert [extract.parse_price_page(page, parser) for page in pages] == expected, parser
+        print(f'{parser:<22}{time_serial(pages, parser, args.repeat):>12.1f}')
+
+    parser = extract.PRICE_PARSER
+    label = f'{parser} x{args.workers} processes'
+    print(f'{label:<22}{time_process_pool(pages, parser, args.repeat, args.workers):>12.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# Benchmarks the long-format settlement point prices (see prices.py) at real-time scale.
+#
+# Usage: python benchmarks/bench_prices.py [--nodes 300] [--days 365]
+#
+# A year of 15-minute prices for every node is built in long format (categorical settlement point,
+# float32 price) and compared in memory with the same prices as a wide float32 frame and as a wide
+# object-dtype frame (what building frames straight from the parsed rows gives). Then the conversion of
+# raw API pages, the hourly rollup, the pivot to the wide layout and the Parquet save/read are timed.
+
+# Import Libraries
+import argparse
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import extract_transform_load.prices as prices
+from bench_features import best_time
+from synthetic import make_day_list, make_node_price_rows, make_settlement_points
+
+def make_long_prices(days, nodes, start='2024-01-01', seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(pd.Timestamp(start, tz='UTC') + pd.Timedelta(minutes=15), periods=days * 96, freq='15min')
+    points = pd.Categorical.from_codes(np.tile(np.arange(nodes), len(timestamps)), categories=make_settlement_points(nodes))
+    return pd.DataFrame({'Timestamp': timestamps.repeat(nodes), 'SettlementPoint': points,
+                         'Price': rng.uniform(5, 80, len(timestamps) * nodes).astype(np.float32)})
+
+def megabytes(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark long-format settlement point prices')
+    arg_parser.add_argument('--nodes', type=int, default=300, help='settlement points')
+    arg_parser.add_argument('--days', type=int, default=365, help='days of 15-minute prices')
+    args = arg_parser.parse_args()
+
+    df, seconds = timed(make_long_prices, args.days, args.nodes)
+    print(f'{len(df):,} prices ({args.days} days x 96 intervals x {args.nodes} settlement points)\n')
+
+    # Memory of each layout
+    wide, pivot_seconds = timed(prices.to_wide, df)
+    print(f"{'layout':<28}{'MB':>10}")
+    print(f"{'long (categorical, float32)':<28}{megabytes(df):>10.1f}")
+    print(f"{'wide float32':<28}{megabytes(wide):>10.1f}")
+    wide_object = wide.astype(object)
+    print(f"{'wide object dtype':<28}{megabytes(wide_object):>10.1f}\n")
+    del wide_object
+
+    # Conversion of raw API rows (one day per page)
+    pages = [{'data': make_node_price_rows(day, make_settlement_points(args.nodes), np.random.default_rng(i))}
+             for i, day in enumerate(make_day_list(7, '2024-03-01'))]
+    rows = sum(len(page['data']) for page in pages)
+    _, convert_seconds = best_time(prices.node_pages_to_long, pages, repeat=1)
+
+    print(f"{'step':<28}{'seconds':>10}")
+    print(f"{'node pages --> long':<28}{convert_seconds:>10.3f}   ({rows / convert_seconds / 1e6:.2f} M rows/s)")
+    hourly, rollup_seconds = timed(prices.hourly_rollup, df)
+    print(f"{'hourly rollup (mean)':<28}{rollup_seconds:>10.3f}")
+    print(f"{'pivot to wide':<28}{pivot_seconds:>10.3f}")
+    _, seconds = timed(prices.to_wide, hourly, None, True)
+    print(f"{'pivot hourly to merged':<28}{seconds:>10.3f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        _, seconds = timed(prices.save_long_prices, df, 'RT', directory)
+        print(f"{'save Parquet':<28}{seconds:>10.3f}")
+        stored, seconds = timed(prices.read_long_prices, 'RT', None, None, None, directory)
+        print(f"{'read everything':<28}{seconds:>10.3f}")
+        _, seconds = timed(prices.read_long_prices, 'RT', '2024-06-01', '2024-06-30', ['HB_NORTH', 'HB_HOUSTON'], directory)
+        print(f"{'read 1 month, 2 points':<28}{seconds:>10.3f}")
+
+    assert len(stored) == len(df) and stored['Price'].dtype == np.float32
+    assert len(hourly) == len(df) // 4
+
+if __name__ == '__main__':
+    main()
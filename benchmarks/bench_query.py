@@ -0,0 +1,79 @@
+# Benchmarks query.QueryService against re-reading the CSV export for every query.
+#
+# Usage: python benchmarks/bench_query.py [--years N]
+#
+# A dashboard-style query (a month from the middle of the generated data, two columns, daily means) is
+# answered three ways: parsing the full CSV and filtering it in pandas (what every consumer did before), a
+# cold query (binary search over the array store's hour index, then resampling), and a repeated query
+# served from the result cache. One hour is then written with array_store.upsert_arrays to check that the
+# cache is invalidated.
+
+# Import Libraries
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import extract_transform_load.array_store as array_store
+import extract_transform_load.load as load
+import extract_transform_load.query as query
+from bench_features import make_merged_df, best_time
+
+COLUMNS = ['Price_Hub_Avg', 'Load_Total']
+
+# The old way: parse the whole CSV, filter the dates and group by day
+def csv_query(path, start, end):
+    df = pd.read_csv(path)
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df[(df['Date'] >= start) & (df['Date'] <= end)]
+    return df.groupby('Date')[COLUMNS].mean()
+
+# Returns a window of up to 30 days (yyyy-mm-dd strings) from the middle of the generated dates
+def get_query_window(df):
+    first, last = pd.Timestamp(df['Date'].min()), pd.Timestamp(df['Date'].max())
+    start = max(first, first + (last - first) / 2 - pd.Timedelta(days=15)).normalize()
+    end = min(last, start + pd.Timedelta(days=29))
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark query.QueryService')
+    arg_parser.add_argument('--years', type=float, default=5, help='years of hourly rows to generate')
+    args = arg_parser.parse_args()
+
+    df = make_merged_df(args.years)
+    start, end = get_query_window(df)
+    print(f'{len(df)} hourly rows, query {start} to {end}, daily means of {", ".join(COLUMNS)}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / 'ERCOT_Electricity_Data.csv'
+        load.save_as_CSV(df, csv_path)
+        array_store.save_as_arrays(df, Path(directory) / 'arrays')
+
+        print(f"{'implementation':<28}{'milliseconds':>14}")
+        expected, seconds = best_time(csv_query, csv_path, start, end)
+        print(f"{'full CSV parse + filter':<28}{seconds * 1000:>14.2f}")
+
+        service = query.QueryService(Path(directory) / 'arrays')
+        service.refresh()
+        begin = time.perf_counter()
+        cold = service.query(COLUMNS, start, end, freq='day')
+        print(f"{'query (cold)':<28}{(time.perf_counter() - begin) * 1000:>14.2f}")
+
+        warm, seconds = best_time(service.query, COLUMNS, start, end, 'day')
+        print(f"{'query (cached)':<28}{seconds * 1000:>14.2f}")
+        print(service.get_stats())
+
+        # Stored values are rounded to PRECISION_POLICY, the CSV keeps every digit
+        np.testing.assert_allclose(cold.to_numpy(), expected.to_numpy(), atol=0.1)
+        pd.testing.assert_frame_equal(cold, warm)
+
+        # A write must invalidate the cache
+        changed = df.loc[df['Date'] == start].iloc[:1].assign(Price_Hub_Avg=1e4)
+        array_store.upsert_arrays(changed, Path(directory) / 'arrays')
+        after = service.query(COLUMNS, start, end, freq='day')
+        assert after['Price_Hub_Avg'].iloc[0] > cold['Price_Hub_Avg'].iloc[0]
+        print(f"after a write: {service.get_stats()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+# Import Libraries
+import json
+import math
+import random
+from datetime import datetime, timedelta
+
+##############################################
+### SYNTHETIC ERCOT PAYLOADS FOR BENCHMARKS ###
+##############################################
+
+# Every generator returns data in the exact shape the matching extract.py function returns, so the
+# transform and load stages can be run without ERCOT. Missing days and missing hours are simulated with
+# `missing_day_rate` and `missing_hour_rate` (probabilities between 0 and 1).
+
+# Column headers on ERCOT's DAM settlement point price page (same order as transform.get_price_cols)
+PRICE_PAGE_HEADERS = ['Oper Day', 'Hour Ending', 'HB_BUSAVG', 'HB_HOUSTON', 'HB_HUBAVG', 'HB_NORTH', 'HB_PAN',
+                      'HB_SOUTH', 'HB_WEST', 'LZ_AEN', 'LZ_CPS', 'LZ_HOUSTON', 'LZ_LCRA', 'LZ_NORTH', 'LZ_RAYBN',
+                      'LZ_SOUTH', 'LZ_WEST']
+
+# Number of columns in each raw API row (see transform.get_load_cols, get_wind_cols, get_solar_cols)
+API_ROW_WIDTHS = {'load': 12, 'wind': 29, 'solar': 33}
+
+# Returns a list of date objects for `days` consecutive days
+def make_day_list(days, start='2020-01-01'):
+    start_date = datetime.strptime(start, '%Y-%m-%d').date()
+    return [start_date + timedelta(days=i) for i in range(days)]
+
+# Returns a list of yyyymmdd strings for `days` consecutive days
+def make_dates(days, start='2020-01-01'):
+    return [day.strftime('%Y%m%d') for day in make_day_list(days, start)]
+
+# Daily shape of each source (scaled 0-1 by hour ending)
+def daily_shape(source, hour):
+    if source == 'solar':
+        return max(0.0, math.sin(math.pi * (hour - 6) / 14))
+    if source == 'wind':
+        return 0.6 + 0.4 * math.cos(math.pi * hour / 12)
+    return 0.75 + 0.25 * math.sin(math.pi * (hour - 9) / 12)
+
+## Price Data ##
+
+def make_price_rows(day, rng):
+    oper_day = day.strftime('%m/%d/%Y')
+    return [[oper_day, f'{hour:02d}'] + [f'{rng.uniform(10, 40) + 60 * daily_shape("price", hour):.2f}'
+                                         for _ in PRICE_PAGE_HEADERS[2:]]
+            for hour in range(1, 25)]
+
+# Builds an HTML page shaped like "https://www.ercot.com/content/cdr/html/{date}_dam_spp.html"
+def make_price_page(date, seed=0):
+    rng = random.Random(f'{date}-{seed}')
+    rows = make_price_rows(datetime.strptime(date, '%Y%m%d').date(), rng)
+    return make_price_html('DAM Settlement Point Prices', PRICE_PAGE_HEADERS, rows)
+
+# Rows of the real-time price page: one per 15-minute interval ending ('0015' to '2400')
+def make_rt_price_rows(day, rng):
+    oper_day = day.strftime('%m/%d/%Y')
+    return [[oper_day, f'{minutes // 60:02d}{minutes % 60:02d}']
+            + [f'{rng.uniform(5, 50) + 60 * daily_shape("price", minutes / 60):.2f}' for _ in PRICE_PAGE_HEADERS[2:]]
+            for minutes in range(15, 24 * 60 + 1, 15)]
+
+# Builds an HTML page shaped like "https://www.ercot.com/content/cdr/html/{date}_real_time_spp.html"
+def make_rt_price_page(date, seed=0):
+    rng = random.Random(f'rt-{date}-{seed}')
+    rows = make_rt_price_rows(datetime.strptime(date, '%Y%m%d').date(), rng)
+    headers = ['Oper Day', 'Interval Ending'] + PRICE_PAGE_HEADERS[2:]
+    return make_price_html('Real-Time Settlement Point Prices', headers, rows)
+
+def make_price_html(title, headers, rows):
+
+    # Page header and navigation (the real pages carry a lot of markup around the table)
+    lines = [f'<html><head><title>{title}</title>',
+             '<link rel="stylesheet" href="/content/cdr/css/reportstyles.css"></head><body>',
+             f'<div class="header"><span class="title">{title}</span></div>',
+             '<table class="reportTable">',
+             '<tr>' + ''.join(f'<th class="headerValueClass">{header}</th>' for header in headers) + '</tr>']
+
+    # One row per hour ending
+    for row in rows:
+        lines.append('<tr>' + ''.join(f'<td class="labelClassCenter">{cell}</td>' for cell in row) + '</tr>')
+
+    lines.append('</table></body></html>')
+    return '\n'.join(lines).encode('utf-8')
+
+# Nested lists shaped like extract.get_price_data(): one list of hourly rows per day ([] for a missing day)
+def make_price_payload(days, start='2020-01-01', missing_day_rate=0.0, missing_hour_rate=0.0, seed=0):
+    rng = random.Random(seed)
+
+    raw_price_data = []
+    for day in make_day_list(days, start):
+        if rng.random() < missing_day_rate:
+            raw_price_data.append([])
+            continue
+        rows = make_price_rows(day, rng)
+        raw_price_data.append([row for row in rows if rng.random() >= missing_hour_rate])
+
+    return raw_price_data
+
+## API Data ##
+
+# Builds one raw API row for a source
+def make_api_row(source, day, hour, rng):
+    date = day.strftime('%Y-%m-%d')
+    scale = {'load': 8000, 'wind': 3000, 'solar': 2500}[source]
+    n_values = API_ROW_WIDTHS[source] - (3 if source == 'load' else 4)
+    values = [round(scale * daily_shape(source, hour) * rng.uniform(0.8, 1.2), 2) for _ in range(n_values)]
+
+    # Load: date, 'HH:00', values, DST flag ('Y'/'N')
+    if source == 'load':
+        return [date, f'{hour:02d}:00'] + values + ['N']
+
+    # Wind & solar: posted datetime, delivery date, hour ending, values, DST flag (bool)
+    posted = (day + timedelta(days=1)).strftime('%Y-%m-%dT23:55:00')
+    return [posted, date, hour] + values + [False]
+
+# Builds rows for every day and hour, skipping missing days/hours
+def make_api_rows(source, day_list, rng, missing_day_rate, missing_hour_rate):
+    rows_by_day = []
+    for day in day_list:
+        if rng.random() < missing_day_rate:
+            rows_by_day.append([])
+            continue
+        rows_by_day.append([make_api_row(source, day, hour, rng) for hour in range(1, 25)
+                            if rng.random() >= missing_hour_rate])
+    return rows_by_day
+
+def make_page(rows, page=1, total_pages=1, page_size=None):
+    return {'_meta': {'totalRecords': len(rows), 'pageSize': page_size or len(rows), 'totalPages': total_pages,
+                      'currentPage': page},
+            'data': rows}
+
+# Shaped like extract.get_load_data() (a list of response pages) for 'load', and like
+# extract.get_wind_data()/get_solar_data() (one response per delivery day) for 'wind' and 'solar'
+def make_api_payload(source, days, start='2020-01-01', missing_day_rate=0.0, missing_hour_rate=0.0, seed=0,
+                     page_size=10000):
+    rng = random.Random(f'{source}-{seed}')
+    rows_by_day = make_api_rows(source, make_day_list(days, start), rng, missing_day_rate, missing_hour_rate)
+
+    # Generation data: one response per day (the extract functions go backwards in time)
+    if source != 'load':
+        return [make_page(rows) for rows in reversed(rows_by_day)]
+
+    # Load data: one paginated response for the whole range
+    rows = [row for day_rows in rows_by_day for row in day_rows]
+    total_pages = max(1, math.ceil(len(rows) / page_size))
+    return [make_page(rows[i * page_size:(i + 1) * page_size], i + 1, total_pages, page_size)
+            for i in range(total_pages)]
+
+# Names of `nodes` settlement points: the hubs and load zones, then resource nodes
+def make_settlement_points(nodes):
+    points = PRICE_PAGE_HEADERS[2:] + [f'RN_{i:05d}' for i in range(max(0, nodes - len(PRICE_PAGE_HEADERS[2:])))]
+    return points[:nodes]
+
+# Rows of the node price API for one day (see prices.NODE_PRICE_COLS): every 15-minute interval of every
+# settlement point
+def make_node_price_rows(day, points, rng):
+    date = day.strftime('%Y-%m-%d')
+    return [[date, hour, interval, point, point[:2] if point[:2] in ('HB', 'LZ') else 'RN',
+             round(rng.uniform(5, 50) + 60 * daily_shape('price', hour), 2), False]
+            for hour in range(1, 25) for interval in range(1, 5) for point in points]
+
+# Returns a flat list of wind/solar-shaped rows with `n_cols` columns
+def make_generation_rows(days, n_cols, start='2020-01-01', seed=0):
+    rng = random.Random(seed)
+    n_values = n_cols - 4
+
+    rows = []
+    for day in make_day_list(days, start):
+        for hour in range(1, 25):
+            row = make_api_row('wind', day, hour, rng)
+            rows.append(row[:3] + (row[3:-1] * 2)[:n_values] + [False])
+    return rows
+
+# Returns raw payloads for all four sources
+def make_all_payloads(days, start='2020-01-01', missing_day_rate=0.0, missing_hour_rate=0.0, seed=0):
+    options = dict(start=start, missing_day_rate=missing_day_rate, missing_hour_rate=missing_hour_rate, seed=seed)
+    return {
+        'price': make_price_payload(days, **options),
+        'load': make_api_payload('load', days, **options),
+        'wind': make_api_payload('wind', days, **options),
+        'solar': make_api_payload('solar', days, **options),
+        }
+
+## Simulated ERCOT Endpoints ##
+
+# Last part of the path of each API endpoint (see extract.py)
+API_PATH_ENDINGS = {'load': 'act_sys_load_by_wzn', 'wind': 'wpp_hrly_actual_fcast_geo', 'solar': 'spp_hrly_actual_fcast_geo',
+                    'nodes': 'spp_node_zone_hub'}
+
+# Answers requests like ERCOT would, for any dates, so a replay.ReplayServer can serve a full extract (or a
+# replay.Recorder can record one) without recorded fixtures. get(path, params) returns
+# (status, content type, body) like replay.FixtureStore. Every day's rows are seeded by the day, so the
+# same day gets the same rows whatever request it is part of.
+class SyntheticERCOT:
+
+    def __init__(self, seed=0, nodes=50):
+        self.seed = seed
+        self.points = make_settlement_points(nodes)
+
+    def get(self, path, params):
+        if path.endswith('_dam_spp.html'):
+            return 200, 'text/html', make_price_page(path.rsplit('/', 1)[-1][:8], self.seed)
+        if path.endswith('_real_time_spp.html'):
+            return 200, 'text/html', make_rt_price_page(path.rsplit('/', 1)[-1][:8], self.seed)
+
+        source = next((source for source, ending in API_PATH_ENDINGS.items() if path.endswith(ending)), None)
+        if source is None:
+            return None
+
+        first, last = ((params['operatingDayFrom'], params['operatingDayTo']) if source == 'load'
+                       else (params['deliveryDateFrom'], params['deliveryDateTo']))
+        days = (datetime.strptime(last, '%Y-%m-%d') - datetime.strptime(first, '%Y-%m-%d')).days + 1
+
+        rows = []
+        for day in make_day_list(days, first):
+            rng = random.Random(f'{source}-{day}-{self.seed}')
+            if source == 'nodes':
+                points = [params['settlementPoint']] if 'settlementPoint' in params else self.points
+                rows += make_node_price_rows(day, points, rng)
+            else:
+                rows += [make_api_row(source, day, hour, rng) for hour in range(1, 25)]
+
+        # Generation rows carry the time of the posting they were requested from, and a posting only holds
+        # the hours that ended in the 48 hours before it (and the forecast hours after it)
+        if source in ('wind', 'solar'):
+            posted = params['postedDatetimeFrom'][:14] + '55:00'
+            oldest = datetime.fromisoformat(posted) - timedelta(hours=48)
+            rows = [[posted] + row[1:] for row in rows
+                    if datetime.strptime(row[1], '%Y-%m-%d') + timedelta(hours=row[2]) > oldest]
+
+        return 200, 'application/json', json.dumps(make_page(rows)).encode('utf-8')
@@ -0,0 +1,89 @@
+# Shared pytest fixtures. The tests import the package as extract_transform_load (like the benchmarks do),
+# send their requests to local stub servers instead of ERCOT, and build data with benchmarks/synthetic.py.
+
+# Import Libraries
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+import pytest
+import extract_transform_load.extract as extract
+
+# The synthetic ERCOT data of the benchmarks is reused by the tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.handle(self)
+
+    def do_POST(self):
+        self.server.handle(self)
+
+    def log_message(self, format, *args):
+        pass
+
+# Serves every request with respond(request), which returns (status, body, headers). A body that is not
+# bytes is sent as JSON. Every request is kept in .requests as {'method', 'path', 'params', 'headers', 'body'}.
+class StubServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, respond):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.respond = respond
+        self.requests = []
+        self.lock = threading.Lock()
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def handle(self, handler):
+        url = urlsplit(handler.path)
+        length = int(handler.headers.get('Content-Length') or 0)
+        request = {'method': handler.command, 'path': url.path, 'params': dict(parse_qsl(url.query)),
+                   'headers': dict(handler.headers), 'body': handler.rfile.read(length) if length else b''}
+        with self.lock:
+            self.requests.append(request)
+
+        status, body, headers = self.respond(request)
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+
+        handler.send_response(status)
+        handler.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def count(self, path=None):
+        with self.lock:
+            return sum(path is None or request['path'] == path for request in self.requests)
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+# Starts stub servers for a test: stub_server(respond) returns a running StubServer
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(respond):
+        servers.append(StubServer(respond))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+# Every request goes to the stub server (never to the on-disk response cache)
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(extract, 'RESPONSE_CACHE_ENABLED', False)
@@ -0,0 +1,57 @@
+# Import Libraries
+import numpy as np
+import pandas as pd
+import extract_transform_load.analytics as analytics
+import extract_transform_load.array_store as array_store
+import extract_transform_load.load as load
+
+# Hourly merged rows (indexed by UTC hour-ending timestamps) with random measurements
+def make_merged_df(hours, start='2024-01-01 07:00', seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start, periods=hours, freq='h', tz='UTC', name='Timestamp')
+    dates, hour = load.local_dates_and_hours(timestamps)
+    df = pd.DataFrame({'Date': dates, 'Hour': hour}, index=timestamps)
+    for column in analytics.CUBE_COLUMNS:
+        df[column] = rng.uniform(10, 100, hours)
+    return df
+
+def get_expected_means(df, keys):
+    rows = analytics.get_cube_rows(array_store.to_epoch_hours(df.index), df)
+    return rows.groupby(keys)[analytics.CUBE_COLUMNS].mean()
+
+def test_overlapping_ingests_match_a_full_group_by(tmp_path):
+    df = make_merged_df(24 * 100)
+
+    # A wrong first version of some hours is replaced by the later ingests
+    wrong = df.iloc[500:700].copy()
+    wrong[analytics.CUBE_COLUMNS] = 99999.0
+    analytics.update_cubes(wrong, tmp_path)
+    for start in range(0, len(df), 300):
+        analytics.update_cubes(df.iloc[max(0, start - 50):start + 300], tmp_path)
+
+    cubes = analytics.AggregateCubes(tmp_path)
+    for name, keys in analytics.CUBES.items():
+        got = cubes.get_means(name)[analytics.CUBE_COLUMNS]
+        expected = get_expected_means(df, keys)
+        np.testing.assert_allclose(got.sort_index().to_numpy(), expected.sort_index().to_numpy(), rtol=1e-9)
+        assert len(got) == len(expected)
+
+    daily_max = analytics.get_cube_rows(array_store.to_epoch_hours(df.index), df).groupby('Date')['Load_Total'].max()
+    np.testing.assert_allclose(cubes.get_means('date')['Load_Total_max'].to_numpy(), daily_max.to_numpy())
+
+def test_ingest_reads_and_rewrites_only_the_months_it_touches(tmp_path):
+    df = make_merged_df(24 * 120)
+    analytics.update_cubes(df, tmp_path)
+    ledger_paths = sorted((tmp_path / 'ingested').glob('*.parquet'))
+    assert [path.stem for path in ledger_paths] == ['2024-01', '2024-02', '2024-03', '2024-04']
+
+    # Three hours in the middle of a month
+    cubes = analytics.AggregateCubes(tmp_path)
+    cubes.ingest(df.loc['2024-02-10 00:00':'2024-02-10 02:00'].assign(Load_Total=1.0))
+    assert set(cubes.ledger) == set(cubes.dirty_months) == {pd.Timestamp('2024-02-01', tz='UTC')}
+
+    cubes.save()
+    reopened = analytics.AggregateCubes(tmp_path)
+    expected = get_expected_means(df.assign(Load_Total=df['Load_Total'].mask(
+        (df.index >= '2024-02-10 00:00') & (df.index <= '2024-02-10 02:00'), 1.0)), ['Hour'])
+    np.testing.assert_allclose(reopened.get_means('hour')['Load_Total'].to_numpy(), expected['Load_Total'].to_numpy())
@@ -0,0 +1,56 @@
+# Import Libraries
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+import extract_transform_load.array_store as array_store
+import extract_transform_load.load as load
+
+# Hourly merged rows (indexed by UTC hour-ending timestamps) with a price and a load column
+def make_merged_df(hours, start='2024-01-01 07:00', seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start, periods=hours, freq='h', tz='UTC', name='Timestamp')
+    dates, hour = load.local_dates_and_hours(timestamps)
+    return pd.DataFrame({'Date': dates, 'Hour': hour, 'Price_Hub_Avg': rng.uniform(10, 100, hours).round(2),
+                         'Load_Total': rng.uniform(30000, 60000, hours).round(1)}, index=timestamps)
+
+def quietly(function, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+def read_store(directory):
+    return array_store.ArrayStore(directory).to_df()
+
+def test_upserts_match_full_rewrites(tmp_path, monkeypatch):
+    df = make_merged_df(24 * 10)
+    updates = [df.iloc[:48], df.iloc[40:100], df.iloc[100:101], df.iloc[90:240].assign(Load_Total=1.0)]
+
+    for update in updates:
+        quietly(array_store.save_as_arrays, update, tmp_path / 'full')
+
+    # Every upsert after the first is done in place (no full rewrite)
+    quietly(array_store.upsert_arrays, updates[0], tmp_path / 'upsert')
+    monkeypatch.setattr(array_store, 'save_as_arrays', None)
+    for update in updates[1:]:
+        quietly(array_store.upsert_arrays, update, tmp_path / 'upsert')
+
+    pd.testing.assert_frame_equal(read_store(tmp_path / 'upsert'), read_store(tmp_path / 'full'))
+    assert len(array_store.ArrayStore(tmp_path / 'upsert')) == 240
+
+def test_interrupted_appends_are_cut_off(tmp_path):
+    df = make_merged_df(24 * 3)
+    quietly(array_store.save_as_arrays, df.iloc[:48], tmp_path)
+
+    # An append that stopped after the price column, before the epoch hours
+    path = tmp_path / 'Price_Hub_Avg.npy'
+    header, dtype = array_store.get_grown_header(path, 60)
+    array_store.append_array(path, np.full(12, 999.0), 48, header, dtype)
+
+    store = array_store.ArrayStore(tmp_path)
+    assert len(store.column('Price_Hub_Avg')) == len(store) == 48
+    pd.testing.assert_frame_equal(store.to_df(), df.iloc[:48], check_freq=False, check_names=False)
+    del store
+
+    # The next append overwrites the rows left behind
+    quietly(array_store.upsert_arrays, df.iloc[48:], tmp_path)
+    pd.testing.assert_frame_equal(read_store(tmp_path), df, check_freq=False, check_names=False)
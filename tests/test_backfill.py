@@ -0,0 +1,64 @@
+# Import Libraries
+import pytest
+import requests
+import extract_transform_load.backfill as backfill
+import extract_transform_load.client as client
+import extract_transform_load.extract as extract
+
+@pytest.fixture
+def price_server(stub_server, monkeypatch):
+    def start(respond):
+        server = stub_server(respond)
+        monkeypatch.setattr(extract, 'PRICE_URL', server.url + extract.PRICE_PAGE)
+        monkeypatch.setattr(extract, 'PRICE_MAX_RETRIES', 1)
+        return server
+    return start
+
+def test_failed_price_units_are_not_checkpointed(price_server, tmp_path):
+    server = price_server(lambda request: (503, b'Service Unavailable', {'Retry-After': '0'}))
+
+    result = backfill.run_backfill('2024-12-01', '2024-12-03', sources=['price'], directory=tmp_path)
+
+    assert result['done'] == 0 and len(result['failed']) == 3
+    assert all(isinstance(error, requests.HTTPError) for error in result['failed'].values())
+    assert server.count() == 3 * 2
+    assert not list(tmp_path.rglob('*.json.gz'))
+
+def test_missing_price_pages_are_retried_on_the_next_run(price_server, tmp_path):
+    posted = {'20241201'}
+    page = b"<table><tr><td>12/01/2024</td><td>01</td><td>25.50</td></tr></table>"
+    price_server(lambda request: (200, page, None) if request['path'].strip('/')[:8] in posted else (404, b'', None))
+
+    result = backfill.run_backfill('2024-12-01', '2024-12-02', sources=['price'], directory=tmp_path)
+    assert result['done'] == 1 and list(result['failed']) == [('price', backfill.get_days('2024-12-02', '2024-12-02')[0])]
+
+    # Once the page is posted, only the failed unit is fetched again
+    posted.add('20241202')
+    result = backfill.run_backfill('2024-12-01', '2024-12-02', sources=['price'], directory=tmp_path)
+    assert result == {'done': 1, 'skipped': 1, 'failed': {}}
+
+# API units whose day is not posted yet (the API answers with no rows) stay pending
+@pytest.mark.parametrize('source', ['load', 'wind', 'solar'])
+def test_api_units_without_rows_are_retried_on_the_next_run(stub_server, monkeypatch, tmp_path, source):
+    posted = {'2024-12-01'}
+
+    def respond(request):
+        day = request['params'].get('deliveryDateTo') or request['params'].get('operatingDayTo')
+        rows = [[day, '01:00', 40000.0]] if day in posted else []
+        return 200, {'_meta': {'totalPages': 1}, 'data': rows}, None
+
+    server = stub_server(respond)
+    auth_server = stub_server(lambda request: (200, {'access_token': 'token', 'expires_in': 3600}, None))
+    monkeypatch.setattr(extract, 'get_api_client', lambda: client.ErcotClient('user', 'password', 'key',
+                                                                             auth_url=auth_server.url + '/token'))
+    for name in ('LOAD_API_ENDPOINT', 'WIND_API_ENDPOINT', 'SOLAR_API_ENDPOINT'):
+        monkeypatch.setattr(extract, name, server.url + '/' + name.lower())
+
+    result = backfill.run_backfill('2024-12-01', '2024-12-02', sources=[source], directory=tmp_path)
+    assert result['done'] == 1 and list(result['failed']) == [(source, backfill.get_days('2024-12-02', '2024-12-02')[0])]
+    assert [path.name for path in (tmp_path / source).iterdir()] == ['2024-12-01.json.gz']
+
+    # Once the day is posted, only the failed unit is fetched again
+    posted.add('2024-12-02')
+    result = backfill.run_backfill('2024-12-01', '2024-12-02', sources=[source], directory=tmp_path)
+    assert result == {'done': 1, 'skipped': 1, 'failed': {}}
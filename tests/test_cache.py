@@ -0,0 +1,23 @@
+# Import Libraries
+import extract_transform_load.cache as cache
+
+def test_put_keeps_a_running_total_and_evicts_least_recently_used(tmp_path):
+    response_cache = cache.ResponseCache(tmp_path, max_bytes=2000)
+    keys = [cache.make_key(f'https://example.com/{i}') for i in range(40)]
+    for key in keys:
+        response_cache.put(key, bytes(range(256)) * 4)
+
+    assert response_cache.total_bytes == sum(entry['size'] for entry in response_cache.index.values())
+    assert response_cache.total_bytes <= 2000
+    assert keys[-1] in response_cache.index and keys[0] not in response_cache.index
+
+def test_index_is_written_once_per_batch(tmp_path):
+    response_cache = cache.ResponseCache(tmp_path)
+    key = cache.make_key('https://example.com/page', {'page': 1})
+    response_cache.put(key, b'content', immutable=True)
+    assert not response_cache.index_path.exists()
+
+    response_cache.save_index()
+    reopened = cache.ResponseCache(tmp_path)
+    assert reopened.get(key) == b'content'
+    assert reopened.total_bytes == response_cache.total_bytes
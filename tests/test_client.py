@@ -0,0 +1,107 @@
+# Import Libraries
+import threading
+import time
+from urllib.parse import parse_qsl
+import pytest
+import requests
+import extract_transform_load.client as client
+
+# Issues token-1, token-2, ... and keeps the form data of every token request
+class TokenIssuer:
+
+    def __init__(self, expires_in=3600):
+        self.expires_in = expires_in
+        self.grants = []
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        with self.lock:
+            self.grants.append(dict(parse_qsl(request['body'].decode())))
+            number = len(self.grants)
+        return 200, {'access_token': f'token-{number}', 'refresh_token': f'refresh-{number}',
+                     'expires_in': self.expires_in}, None
+
+def get_token(request):
+    return request['headers'].get('Authorization', '').replace('Bearer ', '')
+
+def make_client(stub_server, issuer, **kwargs):
+    auth_server = stub_server(issuer)
+    return client.ErcotClient('user', 'password', 'key', auth_url=auth_server.url + '/token', **kwargs)
+
+def test_rejected_token_is_refreshed_once(stub_server):
+    issuer = TokenIssuer()
+    api_client = make_client(stub_server, issuer)
+
+    # The first token is revoked by the server
+    server = stub_server(lambda request: (401, b'', None) if get_token(request) == 'token-1' else (200, {'data': []}, None))
+    response = api_client.get(server.url + '/data')
+    api_client.close()
+
+    assert response.status_code == 200
+    assert [grant['grant_type'] for grant in issuer.grants] == ['password', 'refresh_token']
+    assert issuer.grants[1]['refresh_token'] == 'refresh-1'
+    assert [get_token(request) for request in server.requests] == ['token-1', 'token-2']
+
+def test_repeated_401_raises(stub_server):
+    api_client = make_client(stub_server, TokenIssuer())
+    server = stub_server(lambda request: (401, b'', None))
+
+    with pytest.raises(requests.HTTPError):
+        api_client.get(server.url + '/data')
+    api_client.close()
+    assert server.count() == 2
+
+def test_token_is_refreshed_before_it_expires(stub_server):
+    issuer = TokenIssuer(expires_in=client.TOKEN_REFRESH_MARGIN + 1)
+    api_client = make_client(stub_server, issuer)
+    server = stub_server(lambda request: (200, {'data': []}, None))
+
+    api_client.get(server.url + '/data')
+    api_client.expires_at = time.time() + client.TOKEN_REFRESH_MARGIN - 1
+    api_client.get(server.url + '/data')
+    api_client.close()
+
+    assert [grant['grant_type'] for grant in issuer.grants] == ['password', 'refresh_token']
+    assert [get_token(request) for request in server.requests] == ['token-1', 'token-2']
+
+@pytest.mark.parametrize('status', [429, 500, 502, 503, 504])
+def test_throttled_and_failed_requests_wait_for_retry_after(stub_server, status):
+    api_client = make_client(stub_server, TokenIssuer())
+    attempts = []
+
+    def respond(request):
+        attempts.append(time.perf_counter())
+        if len(attempts) < 3:
+            return status, b'', {'Retry-After': '0.2'}
+        return 200, {'data': [1]}, None
+
+    server = stub_server(respond)
+    response = api_client.get(server.url + '/data')
+    stats = api_client.get_latency_stats()
+    api_client.close()
+
+    assert response.json() == {'data': [1]}
+    assert server.count() == 3
+    assert all(later - earlier >= 0.2 for earlier, later in zip(attempts, attempts[1:]))
+    assert stats['requests'] == 3
+
+def test_retries_run_out(stub_server):
+    api_client = make_client(stub_server, TokenIssuer(), max_retries=2, backoff=0.01)
+    server = stub_server(lambda request: (503, b'', None))
+
+    with pytest.raises(requests.HTTPError):
+        api_client.get(server.url + '/data')
+    api_client.close()
+    assert server.count() == 3
+
+def test_retry_delay():
+    response = requests.Response()
+    response.headers['Retry-After'] = '7'
+    assert client.get_retry_delay(0, response) == 7.0
+
+    response.headers['Retry-After'] = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert client.get_retry_delay(0, response) == 0.0
+
+    # Without Retry-After: full jitter up to the capped exponential backoff
+    assert all(0 <= client.get_retry_delay(attempt, backoff=1.0, max_backoff=4.0) <= min(4.0, 2 ** attempt)
+               for attempt in range(6))
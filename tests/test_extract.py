@@ -0,0 +1,252 @@
+# Import Libraries
+import contextlib
+import io
+import threading
+import time
+from datetime import date, datetime, timedelta
+import pytest
+import requests
+import extract_transform_load.cache as cache
+import extract_transform_load.client as client
+import extract_transform_load.extract as extract
+
+# A DAM price page with one row for the date (yyyymmdd)
+def make_price_page(date):
+    return (f"<html><table><tr><th>Oper Day</th><th>Hour Ending</th><th>HB_BUSAVG</th></tr>"
+            f"<tr><td>{date[4:6]}/{date[6:]}/{date[:4]}</td><td>01</td><td>25.50</td></tr></table></html>").encode()
+
+def get_page_date(request):
+    return request['path'].strip('/').split('_')[0]
+
+DATES = [f'202412{day:02d}' for day in range(1, 9)]
+
+def test_price_pages_are_scraped_concurrently(stub_server):
+    active = {'now': 0, 'most': 0}
+    lock = threading.Lock()
+
+    # Every page takes 0.2 seconds to serve
+    def respond(request):
+        with lock:
+            active['now'] += 1
+            active['most'] = max(active['most'], active['now'])
+        time.sleep(0.2)
+        with lock:
+            active['now'] -= 1
+        return 200, make_price_page(get_page_date(request)), {'Content-Type': 'text/html'}
+
+    server = stub_server(respond)
+    start = time.perf_counter()
+    raw_price_data = extract.get_price_data(DATES, max_workers=8, api_endpoint=server.url + extract.PRICE_PAGE)
+    seconds = time.perf_counter() - start
+
+    # Results stay in date order, and the pages were downloaded at the same time
+    assert [day[0][0] for day in raw_price_data] == [f'12/{date[6:]}/2024' for date in DATES]
+    assert active['most'] > 1
+    assert seconds < 0.2 * len(DATES) / 2
+
+def test_price_page_is_retried_when_throttled_or_failed(stub_server):
+    attempts = {}
+    lock = threading.Lock()
+
+    # Each page is throttled, then fails, then succeeds
+    def respond(request):
+        date = get_page_date(request)
+        with lock:
+            attempts[date] = attempts.get(date, 0) + 1
+            attempt = attempts[date]
+        if attempt == 1:
+            return 429, b'Too Many Requests', {'Retry-After': '0'}
+        if attempt == 2:
+            return 503, b'Service Unavailable', {'Retry-After': '0'}
+        return 200, make_price_page(date), {'Content-Type': 'text/html'}
+
+    server = stub_server(respond)
+    raw_price_data = extract.get_price_data(DATES, api_endpoint=server.url + extract.PRICE_PAGE)
+
+    assert all(len(day) == 1 for day in raw_price_data)
+    assert server.count() == 3 * len(DATES)
+
+def test_price_page_raises_when_retries_run_out(stub_server, monkeypatch):
+    monkeypatch.setattr(extract, 'PRICE_MAX_RETRIES', 2)
+    server = stub_server(lambda request: (503, b'Service Unavailable', {'Retry-After': '0'}))
+
+    with pytest.raises(requests.HTTPError):
+        extract.scrape_price_data(DATES[0], server.url + extract.PRICE_PAGE)
+    assert server.count() == 3
+
+def test_missing_price_page_is_an_empty_day(stub_server):
+    server = stub_server(lambda request: (404, b'Not Found', {'Content-Type': 'text/plain'}))
+
+    assert extract.scrape_price_data(DATES[0], server.url + extract.PRICE_PAGE) == []
+    assert server.count() == 1
+
+# An API response page of rows like ERCOT's, with its _meta for that page
+def make_api_page(rows, page, size):
+    total_pages = max(1, -(-len(rows) // size))
+    return {'_meta': {'totalRecords': len(rows), 'pageSize': size, 'totalPages': total_pages, 'currentPage': page},
+            'fields': [{'name': 'operatingDay'}, {'name': 'hourEnding'}, {'name': 'total'}],
+            'data': rows[(page - 1) * size:page * size]}
+
+# An API client that signs in to a stub token endpoint
+def make_api_client(stub_server):
+    auth_server = stub_server(lambda request: (200, {'access_token': 'token', 'expires_in': 3600}, None))
+    return client.ErcotClient('user', 'password', 'key', auth_url=auth_server.url + '/token')
+
+def test_every_page_is_fetched_from_meta(stub_server):
+    rows = [['2024-12-01', f'{hour:02d}:00', 40000.0 + hour] for hour in range(1, 25)]
+    api_client = make_api_client(stub_server)
+
+    def respond(request):
+        return 200, make_api_page(rows, int(request['params']['page']), int(request['params']['size'])), None
+
+    server = stub_server(respond)
+    day = datetime(2024, 12, 1).date()
+    pages = extract.get_load_data(api_client, page_size=10, start_date=day, end_date=day, quiet=True,
+                                  api_endpoint=server.url + extract.LOAD_API_PATH)
+    api_client.close()
+
+    # Pages after the first arrive in completion order
+    assert sorted(page['_meta']['currentPage'] for page in pages) == [1, 2, 3]
+    assert sorted(row for page in pages for row in page['data']) == sorted(rows)
+    assert sorted(int(request['params']['page']) for request in server.requests) == [1, 2, 3]
+    assert all(request['params']['size'] == '10' for request in server.requests)
+
+def test_single_page_response_is_fetched_once(stub_server):
+    rows = [['2024-12-01', '01:00', 40000.0]]
+    api_client = make_api_client(stub_server)
+    server = stub_server(lambda request: (200, make_api_page(rows, 1, 10), None))
+
+    pages = list(extract.query_api_pages(server.url + extract.LOAD_API_PATH, {}, api_client, page_size=10))
+    api_client.close()
+
+    assert len(pages) == 1 and server.count() == 1
+
+# Serves generation postings like ERCOT: a posting holds the actuals of the `hours` hours before it (and a
+# forecast of the next hours) for the requested delivery dates
+def make_posting_responder(hours=48):
+
+    def respond(request):
+        params = request['params']
+        posting = datetime.fromisoformat(params['postedDatetimeFrom']).replace(minute=55)
+        first, last = (datetime.fromisoformat(params[name]) for name in ('deliveryDateFrom', 'deliveryDateTo'))
+
+        rows = []
+        for day in range((last - first).days + 1):
+            date = first + timedelta(days=day)
+            for hour in range(1, 25):
+                if date + timedelta(hours=hour) > posting - timedelta(hours=hours):
+                    rows.append([posting.isoformat(), date.strftime('%Y-%m-%d'), hour, float(hour), False])
+        return 200, {'_meta': {'totalPages': 1}, 'data': rows}, None
+
+    return respond
+
+# Extracts a 31-day window of generation data ending on end_date and returns the parameters of every request
+def extract_generation_window(stub_server, monkeypatch, end_date, hours=48):
+    api_client = make_api_client(stub_server)
+    server = stub_server(make_posting_responder(hours))
+    monkeypatch.setattr(extract, 'get_dates', lambda: (end_date - timedelta(days=30), end_date))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        days = extract.query_generation_data(server.url + extract.WIND_API_PATH, api_client)
+    api_client.close()
+
+    assert all(len(day['data']) == 24 for day in days)
+    return [request['params'] for request in server.requests]
+
+@pytest.mark.parametrize('end_date', [date(2024, 12, 10), date(2024, 12, 11)])
+def test_consecutive_daily_runs_reuse_their_postings(stub_server, monkeypatch, end_date):
+    first_run = extract_generation_window(stub_server, monkeypatch, end_date)
+    next_run = extract_generation_window(stub_server, monkeypatch, end_date + timedelta(days=1))
+
+    # The 00:55 posting covers HE1 of its first day, so no day is queried on its own
+    assert all(params['postedDatetimeFrom'].endswith(extract.POSTING_TIME_FROM) for params in first_run + next_run)
+    assert len(first_run) == len(next_run) == 16
+
+    # Days keep their posting, so at most the newest posting is new the next day
+    first_keys = {cache.make_key(extract.WIND_API_PATH, params) for params in first_run}
+    next_keys = {cache.make_key(extract.WIND_API_PATH, params) for params in next_run}
+    assert len(next_keys - first_keys) <= 1
+
+# A generation row: posted datetime, delivery date, hour ending, value, DST flag
+def make_generation_row(posted, date, hour, value, dst=False):
+    return [posted, date, hour, value, dst]
+
+def test_postings_keep_the_latest_actual_of_each_hour():
+    first, second = '2024-11-04T00:55:00', '2024-11-04T01:55:00'
+    postings = [
+        {'data': [make_generation_row(second, '2024-11-03', 3, 30.5),
+                  make_generation_row(second, '2024-11-04', 1, 11.0),
+                  make_generation_row(second, '2024-11-04', 2, 99.0)]},
+        {'data': [make_generation_row(first, '2024-11-03', 2, 20.0),
+                  make_generation_row(first, '2024-11-03', 2, 21.0, dst=True),
+                  make_generation_row(first, '2024-11-03', 3, 30.0),
+                  make_generation_row(first, '2024-11-04', 1, 10.0)]},
+        ]
+
+    days = extract.split_generation_postings(postings, [date(2024, 11, 3), date(2024, 11, 4)])
+
+    # The repeated fall-back hour is kept, a later posting of an hour wins whatever the posting order, and
+    # hours that had not ended when they were posted (forecasts) are dropped
+    assert sorted((row[2], row[4], row[3]) for row in days[0]['data']) == [(2, False, 20.0), (2, True, 21.0), (3, False, 30.5)]
+    assert days[1]['data'] == [make_generation_row(second, '2024-11-04', 1, 11.0)]
+
+def test_postings_split_into_the_single_day_rows(stub_server):
+    api_client = make_api_client(stub_server)
+    server = stub_server(make_posting_responder())
+    endpoint = server.url + extract.WIND_API_PATH
+    delivery_dates = [date(2024, 12, 10), date(2024, 12, 9)]
+
+    postings = [extract.query_generation_posting(endpoint, date(2024, 12, 10), api_client)]
+    days = [extract.query_generation_day(endpoint, day, api_client) for day in delivery_dates]
+    api_client.close()
+
+    # Same rows as querying each day on its own, apart from the posting time
+    for split_day, single_day in zip(extract.split_generation_postings(postings, delivery_dates), days):
+        assert sorted(row[1:] for row in split_day['data']) == sorted(row[1:] for row in single_day['data'])
+
+def test_incomplete_days_are_queried_on_their_own(stub_server, monkeypatch):
+
+    # Postings that miss the first hour of their first day
+    requests = extract_generation_window(stub_server, monkeypatch, date(2024, 12, 11), hours=47)
+
+    # Every posting is followed up by a query of its first day (if that day is in the window)
+    postings = [params for params in requests if params['postedDatetimeFrom'].endswith(extract.POSTING_TIME_FROM)]
+    single_days = [params['deliveryDateFrom'] for params in requests if params['deliveryDateFrom'] == params['deliveryDateTo']]
+    assert len(postings) == 16
+    assert sorted(single_days) == sorted(params['deliveryDateFrom'] for params in postings
+                                         if params['deliveryDateFrom'] >= '2024-11-11')
+
+# A clock that only moves when the test (or a sleep) moves it
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_token_bucket_refills_at_its_rate():
+    clock = FakeClock()
+    bucket = extract.TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+
+    # The burst is available at once, then every request waits for the next token
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == 0.5 and clock.now == 0.5
+    assert bucket.acquire() == 0.5 and clock.now == 1.0
+
+    # Idle time refills the bucket, but never past the burst
+    clock.now += 10
+    assert [bucket.acquire() for _ in range(4)] == [0.0, 0.0, 0.0, 0.5]
+    assert bucket.wait_time == 1.5
+
+def test_token_bucket_queues_callers_that_reserve_together():
+    clock = FakeClock()
+    bucket = extract.TokenBucket(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+
+    # Callers that reserve at the same moment get the next tokens in turn
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 1.0, 2.0]
+    clock.now = 2.0
+    assert bucket.reserve() == 1.0
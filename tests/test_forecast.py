@@ -0,0 +1,67 @@
+# Import Libraries
+import numpy as np
+import pandas as pd
+import pytest
+import extract_transform_load.forecast as forecast
+import extract_transform_load.load as load
+
+pytest.importorskip('xgboost')
+
+# A small model keeps the backtests fast
+PARAMS = {**forecast.MODEL_PARAMS, 'n_estimators': 20}
+
+# Hourly merged rows (indexed by UTC hour-ending timestamps) with the model's columns
+def make_merged_df(days, start='2024-01-01 07:00', seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start, periods=days * 24, freq='h', tz='UTC', name='Timestamp')
+    dates, hours = load.local_dates_and_hours(timestamps)
+    df = pd.DataFrame({'Date': dates, 'Hour': hours}, index=timestamps)
+    for column in [forecast.TARGET] + forecast.EXOGENOUS_COLUMNS:
+        df[column] = rng.uniform(10, 100, len(df))
+    return df
+
+def test_folds_walk_forward_by_the_step():
+    assert forecast.get_folds(24 * 5, 'expanding', train_days=2, test_days=1, step_days=1) == [
+        (0, 48, 72), (0, 72, 96), (0, 96, 120)]
+    assert forecast.get_folds(24 * 5, 'sliding', train_days=2, test_days=1, step_days=1) == [
+        (0, 48, 72), (24, 72, 96), (48, 96, 120)]
+
+    # A test window that doesn't fit in the data is left out
+    assert forecast.get_folds(24 * 5 - 1, 'sliding', train_days=2, test_days=2, step_days=1) == [(0, 48, 96)]
+    with pytest.raises(ValueError):
+        forecast.get_folds(24 * 5, 'rolling')
+
+def test_parallel_backtest_matches_a_serial_run(tmp_path):
+    df = make_merged_df(10)
+    table = forecast.backtest(df, 'sliding', train_days=3, params=PARAMS, max_workers=3,
+                              cache_directory=tmp_path / 'parallel')
+
+    # The table shows the windows of every fold
+    hours, matrix, names = forecast.build_model_matrix(df)
+    folds = forecast.get_folds(len(hours), 'sliding', train_days=3)
+    assert len(table) == len(folds) == 7 and not table['Cached'].any()
+    assert (table['Test_Start'] - table['Train_Start'] == pd.Timedelta(days=3)).all()
+    assert (table['Test_End'] - table['Test_Start'] == pd.Timedelta(hours=23)).all()
+    assert table['Test_Start'].iloc[0] == df.index[72]
+
+    # Each fold run one after the other in this process
+    matrix_path = tmp_path / 'matrix.npy'
+    np.save(matrix_path, matrix)
+    forecast.init_worker(matrix_path)
+    serial_directory = tmp_path / 'serial'
+    serial_directory.mkdir()
+    serial = [forecast.run_fold(fold, PARAMS, 1, serial_directory / f'{i}.json') for i, fold in enumerate(folds)]
+
+    np.testing.assert_allclose(table['MAE'].to_numpy(), [result['mae'] for result in serial], rtol=1e-6)
+    assert table['Train_Rows'].tolist() == [result['train_rows'] for result in serial]
+    assert table['Test_Rows'].tolist() == [result['test_rows'] for result in serial]
+
+def test_only_new_folds_are_trained_again(tmp_path):
+    df = make_merged_df(8)
+    first = forecast.backtest(df.iloc[:-24], 'sliding', train_days=3, params=PARAMS, max_workers=2,
+                              cache_directory=tmp_path)
+    second = forecast.backtest(df, 'sliding', train_days=3, params=PARAMS, max_workers=2, cache_directory=tmp_path)
+
+    # Adding a day only adds its fold; the others keep their cache keys
+    assert second['Cached'].tolist() == [True] * len(first) + [False]
+    np.testing.assert_allclose(second['MAE'].iloc[:-1].to_numpy(), first['MAE'].to_numpy())
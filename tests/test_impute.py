@@ -0,0 +1,67 @@
+# Import Libraries
+import numpy as np
+import pandas as pd
+import extract_transform_load.impute as impute
+
+nan = np.nan
+
+# One row per day and hour ending, in the order given
+def make_df(dates, hours, **values):
+    return pd.DataFrame({'Date': pd.to_datetime(dates), 'Hour': hours, **values})
+
+def test_hourly_mean_uses_the_same_hour_of_every_day():
+    df = make_df(['2024-01-01'] * 2 + ['2024-01-02'] * 2 + ['2024-01-03'] * 2, [1, 2] * 3,
+                 Load_Total=[1.0, 10.0, nan, 20.0, 3.0, nan])
+
+    filled, mask = impute.impute(df, 'hourly_mean')
+
+    assert filled['Load_Total'].tolist() == [1.0, 10.0, 2.0, 20.0, 3.0, 15.0]
+    assert mask.index.tolist() == [2, 5] and mask['Load_Total'].all()
+
+def test_hour_dow_mean_falls_back_to_the_hourly_mean():
+    # Mondays 01-01 and 01-08, Tuesdays 01-02 and 01-09, and a Wednesday with no other Wednesday
+    df = make_df(['2024-01-01', '2024-01-02', '2024-01-08', '2024-01-09', '2024-01-10'], [1] * 5,
+                 Load_Total=[10.0, 20.0, nan, 40.0, nan])
+
+    filled, _ = impute.impute(df, 'hour_dow_mean')
+
+    assert filled['Load_Total'].tolist() == [10.0, 20.0, 10.0, 40.0, round(70 / 3, 2)]
+
+def test_interpolation_follows_time_not_row_order():
+    df = make_df(['2024-01-01'] * 5, [1, 2, 3, 4, 5], Load_Total=[1.0, nan, nan, 4.0, nan])
+    df = df.iloc[[3, 0, 4, 2, 1]]
+
+    filled, mask = impute.impute(df, 'interpolate')
+
+    # The last hour takes the nearest known value
+    assert filled.index.tolist() == [3, 0, 4, 2, 1]
+    assert filled.sort_index()['Load_Total'].tolist() == [1.0, 2.0, 3.0, 4.0, 4.0]
+    assert sorted(mask.index) == [1, 2, 4]
+
+def test_seasonal_profile_averages_the_surrounding_days():
+    dates = pd.date_range('2024-01-01', periods=5).repeat(2)
+    df = make_df(dates, [1, 2] * 5, Load_Total=[1.0, 10.0, 2.0, 20.0, nan, 30.0, 4.0, nan, 5.0, 50.0])
+
+    filled, _ = impute.impute(df, 'seasonal_profile', window=3)
+    assert filled['Load_Total'].tolist() == [1.0, 10.0, 2.0, 20.0, 3.0, 30.0, 4.0, 40.0, 5.0, 50.0]
+
+    # With a one-day window the missing hours fall back to the hourly mean
+    filled, _ = impute.impute(df, 'seasonal_profile', window=1)
+    assert filled['Load_Total'].tolist()[4] == 3.0 and filled['Load_Total'].tolist()[7] == 27.5
+
+def test_mask_only_reports_filled_cells():
+    # Wind has no value at hour ending 2, so it can't be filled there
+    df = make_df(['2024-01-01'] * 2 + ['2024-01-02'] * 2, [1, 2] * 2,
+                 Load_Total=[1.0, nan, 3.0, 4.0], Wind_SystemWide=[nan, nan, 5.0, nan], DST=[False] * 4)
+
+    filled, mask = impute.impute(df, 'hourly_mean')
+
+    assert list(mask.columns) == ['Load_Total', 'Wind_SystemWide']
+    assert mask.index.tolist() == [0, 1, 3]
+    assert mask.to_numpy().tolist() == [[False, True], [True, False], [False, False]]
+    assert filled['Wind_SystemWide'].isna().tolist() == [False, True, False, True]
+
+    # Nothing missing: df is returned as it is
+    complete = df.dropna()
+    filled, mask = impute.impute(complete, 'hourly_mean')
+    assert filled is complete and mask.empty
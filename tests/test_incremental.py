@@ -0,0 +1,132 @@
+# Import Libraries
+import contextlib
+import io
+from datetime import date, timedelta
+import pandas as pd
+import pytest
+import extract_transform_load.array_store as array_store
+import extract_transform_load.client as client
+import extract_transform_load.extract as extract
+import extract_transform_load.incremental as incremental
+import extract_transform_load.load as load
+import extract_transform_load.metrics as metrics
+import extract_transform_load.pipeline as pipeline
+import extract_transform_load.prices as prices
+import extract_transform_load.replay as replay
+import extract_transform_load.warehouse as warehouse
+from synthetic import SyntheticERCOT, make_all_payloads
+
+START = '2024-10-10'
+WINDOW_DAYS = 31
+
+class StubClient:
+
+    def get_token(self):
+        return None
+
+    def get_latency_stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+# The raw payloads of a 31-day extract starting `first` days after START
+def get_window(payloads, first):
+    days = set(pd.date_range(START, periods=len(payloads['price'])).strftime('%Y-%m-%d')[first:first + WINDOW_DAYS])
+    return {'price': payloads['price'][first:first + WINDOW_DAYS],
+            'load': [{**page, 'data': [row for row in page['data'] if row[0] in days]} for page in payloads['load']],
+            'wind': [page for page in payloads['wind'] if page['data'] and page['data'][0][1] in days],
+            'solar': [page for page in payloads['solar'] if page['data'] and page['data'][0][1] in days]}
+
+# Runs the pipeline on a window, saving into directory
+def run_pipeline(monkeypatch, directory, window, full_refresh):
+    branches = {name: ((lambda name=name: window[name]) if name == 'price' else (lambda api_client, name=name: window[name]),
+                       transform_function, needs_token)
+                for name, (_, transform_function, needs_token) in pipeline.BRANCHES.items()}
+    with monkeypatch.context() as patch:
+        patch.setattr(load, 'get_clean_data_directory', lambda: directory)
+        patch.setattr(pipeline, 'BRANCHES', branches)
+        patch.setattr(extract, 'get_api_client', StubClient)
+        run = pipeline.Pipeline(metrics.RunMetrics(directory=directory / 'metrics'), transform_workers=0,
+                                staging_directory=directory / 'staging', full_refresh=full_refresh,
+                                fingerprint_path=directory / 'fingerprints.json')
+        with contextlib.redirect_stdout(io.StringIO()):
+            run.run(export_csv=False, export_warehouse=True)
+
+def test_sliding_window_matches_a_full_refresh(monkeypatch, tmp_path):
+    payloads = make_all_payloads(WINDOW_DAYS + 8, start=START, missing_day_rate=0.1, missing_hour_rate=0.03, seed=1)
+    full_directory, incremental_directory = tmp_path / 'full', tmp_path / 'incremental'
+
+    # Days leave the window at the front (some of them missing, or imputation context of other days)
+    for first in range(9):
+        run_pipeline(monkeypatch, full_directory, get_window(payloads, first), full_refresh=True)
+        run_pipeline(monkeypatch, incremental_directory, get_window(payloads, first), full_refresh=False)
+
+        full_df = load.read_parquet(directory=full_directory / 'ERCOT_Electricity_Data')
+        incremental_df = load.read_parquet(directory=incremental_directory / 'ERCOT_Electricity_Data')
+        pd.testing.assert_frame_equal(incremental_df, full_df, obj=f'window starting on day {first}')
+
+    pd.testing.assert_frame_equal(array_store.ArrayStore(incremental_directory / 'ERCOT_Electricity_Arrays').to_df(),
+                                  array_store.ArrayStore(full_directory / 'ERCOT_Electricity_Arrays').to_df())
+
+    # The warehouse holds the same values (days cleared for a source are NULL there too)
+    stored = warehouse.query('SELECT * FROM merged ORDER BY Timestamp', path=incremental_directory / 'ERCOT_Warehouse.sqlite')
+    value_cols = [col for col in full_df.columns if col not in ('Timestamp', 'Date', 'Hour')]
+    pd.testing.assert_frame_equal(stored[value_cols], full_df[value_cols].reset_index(drop=True), check_dtype=False)
+
+    # The long price store keeps the load zones the transform drops
+    full_prices = prices.read_long_prices('DAM', directory=full_directory / 'ERCOT_Settlement_Prices')
+    pd.testing.assert_frame_equal(prices.read_long_prices('DAM', directory=incremental_directory / 'ERCOT_Settlement_Prices'),
+                                  full_prices)
+    assert set(full_prices['SettlementPoint']) == set(prices.PAGE_SETTLEMENT_POINTS)
+
+def test_day_leaving_the_window_triggers_imputed_days():
+    previous = {'2024-10-01': {'fingerprint': 'a', 'imputed': False},
+                '2024-10-02': {'fingerprint': 'b', 'imputed': True},
+                '2024-10-03': {'fingerprint': 'c', 'imputed': False}}
+    fingerprints = {'2024-10-02': 'b', '2024-10-03': 'c'}
+
+    assert incremental.get_changed_days(fingerprints, previous) == ['2024-10-02']
+    assert incremental.get_changed_days(fingerprints, {day: previous[day] for day in fingerprints}) == []
+
+@pytest.mark.parametrize('window_days, expected', [(['2024-10-01', '2024-10-02'], ['2024-10-01']), (['2024-10-02'], [])])
+def test_cleared_days_are_only_days_still_in_the_window(window_days, expected):
+    previous = {'2024-10-01': {'fingerprint': 'a', 'imputed': False}, '2024-10-02': {'fingerprint': 'b', 'imputed': False}}
+    assert incremental.get_cleared_days({'2024-10-02': 'b'}, previous, window_days) == expected
+
+# Extracts a 31-day window of wind data ending on end_date from the server and fingerprints its days
+def fingerprint_wind_window(server, monkeypatch, end_date):
+    monkeypatch.setattr(extract, 'get_dates', lambda: (end_date - timedelta(days=30), end_date))
+    api_client = client.ErcotClient('replay', 'replay', 'replay', auth_url=server.auth_url)
+    with contextlib.redirect_stdout(io.StringIO()):
+        raw_data = extract.get_wind_data(api_client, server.api_base_url + extract.WIND_API_PATH)
+    api_client.close()
+    return incremental.fingerprint_days('wind', incremental.group_rows_by_day('wind', raw_data))
+
+def test_unchanged_days_keep_their_fingerprint_across_daily_runs(monkeypatch):
+    with replay.ReplayServer(SyntheticERCOT()) as server:
+        first_run = fingerprint_wind_window(server, monkeypatch, date(2024, 12, 10))
+        next_run = fingerprint_wind_window(server, monkeypatch, date(2024, 12, 11))
+
+        # The same day read from a later posting (its rows carry another posting time)
+        api_client = client.ErcotClient('replay', 'replay', 'replay', auth_url=server.auth_url)
+        single_day = extract.query_generation_day(server.api_base_url + extract.WIND_API_PATH, date(2024, 12, 1), api_client)
+        api_client.close()
+
+    common_days = set(first_run) & set(next_run)
+    assert len(common_days) == 30
+    assert all(first_run[day] == next_run[day] for day in common_days)
+    assert incremental.fingerprint_days('wind', incremental.group_rows_by_day('wind', [single_day]))['2024-12-01'] == first_run['2024-12-01']
+
+# A layout change fails the incremental run like a full one, instead of dropping every row
+def test_rows_of_the_wrong_width_raise(monkeypatch, tmp_path):
+    payloads = make_all_payloads(WINDOW_DAYS, start=START)
+    window = get_window(payloads, 0)
+    window['wind'][3]['data'][5] = window['wind'][3]['data'][5][:-2]
+
+    with pytest.raises(ValueError, match='wind row for .* has'):
+        incremental.group_rows_by_day('wind', window['wind'])
+
+    for full_refresh in (False, True):
+        run_pipeline(monkeypatch, tmp_path, window, full_refresh)
+        assert not (tmp_path / 'ERCOT_Electricity_Data').exists()
@@ -0,0 +1,109 @@
+# Import Libraries
+import json
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import extract_transform_load.array_store as array_store
+import extract_transform_load.client as client
+import extract_transform_load.extract as extract
+import extract_transform_load.live as live
+import extract_transform_load.transform as transform
+
+# A clock that only moves when slept on, so a poll loop runs without waiting
+class FakeClock:
+
+    def __init__(self, start):
+        self.time = start
+        self.sleeps = []
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.time += timedelta(seconds=seconds)
+
+# Postings become visible this many seconds after their :55 posting time
+POSTING_DELAY = 30
+
+def get_value(source, date, hour_ending, col):
+    return float(sum(map(ord, f'{source}{date}{hour_ending}')) % 500 + col)
+
+# Serves the hourly wind and solar postings that are visible at the clock's time. Each posting holds
+# the actuals of the 48 hours before it and a forecast of the next hour.
+def make_posting_server(stub_server, clock):
+    widths = {'wind': len(transform.get_wind_cols()[0]), 'solar': len(transform.get_solar_cols()[0])}
+
+    def respond(request):
+        source = 'wind' if 'wind' in request['path'] or 'wpp' in request['path'] else 'solar'
+        params = request['params']
+        posted_from = datetime.fromisoformat(params['postedDatetimeFrom'])
+        posted_to = min(datetime.fromisoformat(params['postedDatetimeTo']), clock.now() - timedelta(seconds=POSTING_DELAY))
+
+        rows = []
+        posting = posted_from.replace(minute=live.POSTING_MINUTE, second=0)
+        posting += timedelta(hours=posting < posted_from)
+        while posting <= posted_to:
+            last_hour = posting.replace(minute=0)
+            for hours_back in range(-1, 48):
+                hour_end = last_hour - timedelta(hours=hours_back)
+                date = (hour_end - timedelta(hours=1)).strftime('%Y-%m-%d')
+                hour_ending = hour_end.hour or 24
+                values = [get_value(source, date, hour_ending, col) for col in range(widths[source] - 4)]
+                rows.append([posting.strftime('%Y-%m-%dT%H:%M:%S'), date, hour_ending] + values + [False])
+            posting += timedelta(hours=1)
+
+        return 200, {'_meta': {'totalPages': 1}, 'data': rows}, None
+
+    return stub_server(respond)
+
+def test_live_updates_poll_for_late_postings(stub_server, tmp_path):
+    clock = FakeClock(datetime(2025, 3, 23, 0, 30))
+    auth_server = stub_server(lambda request: (200, {'access_token': 'token', 'expires_in': 3600}, None))
+    api_client = client.ErcotClient('user', 'password', 'key', auth_url=auth_server.url + '/token')
+    server = make_posting_server(stub_server, clock)
+
+    updater = live.LiveUpdater(api_client, endpoints={'wind': server.url + '/wind', 'solar': server.url + '/solar'},
+                               clock=clock.now, sleep=clock.sleep, state_path=tmp_path / 'state.json',
+                               parquet_directory=tmp_path / 'parquet', array_directory=tmp_path / 'arrays',
+                               cube_directory=tmp_path / 'cubes', warehouse_path=tmp_path / 'warehouse.sqlite')
+    results = updater.run(max_cycles=3)
+    api_client.close()
+
+    # Each cycle sleeps until :55, then polls every POLL_INTERVAL seconds until the posting shows up
+    polls = POSTING_DELAY // live.POLL_INTERVAL
+    assert clock.sleeps == [25 * 60] + [live.POLL_INTERVAL] * polls + ([3600 - POSTING_DELAY] + [live.POLL_INTERVAL] * polls) * 2
+    assert [result['time'] for result in results] == ['2025-03-23T00:55:30', '2025-03-23T01:55:30', '2025-03-23T02:55:30']
+    assert all(result['latency_s'] == POSTING_DELAY for result in results)
+    assert [result['rows']['wind'] for result in results] == [48, 48, 48]
+
+    # The high-water marks are the last postings, and the stored hours are the stub's actuals
+    assert json.loads((tmp_path / 'state.json').read_text()) == {'wind': '2025-03-23T02:55:00', 'solar': '2025-03-23T02:55:00'}
+    store = array_store.ArrayStore(tmp_path / 'arrays')
+    df = store.to_df(['Wind_SystemWide', 'Solar_SystemWide'])
+    # The 48 hours of the posting before the first cycle, then one new hour per posting
+    assert df.index.is_unique and len(df) == 48 + 3
+    last = df.iloc[-1]
+    assert (pd.Timestamp(last['Date']).strftime('%Y-%m-%d'), last['Hour']) == ('2025-03-23', 2)
+    np.testing.assert_allclose(last['Wind_SystemWide'], get_value('wind', '2025-03-23', 2, 0), atol=0.01)
+
+def test_live_endpoints_follow_set_base_urls(stub_server, tmp_path, monkeypatch):
+    clock = FakeClock(datetime(2025, 3, 23, 0, 56))
+    auth_server = stub_server(lambda request: (200, {'access_token': 'token', 'expires_in': 3600}, None))
+    api_client = client.ErcotClient('user', 'password', 'key', auth_url=auth_server.url + '/token')
+    server = make_posting_server(stub_server, clock)
+
+    # Restore the extract module's URLs after the test
+    for name in ['API_BASE_URL', 'PRICE_BASE_URL', 'AUTH_URL', 'LOAD_API_ENDPOINT', 'WIND_API_ENDPOINT',
+                 'SOLAR_API_ENDPOINT', 'NODE_PRICE_API_ENDPOINT', 'PRICE_URL', 'RT_PRICE_URL']:
+        monkeypatch.setattr(extract, name, getattr(extract, name))
+
+    updater = live.LiveUpdater(api_client, clock=clock.now, sleep=clock.sleep, state_path=tmp_path / 'state.json',
+                               parquet_directory=tmp_path / 'parquet', array_directory=tmp_path / 'arrays',
+                               cube_directory=tmp_path / 'cubes', warehouse_path=tmp_path / 'warehouse.sqlite')
+    extract.set_base_urls(api_base_url=server.url + '/api')
+    result = updater.run_cycle()
+    api_client.close()
+
+    assert result['rows']['wind'] and result['rows']['solar']
+    assert {request['path'] for request in server.requests} == {'/api' + extract.WIND_API_PATH, '/api' + extract.SOLAR_API_PATH}
@@ -0,0 +1,53 @@
+# Import Libraries
+import numpy as np
+import pandas as pd
+import extract_transform_load.load as load
+
+# The hours ending of an ERCOT day: the fall-back day repeats hour ending 2 (the second one has the DST flag)
+FALL_BACK_HOURS = [1, 2, 2] + list(range(3, 25))
+FALL_BACK_DST = [False, False, True] + [False] * 22
+
+def make_source_df(day, hours, column, dst=None):
+    df = pd.DataFrame({'Date': pd.to_datetime([day] * len(hours)), 'Hour': hours,
+                       column: np.arange(len(hours), dtype=np.float64)})
+    if dst is not None:
+        df['DST'] = dst
+    return df
+
+def test_the_repeated_fall_back_hour_follows_the_first():
+    timestamps = load.hour_ending_timestamps(['2024-11-03'] * 25, FALL_BACK_HOURS, FALL_BACK_DST)
+
+    # Hour ending 2 CDT, then hour ending 2 CST
+    assert list(timestamps[:4]) == list(pd.date_range('2024-11-03 06:00', periods=4, freq='h', tz='UTC'))
+    assert timestamps.is_unique and (np.diff(timestamps) == pd.Timedelta(hours=1)).all()
+
+def test_hours_skipped_by_spring_forward_are_nat():
+    timestamps = load.hour_ending_timestamps(['2024-03-10'] * 24, range(1, 25))
+
+    # Hour ending 3 (2:00-3:00) doesn't exist
+    assert timestamps[2] is pd.NaT and timestamps.isna().sum() == 1
+    assert timestamps[1] == pd.Timestamp('2024-03-10 08:00', tz='UTC')
+    assert timestamps[3] == pd.Timestamp('2024-03-10 09:00', tz='UTC')
+
+def test_merge_keeps_both_fall_back_hours():
+    load_df = make_source_df('2024-11-03', FALL_BACK_HOURS, 'Load_Total', FALL_BACK_DST)
+    wind_df = make_source_df('2024-11-03', list(range(1, 25)), 'Wind_SystemWide')
+
+    merged = load.merge_df(load_df, wind_df)
+
+    assert len(merged) == 25 and merged.index.is_unique
+    assert merged['Hour'].tolist() == FALL_BACK_HOURS[:-1] + [0]
+    assert merged['Load_Total'].tolist() == list(range(25))
+
+    # The source without a DST flag only has the first hour ending 2
+    assert merged['Wind_SystemWide'].isna().tolist() == FALL_BACK_DST
+    assert 'DST' not in merged.columns
+
+def test_merge_drops_hours_skipped_by_spring_forward():
+    load_df = make_source_df('2024-03-10', list(range(1, 25)), 'Load_Total')
+    merged = load.merge_df(load_df)
+
+    assert len(merged) == 23 and merged.index.notna().all()
+    assert 3 not in merged['Hour'].tolist()
+    assert (np.diff(merged.index) == pd.Timedelta(hours=1)).all()
+    assert (merged['Date'] == pd.Timestamp('2024-03-10')).all()
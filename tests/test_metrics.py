@@ -0,0 +1,34 @@
+# Import Libraries
+import contextlib
+import io
+import json
+import threading
+import extract_transform_load.extract as extract
+import extract_transform_load.metrics as metrics
+from test_extract import DATES, get_page_date, make_price_page
+
+def test_concurrent_stages_count_only_their_own_requests(stub_server, tmp_path):
+    server = stub_server(lambda request: (200, make_price_page(get_page_date(request)), {'Content-Type': 'text/html'}))
+    run_metrics = metrics.RunMetrics(directory=tmp_path)
+    barrier = threading.Barrier(2)
+
+    # Each branch scrapes its pages on a pool of worker threads while the other branch runs
+    def run_branch(name, dates):
+        with run_metrics.stage(f'extract_{name}'):
+            barrier.wait()
+            extract.get_price_data(dates, max_workers=4, api_endpoint=server.url + extract.PRICE_PAGE)
+
+    branches = [threading.Thread(target=run_branch, args=('first', DATES[:3])),
+                threading.Thread(target=run_branch, args=('second', DATES[3:]))]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for branch in branches:
+            branch.start()
+        for branch in branches:
+            branch.join()
+        totals = run_metrics.finish()
+
+    records = {record['stage']: record for record in map(json.loads, run_metrics.path.read_text().splitlines())}
+    assert records['extract_first']['http_requests'] == 3
+    assert records['extract_second']['http_requests'] == len(DATES) - 3
+    assert totals['http_requests'] == server.count() == len(DATES)
+    assert totals['bytes_downloaded'] == records['extract_first']['bytes_downloaded'] + records['extract_second']['bytes_downloaded']
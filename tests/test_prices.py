@@ -0,0 +1,30 @@
+# Import Libraries
+import random
+from datetime import date
+import numpy as np
+import pandas as pd
+import extract_transform_load.prices as prices
+from synthetic import make_rt_price_rows
+
+def test_empty_frames_stay_empty():
+    assert prices.clean_long_df(prices.empty_long_df()).empty
+    assert prices.concat_long([prices.empty_long_df(), prices.empty_long_df()]).empty
+
+def test_reading_an_empty_range_returns_no_rows(tmp_path):
+    df = prices.pages_to_long([make_rt_price_rows(date(2024, 1, 1), random.Random(0))], prices.PRICE_MARKETS['RT'])
+    prices.save_long_prices(df, 'RT', tmp_path)
+
+    assert len(prices.read_long_prices('RT', directory=tmp_path)) == len(df)
+    assert prices.read_long_prices('RT', '2024-06-01', '2024-06-30', ['HB_NORTH'], tmp_path).empty
+
+# When clocks fall back, the real-time page lists the intervals of the repeated hour twice
+def test_repeated_fall_back_intervals_are_kept():
+    rows = make_rt_price_rows(date(2024, 11, 3), random.Random(0))
+    repeated = [row for row in rows if '0115' <= row[1] <= '0200']
+    page = rows[:8] + repeated + rows[8:]
+
+    df = prices.pages_to_long([page], prices.PRICE_MARKETS['RT'])
+    timestamps = df['Timestamp'].unique()
+
+    assert len(timestamps) == 100
+    assert (np.diff(timestamps) == pd.Timedelta(minutes=15)).all()
@@ -0,0 +1,90 @@
+# Import Libraries
+import json
+import time
+import pytest
+import requests
+import extract_transform_load.replay as replay
+
+# Serves one API response with `rows` rows at /data and a missing price page at /missing
+class Fixtures:
+
+    def __init__(self, rows=250):
+        self.payload = {'_meta': {'totalPages': 1}, 'data': [[i, f'row {i}'] for i in range(rows)]}
+
+    def get(self, path, params):
+        if path == '/data':
+            return 200, 'application/json', json.dumps(self.payload).encode('utf-8')
+        if path == '/missing':
+            return 404, 'text/html', b''
+        return None
+
+def get_url(server, path):
+    return f"http://{server.server_address[0]}:{server.server_address[1]}{path}"
+
+# A named profile without its latency, to keep the tests fast
+def without_latency(profile):
+    return {**replay.REPLAY_PROFILES[profile], 'latency_s': 0.0, 'jitter_s': 0.0}
+
+def test_failures_follow_the_profile_rates():
+    profile = {'throttle_rate': 0.3, 'error_rate': 0.2, 'retry_after_s': 0.25}
+    with replay.ReplayServer(Fixtures(), profile) as server:
+        with requests.Session() as session:
+            responses = [session.get(get_url(server, '/data')) for _ in range(200)]
+        stats = server.get_stats()
+
+    statuses = [response.status_code for response in responses]
+    assert stats['requests'] == 200
+    assert stats['throttled'] == statuses.count(429) and 40 <= stats['throttled'] <= 80
+    assert stats['errors'] == statuses.count(503) and 20 <= stats['errors'] <= 60
+    assert statuses.count(200) == 200 - stats['throttled'] - stats['errors']
+
+    # Throttled requests carry the profile's Retry-After
+    assert {response.headers['Retry-After'] for response in responses if response.status_code == 429} == {'0.25'}
+
+def test_same_seed_replays_the_same_failures():
+    runs = []
+    for _ in range(2):
+        with replay.ReplayServer(Fixtures(), without_latency('flaky'), seed=3) as server:
+            runs.append([requests.get(get_url(server, '/data')).status_code for _ in range(50)])
+    assert runs[0] == runs[1] and 503 in runs[0]
+
+def test_latency_delays_every_response():
+    with replay.ReplayServer(Fixtures(), {'latency_s': 0.2, 'jitter_s': 0.05}) as server:
+        start = time.perf_counter()
+        for _ in range(3):
+            requests.get(get_url(server, '/data'))
+        assert time.perf_counter() - start >= 3 * 0.15
+
+    with pytest.raises(ValueError):
+        replay.ReplayServer(Fixtures(), 'unknown')
+
+@pytest.mark.parametrize('profile, pages', [('ideal', [250]), ('paginated', [100, 100, 50])])
+def test_pages_are_capped_by_the_profile(profile, pages):
+    with replay.ReplayServer(Fixtures(), without_latency(profile)) as server:
+        first = requests.get(get_url(server, '/data'), params={'page': 1, 'size': 1000}).json()
+        rows = [first['data']] + [requests.get(get_url(server, '/data'), params={'page': page, 'size': 1000}).json()['data']
+                                  for page in range(2, first['_meta']['totalPages'] + 1)]
+
+    assert [len(page) for page in rows] == pages
+    assert first['_meta']['totalRecords'] == 250 and first['_meta']['currentPage'] == 1
+    assert [row for page in rows for row in page] == Fixtures().payload['data']
+
+def test_recorded_pages_replay_as_one_response(tmp_path):
+    with replay.ReplayServer(Fixtures(), without_latency('paginated')) as source:
+        with replay.Recorder(tmp_path) as recorder:
+            for page in (1, 2, 3):
+                recorder(requests.get(get_url(source, '/data'), params={'page': page, 'size': 100, 'day': '2024-12-01'}))
+            recorder(requests.get(get_url(source, '/missing')))
+            recorder(requests.post(source.auth_url))
+
+    # The sign-in request isn't saved
+    assert recorder.recorded == 4
+    fixtures = replay.FixtureStore(tmp_path)
+    assert len(fixtures) == 2
+
+    with replay.ReplayServer(fixtures) as server:
+        response = requests.get(get_url(server, '/data'), params={'page': 1, 'size': 1000, 'day': '2024-12-01'})
+        assert response.json()['data'] == Fixtures().payload['data']
+        assert requests.get(get_url(server, '/missing')).status_code == 404
+        assert requests.get(get_url(server, '/data'), params={'day': '2024-12-02'}).status_code == 404
+        assert server.get_stats()['not_found'] == 1
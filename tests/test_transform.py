@@ -0,0 +1,26 @@
+# Import Libraries
+import numpy as np
+import pytest
+import extract_transform_load.transform as transform
+
+ALL_COLS = ['Date', 'Hour', 'HB_NORTH', 'HB_SOUTH']
+
+def test_missing_days_become_rows_of_missing_values():
+    rows = [['12/01/2024', '01', '20.5', '21.0'], [], ['12/03/2024', '01', '22.0', '']]
+    df = transform.create_df(rows, ALL_COLS, ALL_COLS, 'price')
+
+    assert len(df) == 3
+    assert df['Date'].isna().tolist() == [False, True, False]
+    assert np.isnan(df.loc[1, 'HB_NORTH']) and np.isnan(df.loc[2, 'HB_SOUTH'])
+    assert df.loc[0, 'HB_NORTH'] == 20.5
+
+@pytest.mark.parametrize('row', [['12/02/2024', '01', '20.5'], ['12/02/2024', '01', '20.5', '21.0', '19.0']])
+def test_rows_of_the_wrong_width_raise(row):
+    rows = [['12/01/2024', '01', '20.5', '21.0'], row]
+
+    with pytest.raises(ValueError, match='price row for 12/02/2024 has'):
+        transform.create_df(rows, ALL_COLS, ALL_COLS, 'price')
+
+def test_day_with_a_single_row_is_kept():
+    raw_price_data = [[['12/01/2024', '01', '20.5', '21.0']], []]
+    assert transform.flatten_lists(raw_price_data) == [['12/01/2024', '01', '20.5', '21.0'], []]
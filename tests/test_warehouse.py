@@ -0,0 +1,47 @@
+# Import Libraries
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+import extract_transform_load.warehouse as warehouse
+
+# A merged dataframe of two days (48 hours) with one price and one wind column
+def make_merged_df(start='2024-12-01T07:00:00Z', price=20.0, wind=3000.0):
+    timestamps = pd.date_range(start, periods=48, freq='h', name='Timestamp')
+    local = (timestamps - pd.Timedelta(hours=1)).tz_convert('America/Chicago').tz_localize(None)
+    hours = np.asarray(local.hour + 1)
+    hours[hours == 24] = 0
+    return pd.DataFrame({'Date': local.normalize(), 'Hour': hours, 'Price_Hub_Avg': price + np.arange(48.0),
+                         'Wind_SystemWide': wind + np.arange(48.0)}, index=timestamps)
+
+def save(df, path, cleared_days=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        warehouse.save_to_warehouse(df, path, cleared_days)
+
+def read_merged(path):
+    return warehouse.query('SELECT * FROM merged ORDER BY Timestamp', path=path)
+
+def test_upserts_replace_stored_hours(tmp_path):
+    path = tmp_path / 'warehouse.sqlite'
+    save(make_merged_df(), path)
+    save(make_merged_df(start='2024-12-02T07:00:00Z', price=50.0), path)
+
+    merged = read_merged(path)
+    assert len(merged) == 72 and merged['Timestamp'].is_unique
+    assert merged['Price_Hub_Avg'].tolist() == [20.0 + i for i in range(24)] + [50.0 + i for i in range(48)]
+    assert (merged['Date'].iloc[:24] == '2024-12-01').all() and merged['Hour'].iloc[23] == 0
+
+# Hours a source doesn't cover keep their stored values, unless the day was cleared
+def test_missing_values_only_overwrite_cleared_days(tmp_path):
+    path = tmp_path / 'warehouse.sqlite'
+    save(make_merged_df(), path)
+
+    update = make_merged_df(price=70.0)
+    update['Wind_SystemWide'] = np.nan
+    save(update, path)
+    assert read_merged(path)['Wind_SystemWide'].notna().all()
+
+    save(update, path, cleared_days={'wind': ['2024-12-02']})
+    merged = read_merged(path)
+    assert merged['Wind_SystemWide'].iloc[:24].notna().all() and merged['Wind_SystemWide'].iloc[24:].isna().all()
+    assert (merged['Price_Hub_Avg'] == 70.0 + np.arange(48.0)).all()